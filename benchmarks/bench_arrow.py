@@ -0,0 +1,79 @@
+"""
+Débit de /predict/arrow (table Arrow IPC / Parquet) face à /predict_batch (JSON).
+
+Mesures en appel direct (sans HTTP) sur les mêmes enregistrements synthétiques :
+- json    : json.loads du corps + normalize_batch + predict_proba (chemin de /predict_batch)
+- ipc     : _score_arrow sur un flux Arrow IPC (lecture, normalize_table, predict_proba, réponse IPC)
+- parquet : idem sur un fichier Parquet
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_arrow --rows 100000
+"""
+
+import argparse
+import io
+import json
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import predictor
+from predictor_lib import columnar
+from predictor_lib.synthetic import synthetic_records
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Nombre de lignes de la table")
+    parser.add_argument("--repeat", type=int, default=3, help="Meilleure de N mesures")
+    args = parser.parse_args()
+
+    state = predictor.build_state()
+    meta = state.meta
+    records = synthetic_records(args.rows, meta.features)
+    table = pa.table({c: [r[c] for r in records] for c in meta.features})
+
+    json_body = json.dumps({"data": records}).encode("utf-8")
+    ipc_body = columnar.write_ipc_stream(table)
+    sink = io.BytesIO()
+    pq.write_table(table, sink)
+    parquet_body = sink.getvalue()
+
+    def run_json():
+        X, valid, _ = predictor.normalize_batch(json.loads(json_body)["data"], meta)
+        state.predict_proba(X)
+
+    timings = {
+        "json": (_best_of(run_json, args.repeat), len(json_body)),
+        "ipc": (_best_of(lambda: predictor._score_arrow(state, ipc_body, "stream"), args.repeat), len(ipc_body)),
+        "parquet": (_best_of(lambda: predictor._score_arrow(state, parquet_body, "parquet"), args.repeat),
+                    len(parquet_body)),
+    }
+
+    t0 = time.perf_counter()
+    predictor.normalize_table(table, meta)
+    encode_table_ms = (time.perf_counter() - t0) * 1e3
+    t0 = time.perf_counter()
+    predictor.normalize_batch(records, meta)
+    encode_batch_ms = (time.perf_counter() - t0) * 1e3
+
+    print(f"[bench] modèle={meta.model_name} lignes={args.rows}")
+    for name, (seconds, size) in timings.items():
+        print(f"[bench] {name:8s}: {args.rows / seconds:10.0f} lignes/s ({seconds * 1e3:8.1f} ms, "
+              f"corps {size / 1e6:.1f} Mo)")
+    print(f"[bench] normalisation seule : normalize_table {encode_table_ms:.1f} ms, "
+          f"normalize_batch {encode_batch_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
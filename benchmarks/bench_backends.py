@@ -0,0 +1,84 @@
+"""
+Latence et mémoire (RSS) par backend d'inférence (predictor_lib.backends).
+
+Chaque backend est mesuré dans un processus séparé pour isoler la mémoire :
+temps de chargement, RSS après chargement, latence p50/p95 d'une ligne et
+d'un lot, RSS pic. Un backend qui ne peut pas charger le modèle (ex. onnx sur
+un modèle à features catégorielles) est signalé comme indisponible.
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_backends --backends catboost,numpy,onnx
+"""
+
+import argparse
+import multiprocessing as mp
+import statistics
+import time
+
+import predictor
+from predictor_lib.backends import create_backend
+from predictor_lib.memory import peak_rss_mb, rss_mb
+from predictor_lib.synthetic import synthetic_records
+
+
+def _latencies_ms(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1e3)
+    runs.sort()
+    return statistics.median(runs), runs[min(len(runs) - 1, int(0.95 * len(runs)))]
+
+
+def _measure(name, batch_rows, repeat, queue):
+    try:
+        model_path, meta_path = predictor.model_paths()
+        meta = predictor.ModelMeta.load(meta_path)
+        encoder = predictor.FeatureEncoder(meta)
+        rows = [encoder.encode(r) for r in synthetic_records(batch_rows, meta.features)]
+
+        rss_before = rss_mb()
+        backend = create_backend(name, model_path)
+        rss_loaded = rss_mb()
+        backend.predict_proba(rows[:1])  # chauffe
+        single = _latencies_ms(lambda: backend.predict_proba(rows[:1]), repeat)
+        batch = _latencies_ms(lambda: backend.predict_proba(rows), max(3, repeat // 20))
+        queue.put({
+            "backend": name,
+            "load_ms": backend.load_ms,
+            "model_mb": rss_loaded - rss_before,
+            "single": single,
+            "batch": batch,
+            "peak_mb": peak_rss_mb(),
+        })
+    except Exception as e:  # noqa: BLE001 — rapporté dans le tableau
+        queue.put({"backend": name, "error": f"{type(e).__name__}: {e}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="catboost,numpy,onnx", help="Backends à comparer (virgules)")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="Taille du lot mesuré")
+    parser.add_argument("--repeat", type=int, default=200, help="Appels mesurés pour une ligne")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'backend':>9} | {'charge ms':>9} {'modèle Mo':>9} | {'1 ligne p50/p95 ms':>19} | "
+          f"{f'{args.batch_rows} lignes p50/p95 ms':>24} | {'RSS pic Mo':>10}")
+    for name in args.backends.split(","):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_measure, args=(name, args.batch_rows, args.repeat, queue))
+        proc.start()
+        r = queue.get()
+        proc.join()
+        if "error" in r:
+            print(f"{name:>9} | indisponible : {r['error']}")
+            continue
+        print(f"{name:>9} | {r['load_ms']:>9.0f} {r['model_mb']:>9.1f} | "
+              f"{r['single'][0]:>9.3f} / {r['single'][1]:>7.3f} | "
+              f"{r['batch'][0]:>12.2f} / {r['batch'][1]:>9.2f} | {r['peak_mb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare le débit de /predict (une ligne par appel) et de /predict_batch (un lot).
+
+Les deux chemins sont mesurés en appel direct (sans HTTP) sur les mêmes
+enregistrements synthétiques tirés de data/ref_options.json :
+- single : FeatureEncoder.encode + predict_proba ligne par ligne (chemin de /predict)
+- batch  : normalize_batch + un seul predict_proba sur tout le lot
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_batch --rows 10000
+"""
+
+import argparse
+import time
+
+import predictor
+from predictor_lib.synthetic import synthetic_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Nombre d'enregistrements du lot")
+    parser.add_argument("--single-rows", type=int, default=1000,
+                        help="Nombre de lignes mesurées sur le chemin single (extrapolé)")
+    args = parser.parse_args()
+
+    model, meta = predictor.load_model_and_meta()
+    records = synthetic_records(args.rows, meta.features)
+
+    # chauffe
+    encoder = predictor.FeatureEncoder(meta)
+    model.predict_proba([encoder.encode(records[0])])
+
+    n_single = min(args.single_rows, args.rows)
+    t0 = time.perf_counter()
+    for r in records[:n_single]:
+        model.predict_proba([encoder.encode(r)])
+    single_s = time.perf_counter() - t0
+    single_rps = n_single / single_s
+
+    t0 = time.perf_counter()
+    X, valid, errors = predictor.normalize_batch([dict(r) for r in records], meta)
+    t1 = time.perf_counter()
+    model.predict_proba(X)
+    t2 = time.perf_counter()
+    batch_rps = args.rows / (t2 - t0)
+
+    print(f"[bench] modèle={meta.model_name} lignes={args.rows} erreurs={len(errors)}")
+    print(f"[bench] single : {single_rps:10.0f} lignes/s ({single_s / n_single * 1e3:.3f} ms/ligne, {n_single} lignes)")
+    print(f"[bench] batch  : {batch_rps:10.0f} lignes/s "
+          f"(normalize {(t1 - t0) * 1e3:.1f} ms, predict_proba {(t2 - t1) * 1e3:.1f} ms)")
+    print(f"[bench] gain   : x{batch_rps / single_rps:.1f}")
+
+
+if __name__ == "__main__":
+    main()
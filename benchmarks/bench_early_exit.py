@@ -0,0 +1,52 @@
+"""
+Early-exit (predictor_lib.early_exit) vs évaluation complète, ligne à ligne.
+
+Sur des lignes synthétiques, mesure la latence moyenne par ligne des deux modes,
+la fraction de lignes sorties avant le dernier arbre, les arbres évalués par
+ligne et vérifie que la classe prédite est identique.
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_early_exit --rows 2000 --stages 0.5,0.75,0.9
+"""
+
+import argparse
+import time
+
+import predictor
+from predictor_lib.backends import create_backend
+from predictor_lib.early_exit import EarlyExitPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Lignes synthétiques (une requête chacune)")
+    parser.add_argument("--stages", default="0.5,0.75,0.9", help="Fractions d'arbres des paliers")
+    parser.add_argument("--backend", default="catboost", help="Backend à arbres (catboost | numpy)")
+    args = parser.parse_args()
+
+    model_path, meta_path = predictor.model_paths()
+    meta = predictor.ModelMeta.load(meta_path)
+    rows = predictor.probe_rows(meta, args.rows)
+    backend = create_backend(args.backend, model_path)
+    early = EarlyExitPredictor(backend, meta.threshold, [float(x) for x in args.stages.split(",")])
+
+    t0 = time.perf_counter()
+    full = [float(backend.predict_proba([r])[0, 1]) for r in rows]
+    t_full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fast = [early.predict([r])[0] for r in rows]
+    t_early = time.perf_counter() - t0
+
+    mismatches = sum((p >= meta.threshold) != (f >= meta.threshold) for (p, _), f in zip(fast, full))
+    stats = early.stats()
+    print(f"[bench] {args.backend}, {early.n_trees} arbres, paliers {early.cuts}, seuil {meta.threshold}")
+    print(f"  complet    : {t_full / len(rows) * 1e3:.3f} ms/ligne")
+    print(f"  early-exit : {t_early / len(rows) * 1e3:.3f} ms/ligne "
+          f"(gain {(t_full - t_early) / len(rows) * 1e3:+.3f} ms/ligne)")
+    print(f"  sorties anticipées : {stats['early_exit_fraction']:.1%} {stats['exits_by_stage']}")
+    print(f"  arbres évalués / ligne : {stats['mean_trees_per_row']:.0f}")
+    print(f"  classes différentes : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
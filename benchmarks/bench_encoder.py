@@ -0,0 +1,61 @@
+"""
+Micro-benchmark du coût par ligne de la normalisation d'entrée.
+
+- avant : normalize_input (DataFrame pandas par requête)
+- après : FeatureEncoder.encode (compilé une fois depuis ModelMeta, sans pandas)
+
+Mesure aussi la requête complète (normalisation + predict_proba) si un modèle
+est disponible (MODEL_PATH), sinon seule la normalisation est mesurée.
+
+Usage:
+    uv run python -m benchmarks.bench_encoder --rows 2000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import predictor
+from predictor_lib.synthetic import synthetic_records
+
+
+def _per_row_us(fn, records, repeat):
+    """Médiane (sur `repeat` passes) du coût moyen par ligne, en microsecondes."""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for r in records:
+            fn(r)
+        runs.append((time.perf_counter() - t0) / len(records) * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Nombre de lignes par passe")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de passes (médiane)")
+    args = parser.parse_args()
+
+    meta = predictor.ModelMeta.load(os.getenv("META_PATH", predictor.DEFAULT_META_PATH))
+    encoder = predictor.FeatureEncoder(meta)
+    records = synthetic_records(args.rows, meta.features)
+
+    before = _per_row_us(lambda r: predictor.normalize_input(dict(r), meta), records, args.repeat)
+    after = _per_row_us(encoder.encode, records, args.repeat)
+    print(f"[bench] normalisation  avant {before:9.1f} us/ligne | après {after:7.1f} us/ligne | x{before / after:.0f}")
+
+    try:
+        model, _ = predictor.load_model_and_meta()
+    except FileNotFoundError as e:
+        print(f"[bench] requête complète ignorée : {e}")
+        return
+
+    before = _per_row_us(lambda r: model.predict_proba(predictor.normalize_input(dict(r), meta)),
+                         records[:500], args.repeat)
+    after = _per_row_us(lambda r: model.predict_proba([encoder.encode(r)]), records[:500], args.repeat)
+    print(f"[bench] + predict_proba avant {before:9.1f} us/ligne | après {after:7.1f} us/ligne | x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
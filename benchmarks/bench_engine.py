@@ -0,0 +1,64 @@
+"""
+Débit du moteur NumPy (ObliviousTreeEngine) vs predict_proba CatBoost natif.
+
+Pour chaque taille de lot (1 à 100k lignes synthétiques), mesure la latence
+médiane d'un appel et le débit en lignes/s, puis l'écart max de probabilité
+entre les deux moteurs.
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_engine --sizes 1,10,100,1000,10000,100000
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from catboost import CatBoostClassifier
+
+import predictor
+from predictor_lib.oblivious import ObliviousTreeEngine
+from predictor_lib.synthetic import synthetic_records
+
+
+def _median_s(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,100,1000,10000,100000", help="Tailles de lot (virgules)")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions par taille (médiane)")
+    args = parser.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",")]
+
+    model_path, meta_path = predictor.model_paths()
+    meta = predictor.ModelMeta.load(meta_path)
+    native = CatBoostClassifier()
+    native.load_model(str(model_path))
+    t0 = time.perf_counter()
+    engine = ObliviousTreeEngine.from_cbm(model_path)
+    print(f"[bench] compilation moteur NumPy : {(time.perf_counter() - t0) * 1e3:.0f} ms "
+          f"({engine.n_trees} arbres, {engine.n_bins} features binaires)")
+
+    encoder = predictor.FeatureEncoder(meta)
+    all_rows = [encoder.encode(r) for r in synthetic_records(max(sizes), meta.features)]
+
+    print(f"{'lot':>8} | {'catboost ms':>12} {'lignes/s':>10} | {'numpy ms':>10} {'lignes/s':>10} | {'max |dp|':>9}")
+    for n in sizes:
+        rows = all_rows[:n]
+        repeat = args.repeat if n <= 10000 else 1
+        t_native = _median_s(lambda: native.predict_proba(rows), repeat)
+        t_numpy = _median_s(lambda: engine.predict_proba(rows), repeat)
+        diff = float(np.abs(native.predict_proba(rows)[:, 1] - engine.predict_proba(rows)[:, 1]).max())
+        print(f"{n:>8} | {t_native * 1e3:>12.2f} {n / t_native:>10.0f} | "
+              f"{t_numpy * 1e3:>10.2f} {n / t_numpy:>10.0f} | {diff:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
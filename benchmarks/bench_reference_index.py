@@ -0,0 +1,103 @@
+"""
+Coût des données de référence sur un rerun complet de l'interface, avant / après ReferenceIndex.
+
+Un rerun Streamlit réexécute la page : pour chacun des 15 champs, options du
+selectbox, position de la valeur courante, code de l'option choisie ; la page 6
+ajoute le récapitulatif (libellés) et validate_field sur les 15 champs.
+
+- avant : parcours linéaires d'origine (libellé par boucle sur les options, options
+          reformatées à chaque appel, list.index sur les options formatées, liste des
+          codes valides reconstruite), plus la copie des données que st.cache_data
+          désérialise à chaque rerun
+- après : ReferenceIndex construit une fois (st.cache_resource, pas de copie)
+
+Le rendu des widgets par Streamlit n'est pas mesuré : seule la part de travail
+sur les données de référence change.
+
+Usage:
+    uv run python -m benchmarks.bench_reference_index --reruns 2000
+"""
+
+import argparse
+import pickle
+import time
+
+from streamlit_lib import reference_loader, validation
+from streamlit_lib.reference_loader import format_dropdown_option, parse_dropdown_value
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+# --- implémentation d'origine (parcours linéaires) ---
+
+def _legacy_options(data, field):
+    return [format_dropdown_option(opt['code'], opt['label']) for opt in data[field]]
+
+
+def _legacy_label(data, field, code):
+    for opt in data[field]:
+        if opt['code'] == code or str(opt['code']) == str(code):
+            return opt['label']
+    raise ValueError(code)
+
+
+def _legacy_valid(data, field, value):
+    return value in [opt['code'] for opt in data[field]]
+
+
+def legacy_rerun(cached, inputs):
+    data = pickle.loads(cached)  # copie renvoyée par st.cache_data à chaque rerun
+    for field, current in inputs.items():
+        options = _legacy_options(data, field)
+        index = 0
+        formatted = format_dropdown_option(current, _legacy_label(data, field, current))
+        if formatted in options:
+            index = options.index(formatted)
+        parse_dropdown_value(options[index])
+    for field, value in inputs.items():
+        _legacy_label(data, field, value)
+        _legacy_valid(data, field, value)
+
+
+def indexed_rerun(data, inputs):
+    index = reference_loader.get_reference_index(data)
+    for field, current in inputs.items():
+        options = index.options(field)
+        index.code_for_option(field, options[index.position(field, current)])
+    for field, value in inputs.items():
+        index.label(field, value)
+        validation.validate_field(field, value, data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=2000, help="Reruns par mesure")
+    parser.add_argument("--repeat", type=int, default=5, help="Meilleure de N mesures")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    data = reference_loader.load_reference_data()
+    load_ms = (time.perf_counter() - t0) * 1000
+    # valeur courante = dernière option de chaque champ (pire cas du parcours linéaire)
+    inputs = {f: data[f][-1]['code'] for f in validation.REQUIRED_FIELDS}
+    cached = pickle.dumps({k: v for k, v in data.items()})
+
+    legacy = _best_of(lambda: [legacy_rerun(cached, inputs) for _ in range(args.reruns)], args.repeat)
+    indexed = _best_of(lambda: [indexed_rerun(data, inputs) for _ in range(args.reruns)], args.repeat)
+
+    print(f"chargement + index : {load_ms:.2f} ms (une fois par processus)")
+    print(f"{'':10s} {'µs / rerun':>12s}")
+    print(f"{'avant':10s} {legacy / args.reruns * 1e6:12.1f}")
+    print(f"{'après':10s} {indexed / args.reruns * 1e6:12.1f}")
+    print(f"gain : x{legacy / indexed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Surcoût de ?uncertainty=true : ensemble virtuel CatBoost vs predict_proba seul.
+
+Pour chaque taille de lot, mesure (meilleure de N) un predict_proba et un appel
+virtual_ensembles de K membres sur les mêmes lignes synthétiques, et rapporte le
+ratio. Vérifie aussi que le dernier membre redonne la proba du modèle complet.
+
+Usage:
+    MODEL_PATH=... uv run python -m benchmarks.bench_uncertainty --sizes 1,64,1000,10000 --counts 5,10,20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import predictor
+from predictor_lib.backends import create_backend
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,64,1000,10000", help="Tailles de lot")
+    parser.add_argument("--counts", default="5,10,20", help="Membres de l'ensemble virtuel")
+    parser.add_argument("--repeat", type=int, default=5, help="Meilleure de N mesures")
+    parser.add_argument("--threads", type=int, default=-1, help="thread_count CatBoost")
+    args = parser.parse_args()
+
+    model_path, meta_path = predictor.model_paths()
+    meta = predictor.ModelMeta.load(meta_path)
+    backend = create_backend("catboost", model_path, args.threads)
+    sizes = [int(x) for x in args.sizes.split(",")]
+    counts = [int(x) for x in args.counts.split(",")]
+    rows = predictor.probe_rows(meta, max(sizes))
+
+    print(f"[bench] {meta.model_name}, {backend.model.tree_count_} arbres, thread_count={args.threads}")
+    for n in sizes:
+        batch = rows[:n]
+        t_plain = _best_of(lambda: backend.predict_proba(batch), args.repeat)
+        line = f"  {n:6d} lignes : predict_proba {t_plain * 1e3:8.2f} ms"
+        for k in counts:
+            t_ve = _best_of(lambda: backend.virtual_ensembles(batch, k), args.repeat)
+            line += f" | {k:2d} membres {t_ve * 1e3:8.2f} ms (x{t_ve / t_plain:.2f})"
+        print(line)
+
+    full = backend.predict_proba(rows[:1000])[:, 1]
+    last = 1.0 / (1.0 + np.exp(-backend.virtual_ensembles(rows[:1000], counts[0])[:, -1]))
+    print(f"[bench] écart max dernier membre / modèle complet : {np.abs(full - last).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Coût du contrôle des codes contre data/ref_options.json, face à l'inférence.
+
+- ligne   : FeatureEncoder.encode sans / avec REF_CODE_SETS, et un contrôle par
+            parcours de listes (`value not in valid_codes`, comme validation.validate_field)
+- lot     : normalize_batch sur --batch lignes, sans / avec contrôle
+- arrow   : normalize_table sur les mêmes lignes, sans / avec contrôle
+- inférence de référence : predict_proba sur 1 ligne et sur le lot (si MODEL_PATH est disponible)
+
+Usage:
+    uv run python -m benchmarks.bench_validation --rows 2000 --batch 10000
+"""
+
+import argparse
+import os
+import time
+
+import pyarrow as pa
+
+import predictor
+from predictor_lib import reference
+from predictor_lib.synthetic import load_codes, synthetic_records
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Lignes encodées une à une")
+    parser.add_argument("--batch", type=int, default=10000, help="Taille du lot")
+    parser.add_argument("--repeat", type=int, default=5, help="Meilleure de N mesures")
+    args = parser.parse_args()
+
+    meta = predictor.ModelMeta.load(os.getenv("META_PATH", predictor.DEFAULT_META_PATH))
+    codes = load_codes(predictor.REF_OPTIONS_PATH)
+    compiled = reference.compile_code_sets(codes)
+    records = synthetic_records(max(args.rows, args.batch), meta.features)
+    rows, batch = records[:args.rows], records[:args.batch]
+    table = pa.table({c: [r[c] for r in batch] for c in meta.features})
+
+    def with_sets(code_sets, fn):
+        predictor.REF_CODE_SETS = code_sets
+        try:
+            return fn()
+        finally:
+            predictor.REF_CODE_SETS = {}
+
+    plain = predictor.FeatureEncoder(meta)
+    checked = with_sets(compiled, lambda: predictor.FeatureEncoder(meta))
+    # contrôle linéaire de l'interface : listes de codes d'origine (int ou str)
+    lists = {f: codes[f] for f in meta.features if f in codes}
+
+    def linear(r):
+        return [f for f, valid in lists.items() if r[f] not in valid]
+
+    t_plain = _best_of(lambda: [plain.encode(r) for r in rows], args.repeat) / len(rows) * 1e6
+    t_checked = _best_of(lambda: [checked.encode(r) for r in rows], args.repeat) / len(rows) * 1e6
+    t_linear = _best_of(lambda: [linear(r) for r in rows], args.repeat) / len(rows) * 1e6
+    print(f"[bench] {len(compiled)} champs, {sum(len(v) for v in compiled.values())} codes de référence")
+    print(f"[bench] ligne  : encode {t_plain:6.1f} us | + contrôle {t_checked:6.1f} us "
+          f"(+{t_checked - t_plain:.1f} us) | parcours de listes seul {t_linear:6.1f} us")
+
+    def measure(fn):
+        return _best_of(fn, args.repeat) * 1e3, with_sets(compiled, lambda: _best_of(fn, args.repeat)) * 1e3
+
+    b_plain, b_checked = measure(lambda: predictor.normalize_batch(batch, meta))
+    a_plain, a_checked = measure(lambda: predictor.normalize_table(table, meta))
+    print(f"[bench] lot    : normalize_batch {b_plain:7.1f} ms | + contrôle {b_checked:7.1f} ms "
+          f"({len(batch)} lignes)")
+    print(f"[bench] arrow  : normalize_table {a_plain:7.1f} ms | + contrôle {a_checked:7.1f} ms")
+
+    try:
+        model, _ = predictor.load_model_and_meta()
+    except FileNotFoundError as e:
+        print(f"[bench] inférence ignorée : {e}")
+        return
+    X, _, _ = predictor.normalize_batch(batch, meta)
+    one = _best_of(lambda: model.predict_proba([plain.encode(rows[0])]), args.repeat) * 1e6
+    many = _best_of(lambda: model.predict_proba(X), args.repeat) * 1e3
+    print(f"[bench] inférence : 1 ligne {one:8.1f} us | lot {many:7.1f} ms")
+    print(f"[bench] contrôle / inférence : ligne {(t_checked - t_plain) / one:.1%}, "
+          f"lot {(b_checked - b_plain) / many:.1%}, arrow {(a_checked - a_plain) / many:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,407 @@
-def main():
-    print("Hello from briefml!")
+"""
+Commandes hors ligne du projet.
+
+    uv run python main.py score --input out/filtered/accidents_model_ready_kept.parquet \
+        --output out/scores.parquet [--workers 4] [--chunk-rows 20000] [--keep-columns grave]
+
+`freq-tables` compte les codes de chaque feature catégorielle du Parquet d'entraînement
+(tables de fréquences de /predict/partial, chargées au démarrage de l'API) :
+
+    uv run python main.py freq-tables --input out/filtered/accidents_model_ready_kept.parquet
+
+`tune` balaie workers x threads CatBoost x taille de lot sous une charge synthétique
+(codes de ref_options.json), mesure débit et p99, et écrit la configuration
+recommandée (TUNING_PATH) que start.py et predictor.py appliquent au lancement :
+
+    uv run python main.py tune [--workers 1,2,4,8,16] [--threads 1,2,4,8,16] [--batch-sizes 1,8,64]
+
+`score` lit un Parquet (par lots de lignes, dans l'ordre des row groups) ou un CSV
+par blocs, répartit les blocs sur un pool de processus qui chargent chacun le
+modèle une fois via load_model_and_meta, et écrit les résultats au fil de l'eau
+dans un Parquet (row, proba, pred_class, label, error + colonnes conservées).
+La normalisation est celle de /predict/arrow (predictor.score_table) : mêmes scores
+hors ligne et en ligne. Débit, pic RSS et durée par bloc sont affichés.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+import predictor
+from predictor_lib import marginal, tuning
+from predictor_lib.memory import peak_rss_mb
+
+# modèle chargé par processus worker (ou par le processus principal avec --workers 1)
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: Path, meta_path: Path, thread_count: int) -> None:
+    # le nombre demandé l'emporte aussi sur le plafond INFERENCE_THREADS d'un out/tuning.json existant
+    predictor.INFERENCE_THREAD_COUNT = thread_count
+    predictor.INFERENCE_THREADS = thread_count
+    # codes de référence comme au démarrage de l'API : mêmes lignes refusées hors ligne
+    predictor.load_reference_codes()
+    model, meta = predictor.load_model_and_meta(model_path, meta_path)
+    _WORKER.update(model=model, meta=meta)
+
+
+def _score_chunk(index: int, table: pa.Table) -> Tuple[int, pa.Table, int, Dict[str, float], int, float]:
+    """(index, résultats, n_errors, durées, pid, pic RSS du worker) pour un bloc d'entrée."""
+    model, meta = _WORKER["model"], _WORKER["meta"]
+    timings: Dict[str, float] = {}
+    result, n_errors = predictor.score_table(table, meta, lambda X: model.predict_proba(X)[:, 1], timings)
+    return index, result, n_errors, timings, os.getpid(), peak_rss_mb()
+
+
+def _input_columns(path: Path) -> List[str]:
+    if path.suffix.lower() == ".csv":
+        with pacsv.open_csv(path) as reader:
+            return reader.schema.names
+    return pq.read_schema(path).names
+
+
+def _iter_chunks(path: Path, columns: Sequence[str], cat_features: Sequence[str],
+                 chunk_rows: int) -> Iterator[pa.Table]:
+    """Blocs de `chunk_rows` lignes (le dernier peut être plus court), colonnes `columns` seulement."""
+    if path.suffix.lower() != ".csv":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=list(columns)):
+            yield pa.Table.from_batches([batch])
+        return
+
+    # codes catégoriels lus en texte : "01" reste "01" (l'inférence de type en ferait 1)
+    convert = pacsv.ConvertOptions(
+        include_columns=list(columns),
+        column_types={c: pa.string() for c in cat_features if c in columns},
+    )
+    pending: List[pa.RecordBatch] = []
+    n_pending = 0
+    with pacsv.open_csv(path, convert_options=convert) as reader:
+        for batch in reader:
+            pending.append(batch)
+            n_pending += batch.num_rows
+            while n_pending >= chunk_rows:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, chunk_rows)
+                rest = table.slice(chunk_rows)
+                pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield pa.Table.from_batches(pending)
+
+
+def score(
+    input_path: Path,
+    output_path: Path,
+    model_path: Optional[Path] = None,
+    meta_path: Optional[Path] = None,
+    workers: int = 1,
+    chunk_rows: int = 20000,
+    keep_columns: Sequence[str] = (),
+    threads_per_worker: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Score `input_path` dans `output_path` ; renvoie le résumé affiché en fin de commande."""
+    default_model, default_meta = predictor.model_paths()
+    model_path, meta_path = Path(model_path or default_model), Path(meta_path or default_meta)
+    meta = predictor.ModelMeta.load(meta_path)
+    cpus = os.cpu_count() or 1
+    workers = max(1, workers)
+    threads_per_worker = threads_per_worker or max(1, cpus // workers)
+
+    available = _input_columns(input_path)
+    missing = [c for c in meta.features if c not in available and c not in predictor.DEFAULTS]
+    missing += [c for c in keep_columns if c not in available]
+    if missing:
+        raise ValueError(f"Colonnes absentes de {input_path}: {missing}")
+    features = [c for c in meta.features if c in available]
+    columns = list(dict.fromkeys([*features, *keep_columns]))
+
+    t0 = time.perf_counter()
+    pool: Optional[ProcessPoolExecutor] = None
+    if workers > 1:
+        # spawn : le processus principal a déjà des threads (pool Arrow), fork pourrait les bloquer
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(model_path, meta_path, threads_per_worker))
+    else:
+        _init_worker(model_path, meta_path, threads_per_worker)
+
+    writer: Optional[pq.ParquetWriter] = None
+    n_rows = n_errors = 0
+    worker_peak_mb = 0.0
+    chunk_ms: List[float] = []
+    # au plus 2 blocs en attente par worker : la mémoire reste bornée par la taille des blocs
+    in_flight: Deque[Tuple[pa.Table, float, "Future[Any]"]] = deque()
+
+    def write_next() -> None:
+        nonlocal writer, n_rows, n_errors, worker_peak_mb
+        source, submitted, future = in_flight.popleft()
+        index, result, errors, timings, pid, worker_peak = future.result()
+        result = result.add_column(0, "row", pa.array(range(n_rows, n_rows + result.num_rows), pa.int64()))
+        for c in keep_columns:
+            result = result.append_column(c, source.column(c))
+        if writer is None:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(output_path, result.schema)
+        writer.write_table(result)
+        elapsed_ms = (time.perf_counter() - submitted) * 1e3
+        chunk_ms.append(elapsed_ms)
+        n_rows += result.num_rows
+        n_errors += errors
+        worker_peak_mb = max(worker_peak_mb, worker_peak)
+        print(f"[score] bloc {index:4d} : {result.num_rows:7d} lignes ({errors} erreurs) "
+              f"encode {timings['encode_ms']:7.1f} ms, inference {timings['inference_ms']:7.1f} ms, "
+              f"total {elapsed_ms:7.1f} ms (pid {pid})")
+
+    try:
+        for index, chunk in enumerate(_iter_chunks(input_path, columns, meta.cat_features, chunk_rows)):
+            submitted = time.perf_counter()
+            # seules les colonnes du modèle partent vers le worker
+            if pool is not None:
+                future = pool.submit(_score_chunk, index, chunk.select(features))
+            else:
+                future = Future()
+                future.set_result(_score_chunk(index, chunk.select(features)))
+            in_flight.append((chunk, submitted, future))
+            if len(in_flight) >= 2 * workers:
+                write_next()
+        while in_flight:
+            write_next()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if writer is not None:
+            writer.close()
+
+    elapsed_s = time.perf_counter() - t0
+    return {
+        "rows": n_rows,
+        "errors": n_errors,
+        "chunks": len(chunk_ms),
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "elapsed_s": elapsed_s,
+        "rows_per_s": n_rows / elapsed_s if elapsed_s > 0 else 0.0,
+        "chunk_ms_max": max(chunk_ms, default=0.0),
+        "peak_rss_mb": peak_rss_mb(),
+        "worker_peak_rss_mb": worker_peak_mb if pool is not None else None,
+    }
+
+
+def freq_tables(input_path: Path, output_path: Path, meta_path: Optional[Path] = None,
+                chunk_rows: int = 100000) -> Dict[str, Any]:
+    """Compte les codes des features catégorielles de `input_path` par blocs ; écrit le JSON."""
+    meta = predictor.ModelMeta.load(meta_path or predictor.model_paths()[1])
+    available = _input_columns(input_path)
+    fields = [c for c in meta.cat_features if c in available]
+    if not fields:
+        raise ValueError(f"Aucune feature catégorielle du modèle dans {input_path}")
+    counts: Dict[str, Dict[str, int]] = {f: {} for f in fields}
+    rows = 0
+    for chunk in _iter_chunks(input_path, fields, meta.cat_features, chunk_rows):
+        rows += chunk.num_rows
+        for f, chunk_counts in marginal.frequency_tables(chunk, fields).items():
+            for code, n in chunk_counts.items():
+                counts[f][code] = counts[f].get(code, 0) + n
+    marginal.save_frequency_tables(output_path, counts, source=str(input_path), rows=rows)
+    return {"rows": rows, "fields": fields, "missing": [c for c in meta.cat_features if c not in available]}
+
+
+def _tune_worker(model_path: Path, meta_path: Path, thread_count: int, batch_sizes: Sequence[int],
+                 duration_s: float, barrier: Any, results: Any) -> None:
+    """Processus de charge : pour chaque taille de lot, predict_proba en boucle pendant duration_s.
+
+    Les workers démarrent chaque mesure ensemble (barrière) et renvoient lignes scorées,
+    durée et latence de chaque appel.
+    """
+    try:
+        _init_worker(model_path, meta_path, thread_count)
+        model = _WORKER["model"]
+        rows = predictor.probe_rows(_WORKER["meta"], 16 * max(batch_sizes))
+        for batch_size in batch_sizes:
+            batches = [rows[i:i + batch_size] for i in range(0, 16 * batch_size, batch_size)]
+            for b in batches[:3]:
+                model.predict_proba(b)
+            barrier.wait()
+            latencies: List[float] = []
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < duration_s:
+                t = time.perf_counter()
+                model.predict_proba(batches[len(latencies) % len(batches)])
+                latencies.append(time.perf_counter() - t)
+            results.put({"batch_size": batch_size, "rows": batch_size * len(latencies),
+                         "elapsed_s": time.perf_counter() - t0, "latencies": latencies})
+    except Exception as e:
+        barrier.abort()
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def measure_load(model_path: Path, meta_path: Path, workers: int, thread_count: int,
+                 batch_sizes: Sequence[int], duration_s: float) -> List[Dict[str, Any]]:
+    """Débit total et latences (p50, p99 par appel) de `workers` processus x `thread_count` threads."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers, timeout=300)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_tune_worker, daemon=True,
+                         args=(model_path, meta_path, thread_count, list(batch_sizes), duration_s, barrier, queue))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    by_size: Dict[int, List[Dict[str, Any]]] = {b: [] for b in batch_sizes}
+    try:
+        for _ in range(workers * len(batch_sizes)):
+            message = queue.get(timeout=300 + duration_s)
+            if "error" in message:
+                raise RuntimeError(f"worker de charge : {message['error']}")
+            by_size[message["batch_size"]].append(message)
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+
+    results = []
+    for batch_size, messages in by_size.items():
+        latencies_ms = np.concatenate([m["latencies"] for m in messages]) * 1e3
+        results.append({
+            "workers": workers,
+            "thread_count": thread_count,
+            "batch_size": batch_size,
+            "rows_per_s": sum(m["rows"] for m in messages) / max(m["elapsed_s"] for m in messages),
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "calls": int(latencies_ms.size),
+        })
+    return results
+
+
+def tune(
+    output_path: Path,
+    model_path: Optional[Path] = None,
+    meta_path: Optional[Path] = None,
+    workers: Optional[Sequence[int]] = None,
+    threads: Optional[Sequence[int]] = None,
+    batch_sizes: Sequence[int] = (1, 8, 64),
+    duration_s: float = 3.0,
+    p99_budget_ms: float = 50.0,
+    oversubscribe: bool = False,
+) -> Dict[str, Any]:
+    """Balaie la grille, écrit la recommandation dans `output_path` et la renvoie (avec les mesures)."""
+    default_model, default_meta = predictor.model_paths()
+    model_path, meta_path = Path(model_path or default_model), Path(meta_path or default_meta)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Modèle .cbm introuvable: {model_path}")
+    cpus = os.cpu_count() or 1
+    grid = [(w, t) for w in (workers or tuning.default_grid(cpus)) for t in (threads or tuning.default_grid(cpus))
+            if oversubscribe or w * t <= cpus]
+    if not grid:
+        raise ValueError(f"Aucune combinaison workers x threads <= {cpus} cœurs (--oversubscribe pour forcer)")
+
+    results: List[Dict[str, Any]] = []
+    for w, t in grid:
+        for r in measure_load(model_path, meta_path, w, t, batch_sizes, duration_s):
+            results.append(r)
+            print(f"[tune] {w:2d} worker(s) x {t:2d} thread(s), lot {r['batch_size']:4d} : "
+                  f"{r['rows_per_s']:9.0f} lignes/s, p50 {r['p50_ms']:7.2f} ms, p99 {r['p99_ms']:7.2f} ms")
+    best = tuning.recommend(results, p99_budget_ms)
+    # budget de threads par processus : le thread_count retenu, ou sa part des cœurs si plus grande
+    best["inference_threads"] = max(best["thread_count"], cpus // best["workers"])
+    return tuning.save_tuning(output_path, best, results, cpu_count=cpus, p99_budget_ms=p99_budget_ms,
+                              engine=predictor.INFERENCE_ENGINE, model=model_path.name)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Commandes hors ligne (scoring batch, tables de fréquences, réglage).")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("score", help="Score un Parquet / CSV et écrit les résultats en Parquet")
+    p.add_argument("--input", type=Path, required=True, help="Fichier .parquet ou .csv")
+    p.add_argument("--output", type=Path, required=True, help="Parquet de sortie")
+    p.add_argument("--model", type=Path, default=None, help="Modèle .cbm (défaut : MODEL_PATH)")
+    p.add_argument("--meta", type=Path, default=None, help="meta.json (défaut : META_PATH)")
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                   help="Processus de scoring (1 : dans le processus courant)")
+    p.add_argument("--threads-per-worker", type=int, default=None,
+                   help="Threads CatBoost par worker (défaut : CPU / workers)")
+    p.add_argument("--chunk-rows", type=int, default=20000, help="Lignes par bloc")
+    p.add_argument("--keep-columns", default="", help="Colonnes d'entrée recopiées en sortie (ex. grave)")
+    f = sub.add_parser("freq-tables", help="Tables de fréquences des codes (pour /predict/partial)")
+    f.add_argument("--input", type=Path, required=True, help="Parquet / CSV d'entraînement")
+    f.add_argument("--output", type=Path, default=None, help="JSON de sortie (défaut : FREQ_TABLES_PATH)")
+    f.add_argument("--meta", type=Path, default=None, help="meta.json (défaut : META_PATH)")
+    t = sub.add_parser("tune", help="Balaie workers x threads x taille de lot et écrit la configuration recommandée")
+    t.add_argument("--output", type=Path, default=None, help="JSON de sortie (défaut : TUNING_PATH)")
+    t.add_argument("--model", type=Path, default=None, help="Modèle .cbm (défaut : MODEL_PATH)")
+    t.add_argument("--meta", type=Path, default=None, help="meta.json (défaut : META_PATH)")
+    t.add_argument("--workers", type=_int_list, default=None, help="Workers à tester (défaut : 1, 2, 4, ... cœurs)")
+    t.add_argument("--threads", type=_int_list, default=None, help="thread_count CatBoost à tester (idem)")
+    t.add_argument("--batch-sizes", type=_int_list, default=[1, 8, 64], help="Tailles de lot à tester")
+    t.add_argument("--duration", type=float, default=3.0, help="Secondes de charge par mesure")
+    t.add_argument("--p99-budget-ms", type=float, default=50.0, help="p99 max d'un appel pour être retenu")
+    t.add_argument("--oversubscribe", action="store_true", help="Teste aussi workers x threads > cœurs")
+    args = parser.parse_args(argv)
+
+    if args.command == "tune":
+        output = args.output or tuning.tuning_path()
+        try:
+            config = tune(output, args.model, args.meta, args.workers, args.threads, args.batch_sizes,
+                          args.duration, args.p99_budget_ms, args.oversubscribe)
+        except (FileNotFoundError, ValueError, RuntimeError) as e:
+            print(f"[tune] erreur : {e}", file=sys.stderr)
+            return 2
+        budget = "" if config["within_budget"] else f" (aucune mesure sous {args.p99_budget_ms} ms)"
+        print(f"[tune] recommandé : {config['workers']} worker(s) x {config['thread_count']} thread(s), "
+              f"lot {config['batch_size']} : {config['rows_per_s']:.0f} lignes/s, p99 {config['p99_ms']:.2f} ms"
+              f"{budget} -> {output}")
+        return 0
+
+    if args.command == "freq-tables":
+        output = args.output or predictor.FREQ_TABLES_PATH
+        try:
+            summary = freq_tables(args.input, output, args.meta)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"[freq-tables] erreur : {e}", file=sys.stderr)
+            return 2
+        print(f"[freq-tables] {summary['rows']} lignes, {len(summary['fields'])} champs -> {output}")
+        if summary["missing"]:
+            print(f"[freq-tables] champs absents (poids uniformes) : {summary['missing']}")
+        return 0
+
+    if args.command != "score":
+        parser.print_help()
+        return 1
+
+    keep = [c.strip() for c in args.keep_columns.split(",") if c.strip()]
+    try:
+        summary = score(args.input, args.output, args.model, args.meta, args.workers, args.chunk_rows,
+                        keep, args.threads_per_worker)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[score] erreur : {e}", file=sys.stderr)
+        return 2
+
+    workers_rss = summary["worker_peak_rss_mb"]
+    print(f"[score] {summary['rows']} lignes ({summary['errors']} erreurs) en {summary['elapsed_s']:.2f} s : "
+          f"{summary['rows_per_s']:.0f} lignes/s, {summary['chunks']} blocs (max {summary['chunk_ms_max']:.0f} ms), "
+          f"{summary['workers']} worker(s) x {summary['threads_per_worker']} thread(s)")
+    print(f"[score] pic RSS : principal {summary['peak_rss_mb']:.0f} Mo"
+          + (f", worker max {workers_rss:.0f} Mo" if workers_rss is not None else ""))
+    print(f"[score] résultats : {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
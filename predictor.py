@@ -2,8 +2,23 @@
 predictor.py — API FastAPI pour prédire la gravité d’un accident (CatBoost product15_v2_time_bucket)
 
 - Charge un modèle CatBoost (.cbm) et un meta.json (features, cat_features, threshold)
-- Valide / normalise les 15 champs utilisateur
+- Valide / normalise les 15 champs utilisateur ; codes contrôlés contre data/ref_options.json (tous les champs invalides dans un seul 422)
 - Retourne proba + pred_class + label
+- POST /predict_batch : lot d'enregistrements, un seul predict_proba, erreurs par ligne
+- ?uncertainty=true sur /predict et /predict_batch : moyenne et variance de la proba sur un ensemble virtuel CatBoost
+- Les /predict concurrents sont regroupés en une seule inférence (micro-batching)
+- Cache LRU des prédictions, clé = empreinte (.cbm + meta) + payload canonique
+- Registre multi-modèles : POST /models/{name}/predict (chargement paresseux, déchargement LRU)
+- POST /explain, /explain_batch : contributions SHAP par feature (top-k), en cache
+- POST /predict/partial : champs inconnus marginalisés sur les fréquences d'entraînement (proba + dispersion)
+- POST /sensitivity : probas d'un scénario sur tous les codes d'un ou deux champs (courbe / grille)
+- POST /predict/arrow : table Arrow IPC / Parquet en entrée, table Arrow (proba, pred_class) en sortie
+- POST /predict/stream : corps NDJSON lu au fil de l'eau, résultats NDJSON par blocs de lignes
+- GET /metrics (Prometheus) : histogrammes par étape, compteurs ; en-tête Server-Timing par réponse
+- Threads CatBoost et taille max des micro-lots repris du réglage de `main.py tune` (TUNING_PATH)
+- Chauffe au démarrage (lots synthétiques), GET /ready, détail des temps de démarrage dans /health
+- Rechargement à chaud du modèle (POST /admin/reload ou surveillance des fichiers), bascule atomique
+- Early-exit optionnel de /predict : classe exacte, proba approximative si les arbres restants ne peuvent plus changer la décision
 
 Lancement :
   uvicorn predictor:app --host 0.0.0.0 --port 8000 --reload
@@ -12,22 +27,81 @@ Variables d'environnement (optionnelles) :
   MODEL_PATH=/home/maxime/alternance/BriefML/model/catboost_product15_v2_time_bucket_final.cbm
   META_PATH=/home/maxime/alternance/BriefML/out/catboost_product15_v2_time_bucket_final_meta.json
   MISSING_CAT=__MISSING__
+  MAX_BATCH_ROWS=100000
+  TUNING_PATH=out/tuning.json  # main.py tune : défauts des threads et de MICROBATCH_MAX_SIZE
+  INFERENCE_ENGINE=catboost    # backend : catboost | numpy | onnx (predictor_lib.backends)
+  PARITY_PROBE_ROWS=256        # sonde de parité vs CatBoost au démarrage (backends non natifs)
+  PARITY_MAX_ABS_DIFF=1e-4
+  MICROBATCH=1                 # 0 : un predict_proba par requête /predict
+  MICROBATCH_MAX_WAIT_MS=2
+  MICROBATCH_MAX_SIZE=64
+  PREDICT_CACHE_SIZE=10000     # 0 : pas de cache
+  PREDICT_CACHE_TTL_S=3600
+  EARLY_EXIT=0                 # 1 : évaluation des arbres par paliers sur /predict
+  EARLY_EXIT_STAGES=0.5,0.75,0.9
+  MODEL_WATCH_INTERVAL_S=0     # > 0 : recharge quand MODEL_PATH / META_PATH changent
+  ADMIN_TOKEN=                 # requis pour /admin/* (en-tête X-Admin-Token) ; vide : /admin/reload désactivé
+  MODEL_REGISTRY="product15_v2=model/...v2....cbm,out/...v2..._meta.json;product15=model/catboost_product15.cbm,out/catboost_product15_meta.json"
+                               # défaut : product15_v2 = MODEL_PATH / META_PATH, + product15
+  MODEL_REGISTRY_MAX_LOADED=2  # modèles du registre gardés en mémoire (LRU)
+  INFERENCE_THREADS=<nb cœurs> # budget de threads d'inférence partagé par tous les modèles
+  INFERENCE_THREAD_COUNT=-1    # thread_count CatBoost par appel (-1 : tout le budget)
+  WARMUP_BATCH_SIZES=1,8,64,512  # vide : pas de chauffe, /ready immédiat
+  WARMUP_ROUNDS=3
+  EXPLAIN_CACHE_SIZE=2000      # 0 : pas de cache des explications
+  EXPLAIN_CACHE_TTL_S=3600
+  EXPLAIN_MAX_ROWS=1000        # lignes max par /explain_batch
+  REF_OPTIONS_PATH=data/ref_options.json  # codes acceptés et balayés par /sensitivity
+  REF_VALIDATION=1             # 0 : codes hors référence scorés sans contrôle
+  SENSITIVITY_MAX_CELLS=5000
+  SENSITIVITY_CACHE_SIZE=256
+  FREQ_TABLES_PATH=out/catboost_product15_v2_freq_tables.json  # main.py freq-tables
+  MARGINAL_MAX_COMBINATIONS=256  # combinaisons de codes max par /predict/partial
+  VIRTUAL_ENSEMBLES_COUNT=10   # membres de l'ensemble virtuel pour ?uncertainty=true
+  STREAM_CHUNK_ROWS=1000       # lignes NDJSON scorées ensemble par /predict/stream
+  STREAM_MAX_LINE_BYTES=65536  # ligne plus longue : erreur sur cette ligne
 """
 
 from __future__ import annotations
 
+import time
+
+# temps d'import des dépendances de l'API, rapporté dans /health (startup.import_ms)
+_IMPORT_T0 = time.perf_counter()
+
+import itertools
 import json
 import os
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
-from catboost import CatBoostClassifier
-from fastapi import FastAPI, HTTPException
+import pyarrow as pa
+import pyarrow.compute as pc
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
+from predictor_lib.batching import MicroBatcher
+from predictor_lib.cache import LRUCache, file_fingerprint
+from predictor_lib.early_exit import EarlyExitPredictor
+from predictor_lib import metrics
+from predictor_lib.metrics import MetricsMiddleware, stage, timed_handler
+from predictor_lib.reload import FileWatcher
+from predictor_lib.backends import BACKENDS, InferenceBackend, create_backend, parity_check
+from predictor_lib.budget import ThreadBudget
+from predictor_lib import marginal, reference, tuning
+from predictor_lib.registry import ModelRegistry, parse_registry
+from predictor_lib.synthetic import DEFAULT_REF_PATH, load_codes, synthetic_records
+from predictor_lib import columnar
+from predictor_lib.streaming import NDJSONStreamResponse, ndjson_lines
+
+IMPORT_MS = (time.perf_counter() - _IMPORT_T0) * 1e3
+
 
 # -----------------------------
 # Config / Meta
@@ -41,6 +115,72 @@ BASE_DIR = Path(__file__).resolve().parent
 DEFAULT_MODEL_PATH = str(BASE_DIR / "model" / "catboost_product15_v2_time_bucket_final.cbm")
 DEFAULT_META_PATH = str(BASE_DIR / "out" / "catboost_product15_v2_time_bucket_final_meta.json")
 MISSING_CAT = os.getenv("MISSING_CAT", "__MISSING__")
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "100000"))
+
+# réglage écrit par `main.py tune` : défauts de MICROBATCH_MAX_SIZE, INFERENCE_THREADS et
+# INFERENCE_THREAD_COUNT (les variables d'environnement restent prioritaires)
+TUNING_PATH = tuning.tuning_path()
+TUNING = tuning.load_tuning(TUNING_PATH)
+
+# Backend d'inférence (clé de predictor_lib.backends.BACKENDS) et contrôle de parité au démarrage
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "catboost")
+PARITY_PROBE_ROWS = int(os.getenv("PARITY_PROBE_ROWS", "256"))
+PARITY_MAX_ABS_DIFF = float(os.getenv("PARITY_MAX_ABS_DIFF", "1e-4"))
+
+# Micro-batching de /predict (MICROBATCH=0 pour désactiver)
+MICROBATCH = os.getenv("MICROBATCH", "1") not in ("0", "false", "False", "")
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_SIZE = tuning.tuned_int("MICROBATCH_MAX_SIZE", TUNING, "batch_size", 64)
+
+# Cache LRU des prédictions /predict (PREDICT_CACHE_SIZE=0 pour désactiver, TTL 0 = sans expiration)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_TTL_S = float(os.getenv("PREDICT_CACHE_TTL_S", "3600"))
+
+# Early-exit de /predict (opt-in) : fractions d'arbres évaluées avant chaque test de décision
+EARLY_EXIT = os.getenv("EARLY_EXIT", "0") not in ("0", "false", "False", "")
+EARLY_EXIT_STAGES = tuple(float(x) for x in os.getenv("EARLY_EXIT_STAGES", "0.5,0.75,0.9").split(","))
+
+# Rechargement à chaud (0 = pas de surveillance des fichiers ; POST /admin/reload exige ADMIN_TOKEN)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Registre multi-modèles (nom=modele.cbm,meta.json;...) et budget de threads partagé ;
+# sans MODEL_REGISTRY, le modèle principal (MODEL_PATH / META_PATH) + DEFAULT_REGISTRY
+MAIN_MODEL_NAME = "product15_v2"
+DEFAULT_REGISTRY = (
+    f"product15={BASE_DIR / 'model' / 'catboost_product15.cbm'},{BASE_DIR / 'out' / 'catboost_product15_meta.json'}"
+)
+MODEL_REGISTRY = os.getenv("MODEL_REGISTRY", "")
+MODEL_REGISTRY_MAX_LOADED = int(os.getenv("MODEL_REGISTRY_MAX_LOADED", "2"))
+INFERENCE_THREADS = tuning.tuned_int("INFERENCE_THREADS", TUNING, "inference_threads", os.cpu_count() or 1)
+INFERENCE_THREAD_COUNT = tuning.tuned_int("INFERENCE_THREAD_COUNT", TUNING, "thread_count", -1)
+
+# Chauffe au démarrage : tailles de lot synthétiques (data/ref_options.json) et nombre de passes
+WARMUP_BATCH_SIZES = [int(x) for x in os.getenv("WARMUP_BATCH_SIZES", "1,8,64,512").split(",") if x.strip()]
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))
+
+# /explain : cache LRU des valeurs SHAP (bien plus coûteuses que predict_proba) et taille de lot max
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "2000"))
+EXPLAIN_CACHE_TTL_S = float(os.getenv("EXPLAIN_CACHE_TTL_S", "3600"))
+EXPLAIN_MAX_ROWS = int(os.getenv("EXPLAIN_MAX_ROWS", "1000"))
+
+# codes de référence : validation des entrées, codes balayés par /sensitivity, taille max de la grille, cache des courbes / grilles
+REF_OPTIONS_PATH = Path(os.getenv("REF_OPTIONS_PATH", str(DEFAULT_REF_PATH)))
+REF_VALIDATION = os.getenv("REF_VALIDATION", "1") not in ("0", "false", "False", "")
+SENSITIVITY_MAX_CELLS = int(os.getenv("SENSITIVITY_MAX_CELLS", "5000"))
+SENSITIVITY_CACHE_SIZE = int(os.getenv("SENSITIVITY_CACHE_SIZE", "256"))
+
+# /predict/partial : fréquences des codes sur le Parquet d'entraînement (main.py freq-tables),
+# à défaut poids uniformes sur les codes de REF_OPTIONS_PATH ; nombre max de combinaisons scorées
+FREQ_TABLES_PATH = Path(os.getenv("FREQ_TABLES_PATH", str(BASE_DIR / "out" / "catboost_product15_v2_freq_tables.json")))
+MARGINAL_MAX_COMBINATIONS = int(os.getenv("MARGINAL_MAX_COMBINATIONS", "256"))
+
+# ?uncertainty=true : nombre de membres de l'ensemble virtuel (modèles tronqués dans la seconde moitié des arbres)
+VIRTUAL_ENSEMBLES_COUNT = int(os.getenv("VIRTUAL_ENSEMBLES_COUNT", "10"))
+
+# /predict/stream : taille des blocs scorés et longueur max d'une ligne NDJSON
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
 
 
 @dataclass(frozen=True)
@@ -69,18 +209,67 @@ class ModelMeta:
             cat_features=list(obj["cat_features"]),
         )
 
+    def numeric_features(self) -> set[str]:
+        """Features converties en float : les non catégorielles de ce modèle, plus NUMERIC_FIELDS."""
+        cat = set(self.cat_features)
+        return {c for c in self.features if c not in cat or c in NUMERIC_FIELDS}
+
+
+def model_paths() -> Tuple[Path, Path]:
+    return (
+        Path(os.getenv("MODEL_PATH", DEFAULT_MODEL_PATH)),
+        Path(os.getenv("META_PATH", DEFAULT_META_PATH)),
+    )
+
+
+# Backend chargé : predict_proba(lignes) -> (n, 2), describe()
+Model = InferenceBackend
+
+
+def probe_rows(meta: ModelMeta, n: int = PARITY_PROBE_ROWS) -> List[List[Any]]:
+    """Jeu de sonde fixe (graine 0) encodé comme /predict, pour les contrôles de parité."""
+    # champs absents de ref_options.json (ex. minute) : valeur manquante / 0
+    fallback = {f: [MISSING_CAT] if f in meta.cat_features else [0] for f in meta.features}
+    encoder = FeatureEncoder(meta)
+    return [encoder.encode(r) for r in synthetic_records(n, meta.features, seed=0, fallback=fallback)]
 
-def load_model_and_meta() -> Tuple[CatBoostClassifier, ModelMeta]:
-    model_path = Path(os.getenv("MODEL_PATH", DEFAULT_MODEL_PATH))
-    meta_path = Path(os.getenv("META_PATH", DEFAULT_META_PATH))
+
+def load_model_and_meta(
+    model_path: Optional[Path] = None,
+    meta_path: Optional[Path] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[Model, ModelMeta]:
+    """Charge le backend INFERENCE_ENGINE et le meta ; chemins par défaut : model_paths().
+
+    Si `timings` est fourni, y ajoute meta_load_ms, model_load_ms et parity_ms.
+    """
+    default_model, default_meta = model_paths()
+    model_path, meta_path = Path(model_path or default_model), Path(meta_path or default_meta)
+    timings = timings if timings is not None else {}
 
     if not model_path.exists():
         raise FileNotFoundError(f"Modèle .cbm introuvable: {model_path}")
 
+    t0 = time.perf_counter()
     meta = ModelMeta.load(meta_path)
+    timings["meta_load_ms"] = (time.perf_counter() - t0) * 1e3
+
+    if INFERENCE_ENGINE not in BACKENDS:
+        raise ValueError(f"INFERENCE_ENGINE inconnu: {INFERENCE_ENGINE} ({' | '.join(BACKENDS)})")
+    thread_count = INFERENCE_THREADS if INFERENCE_THREAD_COUNT <= 0 else min(INFERENCE_THREAD_COUNT, INFERENCE_THREADS)
+    t0 = time.perf_counter()
+    model = create_backend(INFERENCE_ENGINE, model_path, thread_count)
+    timings["model_load_ms"] = (time.perf_counter() - t0) * 1e3
+    if model.feature_names is not None and model.feature_names != meta.features:
+        raise ValueError(
+            f"Features du modèle {model.feature_names} différentes de meta.json {meta.features}"
+        )
 
-    model = CatBoostClassifier()
-    model.load_model(str(model_path))
+    # backends non natifs : refus de démarrer si les probabilités divergent de CatBoost
+    t0 = time.perf_counter()
+    if model.name != "catboost" and PARITY_PROBE_ROWS > 0:
+        parity_check(model, create_backend("catboost", model_path), probe_rows(meta), PARITY_MAX_ABS_DIFF)
+    timings["parity_ms"] = (time.perf_counter() - t0) * 1e3
     return model, meta
 
 
@@ -91,65 +280,255 @@ def load_model_and_meta() -> Tuple[CatBoostClassifier, ModelMeta]:
 # Defaults facultatifs: complète si tu veux autoriser des champs omis.
 DEFAULTS: Dict[str, Any] = {}
 
-# Champs à forcer en numérique
+# Champs à forcer en numérique, en plus des features non catégorielles du meta (ModelMeta.numeric_features)
 NUMERIC_FIELDS: set[str] = set()
 
 
+def _missing_fields_detail(still_missing: List[str]) -> Dict[str, Any]:
+    return {
+        "error": "Champs manquants",
+        "missing_fields": still_missing,
+        "hint": "Fournis tous les 15 champs, ou définis des DEFAULTS côté API si tu veux autoriser des omissions.",
+    }
+
+
+def _format_detail(field: str, value: Any) -> Dict[str, Any]:
+    return {
+        "error": "Format invalide",
+        "field": field,
+        "value": value,
+        "hint": "Le champ doit être un nombre (format HH:MM non accepté).",
+    }
+
+
+def _numeric_detail(field: str, value: Any) -> Dict[str, Any]:
+    return {
+        "error": "Valeur numérique invalide",
+        "field": field,
+        "value": value,
+        "hint": "Le champ doit être numérique.",
+    }
+
+
+def _invalid_codes_detail(invalid: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "error": "Codes inconnus",
+        "invalid_fields": list(invalid),
+        "values": invalid,
+        "hint": "Utilise les codes de data/ref_options.json.",
+    }
+
+
 def normalize_input(payload: Dict[str, Any], meta: ModelMeta) -> pd.DataFrame:
     missing = [c for c in meta.features if c not in payload]
     if missing:
         can_fill = [c for c in missing if c in DEFAULTS]
         still_missing = [c for c in missing if c not in DEFAULTS]
         if still_missing:
-            raise HTTPException(
-                status_code=422,
-                detail={
-                    "error": "Champs manquants",
-                    "missing_fields": still_missing,
-                    "hint": "Fournis tous les 15 champs, ou définis des DEFAULTS côté API si tu veux autoriser des omissions.",
-                },
-            )
+            raise HTTPException(status_code=422, detail=_missing_fields_detail(still_missing))
         for c in can_fill:
             payload[c] = DEFAULTS[c]
 
     row = {c: payload.get(c, np.nan) for c in meta.features}
     X = pd.DataFrame([row], columns=meta.features).replace({pd.NA: np.nan})
 
-    # catégorielles -> str + token manquant
+    # catégorielles -> code canonique (str) + token manquant
     for c in meta.cat_features:
         if c in X.columns:
-            X[c] = X[c].astype("string").fillna(MISSING_CAT).astype(str)
+            X[c] = reference.canonical_codes(X[c], MISSING_CAT)
 
     # numériques
+    numeric = meta.numeric_features()
     for c in meta.features:
-        if c in NUMERIC_FIELDS:
+        if c in numeric:
             v = X.at[0, c]
             if pd.isna(v):
                 continue
             if isinstance(v, str) and ":" in v:
-                raise HTTPException(
-                    status_code=422,
-                    detail={
-                        "error": "Format invalide",
-                        "field": c,
-                        "value": v,
-                        "hint": "Le champ doit être un nombre (format HH:MM non accepté).",
-                    },
-                )
+                raise HTTPException(status_code=422, detail=_format_detail(c, v))
             try:
                 X[c] = pd.to_numeric(X[c], errors="raise").astype(float)
             except Exception:
+                raise HTTPException(status_code=422, detail=_numeric_detail(c, payload.get(c)))
+
+    return X
+
+
+def _is_missing(v: Any) -> bool:
+    return v is None or v is pd.NA or (isinstance(v, float) and v != v)
+
+
+class FeatureEncoder:
+    """
+    Encodeur compilé une fois depuis ModelMeta : payload dict -> ligne CatBoost.
+
+    Produit la même ligne que normalize_input (catégorielles en code canonique avec MISSING_CAT,
+    meta.numeric_features() en float) et les mêmes 422, sans allouer de DataFrame par requête.
+    Les catégorielles présentes dans REF_CODE_SETS (compilé au démarrage) sont ensuite
+    contrôlées contre la référence : un seul 422 liste tous les codes inconnus.
+    """
+
+    def __init__(self, meta: ModelMeta):
+        cat = set(meta.cat_features)
+        self.features: Tuple[str, ...] = tuple(meta.features)
+        numeric = meta.numeric_features()
+        # (champ, catégorielle ?, numérique ?) dans l'ordre des colonnes du modèle
+        self._plan: Tuple[Tuple[str, bool, bool], ...] = tuple(
+            (c, c in cat, c in numeric) for c in meta.features
+        )
+        self._ref_checks = reference.field_checks(
+            {f: codes for f, codes in REF_CODE_SETS.items() if f in cat}, meta.features
+        )
+
+    def encode(self, payload: Dict[str, Any]) -> List[Any]:
+        still_missing = [c for c in self.features if c not in payload and c not in DEFAULTS]
+        if still_missing:
+            raise HTTPException(status_code=422, detail=_missing_fields_detail(still_missing))
+
+        row: List[Any] = []
+        for c, is_cat, is_num in self._plan:
+            v = payload[c] if c in payload else DEFAULTS[c]
+            if is_cat:
+                v = MISSING_CAT if _is_missing(v) else reference.canonical_code(v)
+            elif _is_missing(v):
+                v = np.nan
+            if is_num and not _is_missing(v):
+                if isinstance(v, str) and ":" in v:
+                    raise HTTPException(status_code=422, detail=_format_detail(c, v))
+                try:
+                    # pd.to_numeric("") donne NaN : même tolérance ici
+                    v = float(v) if not (isinstance(v, str) and not v.strip()) else np.nan
+                except (TypeError, ValueError):
+                    raise HTTPException(status_code=422, detail=_numeric_detail(c, payload.get(c)))
+            row.append(v)
+        if self._ref_checks:
+            invalid = reference.invalid_codes(row, self._ref_checks, MISSING_CAT)
+            if invalid:
                 raise HTTPException(
-                    status_code=422,
-                    detail={
-                        "error": "Valeur numérique invalide",
-                        "field": c,
-                        "value": payload.get(c),
-                        "hint": "Le champ doit être numérique.",
-                    },
+                    status_code=422, detail=_invalid_codes_detail({c: payload.get(c) for c in invalid})
                 )
+        return row
 
-    return X
+
+def normalize_batch(
+    records: List[Dict[str, Any]], meta: ModelMeta
+) -> Tuple[pd.DataFrame, List[int], Dict[int, Dict[str, Any]]]:
+    """
+    Version colonne par colonne de normalize_input pour un lot d'enregistrements.
+
+    Retourne (X, indices valides, erreurs par indice). X ne contient que les lignes
+    valides, dans l'ordre de `indices valides` ; chaque erreur a la même forme que
+    le `detail` d'un 422 de /predict, la ligne fautive n'invalide pas le lot.
+    """
+    errors: Dict[int, Dict[str, Any]] = {}
+
+    # colonnes en dtype object : évite qu'une colonne [1, None] devienne float ("1.0")
+    columns: Dict[str, pd.Series] = {}
+    for c in meta.features:
+        present = [c in r for r in records]
+        values = [r.get(c) if p else DEFAULTS.get(c, np.nan) for r, p in zip(records, present)]
+        columns[c] = pd.Series(values, dtype=object)
+        if c not in DEFAULTS:
+            for i, p in enumerate(present):
+                if not p:
+                    errors.setdefault(i, _missing_fields_detail([]))["missing_fields"].append(c)
+
+    X = pd.DataFrame(columns, columns=meta.features)
+
+    # catégorielles -> code canonique (str) + token manquant
+    for c in meta.cat_features:
+        if c in X.columns:
+            X[c] = reference.canonical_codes(X[c], MISSING_CAT)
+
+    # codes hors référence : un test d'appartenance par colonne, tous les champs fautifs par ligne
+    invalid: Dict[int, Dict[str, Any]] = {}
+    for c in meta.cat_features:
+        if c in REF_CODE_SETS:
+            for i in reference.invalid_rows(X[c], REF_CODE_SETS[c], MISSING_CAT):
+                invalid.setdefault(int(i), {})[c] = records[i].get(c)
+    for i, fields in invalid.items():
+        errors.setdefault(i, _invalid_codes_detail(fields))
+
+    # numériques : une seule conversion par colonne, erreurs reportées ligne à ligne
+    numeric = meta.numeric_features()
+    for c in meta.features:
+        if c in numeric:
+            raw = X[c]
+            as_str = raw.map(lambda v: isinstance(v, str) and ":" in v)
+            try:
+                converted = pd.to_numeric(raw.where(~as_str), errors="coerce").astype(float)
+            except TypeError:
+                # objets JSON (listes, dicts) : conversion élément par élément
+                converted = raw.where(~as_str).map(
+                    lambda v: pd.to_numeric(v, errors="coerce") if np.isscalar(v) else np.nan
+                ).astype(float)
+            bad = raw.notna() & converted.isna()
+            for i in np.flatnonzero(bad.to_numpy()):
+                if i in errors:
+                    continue
+                v = raw.iat[i]
+                errors[i] = _format_detail(c, v) if as_str.iat[i] else _numeric_detail(c, records[i].get(c))
+            X[c] = converted
+
+    valid = [i for i in range(len(records)) if i not in errors]
+    return X.iloc[valid].reset_index(drop=True), valid, errors
+
+
+def normalize_table(
+    table: pa.Table, meta: ModelMeta
+) -> Tuple[pd.DataFrame, List[int], Dict[int, Dict[str, Any]]]:
+    """
+    Version Arrow de normalize_batch : mêmes règles, appliquées colonne par colonne.
+
+    Seules les colonnes de meta.features sont matérialisées (sélection sans copie) ;
+    une colonne absente sans DEFAULTS invalide toute la table (422). Les catégorielles
+    sont converties en str par Arrow (entiers et flottants entiers -> "1") avec
+    MISSING_CAT pour null / NaN.
+    """
+    still_missing = [c for c in columnar.missing_columns(table, meta.features) if c not in DEFAULTS]
+    if still_missing:
+        raise HTTPException(status_code=422, detail=_missing_fields_detail(still_missing))
+    table = columnar.select_columns(table, meta.features)
+    n = table.num_rows
+    cat = set(meta.cat_features)
+    numeric = meta.numeric_features()
+    errors: Dict[int, Dict[str, Any]] = {}
+    invalid: Dict[int, Dict[str, Any]] = {}
+    columns: Dict[str, Any] = {}
+
+    for c in meta.features:
+        col = table.column(c) if c in table.column_names else pa.repeat(DEFAULTS[c], n)
+        if pa.types.is_floating(col.type):
+            # NaN traité comme valeur manquante, comme dans normalize_batch
+            col = pc.if_else(pc.is_nan(col), pa.scalar(None, col.type), col)
+        if c in cat:
+            col = reference.canonical_column(col)
+            columns[c] = pc.fill_null(col, MISSING_CAT).to_numpy(zero_copy_only=False)
+            if c in REF_CODE_SETS:
+                for i in reference.invalid_positions(col, REF_CODE_SETS[c]):
+                    invalid.setdefault(int(i), {})[c] = columns[c][i]
+        elif c in numeric and (pa.types.is_integer(col.type) or pa.types.is_floating(col.type)):
+            columns[c] = pc.cast(col, pa.float64()).to_numpy(zero_copy_only=False)
+        elif c in numeric:
+            raw = col.to_pandas().astype(object)
+            as_str = raw.map(lambda v: isinstance(v, str) and ":" in v)
+            converted = pd.to_numeric(raw.where(~as_str), errors="coerce").astype(float)
+            bad = raw.notna() & converted.isna()
+            for i in np.flatnonzero(bad.to_numpy()):
+                if i not in errors:
+                    v = raw.iat[i]
+                    errors[int(i)] = _format_detail(c, v) if as_str.iat[i] else _numeric_detail(c, v)
+            columns[c] = converted.to_numpy()
+        else:
+            columns[c] = col.to_numpy(zero_copy_only=False)
+
+    for i, fields in invalid.items():
+        errors.setdefault(i, _invalid_codes_detail(fields))
+    X = pd.DataFrame(columns, columns=meta.features)
+    if not errors:
+        return X, list(range(n)), errors
+    valid = [i for i in range(n) if i not in errors]
+    return X.iloc[valid].reset_index(drop=True), valid, errors
 
 
 # -----------------------------
@@ -157,29 +536,367 @@ def normalize_input(payload: Dict[str, Any], meta: ModelMeta) -> pd.DataFrame:
 # -----------------------------
 
 app = FastAPI(title="Accidents — CatBoost product15_v2_time_bucket", version="1.0.0")
+app.add_middleware(MetricsMiddleware)
+
+
+@dataclass(frozen=True)
+class ServingState:
+    """Modèle, meta et encodeur chargés ensemble : remplacés d'un seul bloc au rechargement.
+
+    Chaque requête lit STATE une seule fois et n'utilise que cet instantané, donc
+    ne voit jamais un modèle avec le meta d'un autre.
+    """
+
+    model: Model
+    meta: ModelMeta
+    encoder: FeatureEncoder
+    fingerprint: str
+    early_exit: Optional[EarlyExitPredictor] = None
+    # durées de chargement (ms) : meta_load_ms, model_load_ms, parity_ms, validation_ms
+    timings: Dict[str, float] = field(default_factory=dict, compare=False)
+
+    def predict_rows(self, rows: List[List[Any]]) -> List[Tuple[float, bool]]:
+        """[(proba, approximative)] par ligne, via l'early-exit s'il est activé."""
+        with INFERENCE_BUDGET, metrics.model_call("predict", len(rows)):
+            if self.early_exit is not None:
+                return self.early_exit.predict(rows)
+            return [(p, False) for p in self.model.predict_proba(rows)[:, 1].tolist()]
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilité de la classe 1, dans le budget de threads partagé."""
+        with INFERENCE_BUDGET, metrics.model_call("predict", len(X)):
+            return self.model.predict_proba(X)[:, 1]
+
+    def shap_values(self, rows: List[List[Any]]) -> np.ndarray:
+        """SHAP (n, n_features + 1) en un appel ; NotImplementedError si le backend ne le permet pas."""
+        with INFERENCE_BUDGET, metrics.model_call("shap", len(rows)):
+            return self.model.shap_values(rows)
+
+    def virtual_ensembles(self, X: Any, count: int) -> np.ndarray:
+        """Proba de la classe 1 par membre d'ensemble virtuel, (n, count), en un seul appel."""
+        with INFERENCE_BUDGET, metrics.model_call("virtual_ensembles", len(X)):
+            logits = self.model.virtual_ensembles(X, count)
+        return 1.0 / (1.0 + np.exp(-logits))
 
-MODEL: Optional[CatBoostClassifier] = None
-META: Optional[ModelMeta] = None
+
+def build_state(model_path: Optional[Path] = None, meta_path: Optional[Path] = None) -> ServingState:
+    """Charge, chauffe et valide un modèle sur la sonde ; ValueError si ses probabilités sont invalides."""
+    default_model, default_meta = model_paths()
+    model_path, meta_path = Path(model_path or default_model), Path(meta_path or default_meta)
+    # empreinte avant chargement : une écriture concurrente sera vue par le prochain rechargement
+    fingerprint = file_fingerprint(model_path, meta_path)
+    timings: Dict[str, float] = {}
+    model, meta = load_model_and_meta(model_path, meta_path, timings)
+    early_exit = EarlyExitPredictor(model, meta.threshold, EARLY_EXIT_STAGES) if EARLY_EXIT else None
+    state = ServingState(model, meta, FeatureEncoder(meta), fingerprint, early_exit, timings)
+
+    t0 = time.perf_counter()
+    probe = probe_rows(meta, max(PARITY_PROBE_ROWS, 1))
+    # sondes dans le budget de threads partagé : un rechargement a lieu pendant le trafic
+    with INFERENCE_BUDGET:
+        model.predict_proba(probe[:1])
+        probas = model.predict_proba(probe)[:, 1]
+        if not np.all(np.isfinite(probas)) or probas.min() < 0.0 or probas.max() > 1.0:
+            raise ValueError(f"Probabilités invalides sur la sonde ({len(probe)} lignes) pour {model_path.name}")
+        if early_exit is not None:
+            early_exit.calibrate(probe[0])
+    timings["validation_ms"] = (time.perf_counter() - t0) * 1e3
+    return state
+
+
+def warm_up(
+    state: ServingState, batch_sizes: Optional[List[int]] = None, rounds: Optional[int] = None
+) -> Dict[str, Dict[str, float]]:
+    """Prédictions synthétiques par taille de lot (encodeur, normalize_batch, inférence).
+
+    Renvoie {taille: {"first_ms", "last_ms"}} : écart entre la première passe (froide)
+    et la dernière. N'alimente ni le cache ni les statistiques des endpoints.
+    Défauts : WARMUP_BATCH_SIZES, WARMUP_ROUNDS.
+    """
+    batch_sizes = WARMUP_BATCH_SIZES if batch_sizes is None else batch_sizes
+    rounds = WARMUP_ROUNDS if rounds is None else rounds
+    fallback = {f: [MISSING_CAT] if f in state.meta.cat_features else [0] for f in state.meta.features}
+    report: Dict[str, Dict[str, float]] = {}
+    for size in batch_sizes:
+        records = synthetic_records(size, state.meta.features, seed=size, fallback=fallback)
+        runs = []
+        for _ in range(max(1, rounds)):
+            t0 = time.perf_counter()
+            rows = [state.encoder.encode(r) for r in records]
+            state.predict_proba(rows)
+            X, _, _ = normalize_batch([dict(r) for r in records], state.meta)
+            state.predict_proba(X)
+            runs.append((time.perf_counter() - t0) * 1e3)
+        report[str(size)] = {"first_ms": runs[0], "last_ms": runs[-1]}
+    return report
+
+
+def build_registry() -> ModelRegistry:
+    """Registre MODEL_REGISTRY ; par défaut, MAIN_MODEL_NAME suit model_paths() (lu à l'appel)."""
+    spec = MODEL_REGISTRY
+    if not spec:
+        model_path, meta_path = model_paths()
+        spec = f"{MAIN_MODEL_NAME}={model_path},{meta_path};{DEFAULT_REGISTRY}"
+    return ModelRegistry(
+        parse_registry(spec),
+        lambda s: build_state(s.model_path, s.meta_path),
+        MODEL_REGISTRY_MAX_LOADED,
+    )
+
+
+STATE: Optional[ServingState] = None
+READY = threading.Event()
+# détail du démarrage (ms) : import, meta, modèle, parité, validation, chauffe
+STARTUP: Dict[str, Any] = {}
+INFERENCE_BUDGET = ThreadBudget(
+    INFERENCE_THREADS, INFERENCE_THREADS if INFERENCE_THREAD_COUNT <= 0 else INFERENCE_THREAD_COUNT
+)
+# reconstruit au démarrage : MODEL_PATH / META_PATH y sont relus
+REGISTRY = build_registry()
+BATCHER: Optional[MicroBatcher] = None
+WATCHER: Optional[FileWatcher] = None
+PREDICT_CACHE = LRUCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_S)
+EXPLAIN_CACHE = LRUCache(EXPLAIN_CACHE_SIZE, EXPLAIN_CACHE_TTL_S)
+SENSITIVITY_CACHE = LRUCache(SENSITIVITY_CACHE_SIZE, PREDICT_CACHE_TTL_S)
+# {champ: [codes]} de REF_OPTIONS_PATH, chargé au démarrage
+REF_CODES: Dict[str, List[Any]] = {}
+# codes acceptés par champ (vide : pas de contrôle), compilés au démarrage depuis REF_CODES
+REF_CODE_SETS: reference.CodeSets = {}
+# tables de fréquences de FREQ_TABLES_PATH (vide si le fichier est absent), chargées au démarrage
+FREQ_TABLES: marginal.FrequencyTables = {}
+
+_RELOAD_LOCK = threading.Lock()
+RELOAD_STATS: Dict[str, Any] = {
+    "reloads": 0,
+    "failures": 0,
+    "last_duration_ms": None,
+    "last_reload_at": None,
+    "last_error": None,
+}
+
+
+def _predict_items(items: List[Tuple[ServingState, List[Any]]]) -> List[Tuple[float, bool]]:
+    """predict_fn du micro-batcher : chaque ligne est évaluée par l'état qui l'a encodée."""
+    out: List[Optional[Tuple[float, bool]]] = [None] * len(items)
+    groups: Dict[int, List[int]] = {}
+    for i, (state, _) in enumerate(items):
+        groups.setdefault(id(state), []).append(i)
+    for idx in groups.values():
+        state = items[idx[0]][0]
+        for i, r in zip(idx, state.predict_rows([items[i][1] for i in idx])):
+            out[i] = r
+    return out
+
+
+def reload_model() -> Dict[str, Any]:
+    """Charge le modèle en arrière-plan puis bascule STATE ; en cas d'échec l'ancien reste servi."""
+    global STATE
+    with _RELOAD_LOCK:
+        t0 = time.perf_counter()
+        previous = STATE
+        try:
+            new = build_state()
+            warm_up(new)
+        except Exception as e:
+            RELOAD_STATS["failures"] += 1
+            RELOAD_STATS["last_error"] = f"{type(e).__name__}: {e}"
+            raise
+
+        drift = None
+        if previous is not None and previous.meta.features == new.meta.features:
+            probe = probe_rows(new.meta, max(PARITY_PROBE_ROWS, 1))
+            # dans le budget de threads partagé : le trafic continue d'être servi
+            drift = float(np.abs(previous.predict_proba(probe) - new.predict_proba(probe)).max())
+
+        STATE = new  # une seule affectation : bascule atomique
+        READY.set()  # new est déjà chauffé
+        if previous is not None and previous.fingerprint != new.fingerprint:
+            PREDICT_CACHE.clear()
+            EXPLAIN_CACHE.clear()
+            SENSITIVITY_CACHE.clear()
+
+        duration_ms = (time.perf_counter() - t0) * 1e3
+        RELOAD_STATS["reloads"] += 1
+        RELOAD_STATS["last_duration_ms"] = duration_ms
+        RELOAD_STATS["last_reload_at"] = time.time()
+        RELOAD_STATS["last_error"] = None
+        return {
+            "status": "reloaded",
+            "model_fingerprint": new.fingerprint,
+            "previous_fingerprint": previous.fingerprint if previous is not None else None,
+            "duration_ms": duration_ms,
+            "probe_max_abs_diff_vs_previous": drift,
+        }
+
+
+def _warm_up_startup(state: ServingState) -> None:
+    t0 = time.perf_counter()
+    try:
+        report = warm_up(state)
+    except Exception as e:  # reste non prêt : /ready expose l'erreur
+        STARTUP["warmup_error"] = f"{type(e).__name__}: {e}"
+        return
+    if STATE is not state:  # redémarré ou rechargé entre-temps
+        return
+    STARTUP["warmup"] = report
+    STARTUP["warmup_ms"] = (time.perf_counter() - t0) * 1e3
+    STARTUP["total_ms"] = STARTUP["import_ms"] + STARTUP["load_ms"] + STARTUP["warmup_ms"]
+    READY.set()
+
+
+def load_reference_codes() -> None:
+    """
+    Charge REF_CODES depuis REF_OPTIONS_PATH et compile REF_CODE_SETS (si REF_VALIDATION).
+
+    Appelé au démarrage de l'API et dans chaque worker de `main.py score` : les mêmes
+    codes inconnus sont refusés en ligne et hors ligne.
+    """
+    REF_CODES.clear()
+    REF_CODES.update(load_codes(REF_OPTIONS_PATH))
+    REF_CODE_SETS.clear()
+    if REF_VALIDATION:
+        REF_CODE_SETS.update(reference.compile_code_sets(REF_CODES))
 
 
 @app.on_event("startup")
 def _startup() -> None:
-    global MODEL, META
-    MODEL, META = load_model_and_meta()
+    global STATE, BATCHER, WATCHER, REGISTRY
+    READY.clear()
+    STARTUP.clear()
+    STARTUP["import_ms"] = IMPORT_MS
+    t0 = time.perf_counter()
+    fingerprint = STATE.fingerprint if STATE is not None else None
+    # référence compilée avant le modèle : l'encodeur de build_state en reprend les champs
+    load_reference_codes()
+    STATE = build_state()
+    REGISTRY = build_registry()
+    if STATE.fingerprint != fingerprint:
+        PREDICT_CACHE.clear()
+        EXPLAIN_CACHE.clear()
+        SENSITIVITY_CACHE.clear()
+    FREQ_TABLES.clear()
+    if FREQ_TABLES_PATH.exists():
+        FREQ_TABLES.update(marginal.load_frequency_tables(FREQ_TABLES_PATH))
+    load_ms = (time.perf_counter() - t0) * 1e3
+    STARTUP.update(STATE.timings, load_ms=load_ms)
+    RELOAD_STATS["last_duration_ms"] = load_ms
+    RELOAD_STATS["last_reload_at"] = time.time()
+    # l'API répond pendant la chauffe ; /ready passe à 200 une fois terminée
+    threading.Thread(target=_warm_up_startup, args=(STATE,), name="warm-up", daemon=True).start()
+    if MICROBATCH:
+        BATCHER = MicroBatcher(_predict_items, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS).start()
+    if MODEL_WATCH_INTERVAL_S > 0:
+        WATCHER = FileWatcher(model_paths(), MODEL_WATCH_INTERVAL_S, reload_model).start()
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    global BATCHER, WATCHER
+    if WATCHER is not None:
+        WATCHER.stop()
+        WATCHER = None
+    if BATCHER is not None:
+        BATCHER.stop()
+        BATCHER = None
 
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
-    if MODEL is None or META is None:
+    state = STATE
+    if state is None:
         return {"status": "loading"}
     return {
         "status": "ok",
-        "model_name": META.model_name,
-        "threshold": META.threshold,
-        "n_features": len(META.features),
+        "ready": READY.is_set(),
+        "startup": STARTUP,
+        "model_name": state.meta.model_name,
+        "threshold": state.meta.threshold,
+        "n_features": len(state.meta.features),
+        "model_fingerprint": state.fingerprint,
+        "backend": state.model.describe(),
+        "reload": {**RELOAD_STATS, "watch_interval_s": MODEL_WATCH_INTERVAL_S},
+        "batching": BATCHER.stats() if BATCHER is not None else {"enabled": False},
+        "cache": PREDICT_CACHE.stats(),
+        "explain_cache": EXPLAIN_CACHE.stats(),
+        "sensitivity_cache": SENSITIVITY_CACHE.stats(),
+        "reference": {
+            "validation": bool(REF_CODE_SETS),
+            "fields": sorted(REF_CODE_SETS),
+            "n_codes": sum(len(codes) for codes in REF_CODE_SETS.values()),
+        },
+        "marginal": {
+            "freq_tables": str(FREQ_TABLES_PATH) if FREQ_TABLES else None,
+            "fields": sorted(FREQ_TABLES),
+            "max_combinations": MARGINAL_MAX_COMBINATIONS,
+        },
+        "early_exit": state.early_exit.stats() if state.early_exit is not None else {"enabled": False},
+        "uncertainty": {"virtual_ensembles_count": VIRTUAL_ENSEMBLES_COUNT},
+        "inference_budget": INFERENCE_BUDGET.stats(),
+        "tuning": {"path": str(TUNING_PATH) if TUNING else None,
+                   **{k: TUNING.get(k) for k in ("workers", "thread_count", "batch_size", "created_at")}},
     }
 
 
+@app.get("/ready")
+def ready() -> Dict[str, Any]:
+    """Readiness : 200 seulement une fois le modèle chargé et chauffé."""
+    if STATE is None or not READY.is_set():
+        raise HTTPException(
+            status_code=503,
+            detail={"ready": False, "status": "loading" if STATE is None else "warming",
+                    "error": STARTUP.get("warmup_error")},
+        )
+    return {"ready": True, "warmup_ms": STARTUP.get("warmup_ms")}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Format texte Prometheus : étapes, requêtes par statut (dont 422 / 503), cache, micro-batching."""
+    cache = PREDICT_CACHE.stats()
+    explain_cache = EXPLAIN_CACHE.stats()
+    extra = [
+        *metrics.sample_lines("predictor_cache_hits_total", "Prédictions servies par le cache", cache["hits"], "counter"),
+        *metrics.sample_lines("predictor_cache_misses_total", "Prédictions absentes du cache", cache["misses"], "counter"),
+        *metrics.sample_lines("predictor_cache_entries", "Entrées du cache de prédictions", cache["size"]),
+        *metrics.sample_lines("predictor_explain_cache_hits_total", "Explications servies par le cache",
+                              explain_cache["hits"], "counter"),
+        *metrics.sample_lines("predictor_explain_cache_misses_total", "Explications absentes du cache",
+                              explain_cache["misses"], "counter"),
+        *metrics.sample_lines("predictor_ready", "1 si le modèle est chargé et chauffé", float(READY.is_set())),
+        *metrics.sample_lines("predictor_reloads_total", "Rechargements à chaud réussis", RELOAD_STATS["reloads"], "counter"),
+    ]
+    if BATCHER is not None:
+        batching = BATCHER.stats()
+        extra += metrics.sample_lines("predictor_batcher_queue_depth", "Lignes en attente du micro-batcher",
+                                      batching["queue_depth"])
+        extra += metrics.sample_lines("predictor_batcher_batches_total", "Lots exécutés par le micro-batcher",
+                                      batching["batches"], "counter")
+    return PlainTextResponse(
+        metrics.render(metrics.REQUESTS, metrics.STAGE_SECONDS, metrics.MODEL_CALL_SECONDS, metrics.MODEL_ROWS,
+                       extra_lines=extra),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.post("/admin/reload")
+def admin_reload(x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    if not ADMIN_TOKEN:
+        # sans jeton configuré, n'importe quel client pourrait forcer un rechargement + chauffe
+        raise HTTPException(status_code=403, detail="Rechargement désactivé : définir ADMIN_TOKEN côté API.")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Jeton admin invalide (en-tête X-Admin-Token).")
+    try:
+        return reload_model()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Rechargement refusé, le modèle courant reste servi",
+                "reason": f"{type(e).__name__}: {e}",
+            },
+        ) from e
+
+
 class PredictRequest(BaseModel):
     data: Dict[str, Any] = Field(..., description="Dictionnaire des 15 champs utilisateur")
 
@@ -189,18 +906,635 @@ class PredictResponse(BaseModel):
     pred_class: int
     label: str
     threshold: float
+    # True si l'early-exit a conclu avant le dernier arbre : classe exacte, proba approchée
+    approximate: bool = False
+    # ?uncertainty=true : moyenne et variance de la proba sur les membres de l'ensemble virtuel
+    proba_mean: Optional[float] = None
+    proba_var: Optional[float] = None
+
+
+class PredictBatchRequest(BaseModel):
+    data: List[Dict[str, Any]] = Field(..., description="Liste d'enregistrements de 15 champs utilisateur")
+
+
+class PredictBatchItem(BaseModel):
+    index: int
+    proba: Optional[float] = None
+    pred_class: Optional[int] = None
+    label: Optional[str] = None
+    proba_mean: Optional[float] = None
+    proba_var: Optional[float] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+class PredictBatchResponse(BaseModel):
+    threshold: float
+    n_ok: int
+    n_errors: int
+    results: List[PredictBatchItem]
+
+
+def _label(pred_class: int) -> str:
+    return "grave" if pred_class == 1 else "non_grave"
+
+
+def _uncertainty(state: ServingState, X: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(proba, moyenne, variance) par ligne d'un seul appel d'ensemble virtuel.
+
+    Le dernier membre est le modèle complet : sa proba est celle de /predict.
+    """
+    with stage("inference"):
+        try:
+            members = state.virtual_ensembles(X, VIRTUAL_ENSEMBLES_COUNT)
+        except NotImplementedError as e:
+            raise HTTPException(
+                status_code=501,
+                detail={"error": "Incertitude indisponible", "backend": state.model.name, "reason": str(e)},
+            ) from e
+    return members[:, -1], members.mean(axis=1), members.var(axis=1)
+
+
+def _predict_uncertain(state: ServingState, data: Dict[str, Any]) -> PredictResponse:
+    with stage("encode"):
+        row = state.encoder.encode(data)
+    proba, mean, var = _uncertainty(state, [row])
+    threshold = float(state.meta.threshold)
+    pred_class = int(proba[0] >= threshold)
+    return PredictResponse(proba=float(proba[0]), pred_class=pred_class, label=_label(pred_class),
+                           threshold=threshold, proba_mean=float(mean[0]), proba_var=float(var[0]))
+
+
+def _predict_one(state: ServingState, data: Dict[str, Any], uncertainty: bool = False) -> PredictResponse:
+    if uncertainty:
+        return _predict_uncertain(state, data)
+    with stage("encode"):
+        row = state.encoder.encode(data)
+
+    # clé canonique : la ligne encodée (1 et "1" donnent "1") + empreinte du modèle
+    key = (state.fingerprint, tuple(row))
+    with stage("cache"):
+        cached = PREDICT_CACHE.get(key)
+    if cached is None:
+        with stage("inference"):
+            if BATCHER is not None:
+                cached = BATCHER.predict((state, row))
+            else:
+                cached = state.predict_rows([row])[0]
+        PREDICT_CACHE.put(key, cached)
+    proba, approximate = cached
+    threshold = float(state.meta.threshold)
+    pred_class = int(proba >= threshold)
+    label = _label(pred_class)
+
+    return PredictResponse(proba=proba, pred_class=pred_class, label=label, threshold=threshold,
+                           approximate=approximate)
 
 
 @app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest) -> PredictResponse:
-    if MODEL is None or META is None:
+@timed_handler
+def predict(req: PredictRequest, uncertainty: bool = False) -> PredictResponse:
+    state = STATE
+    if state is None:
         raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    return _predict_one(state, req.data, uncertainty)
 
-    X = normalize_input(dict(req.data), META)
 
-    proba = float(MODEL.predict_proba(X)[0, 1])
-    threshold = float(META.threshold)
-    pred_class = int(proba >= threshold)
-    label = "grave" if pred_class == 1 else "non_grave"
+def _registry_state(name: str) -> ServingState:
+    """État du modèle `name` ; le modèle principal (MODEL_PATH/META_PATH) réutilise STATE."""
+    try:
+        spec = REGISTRY.spec(name)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": f"Modèle inconnu: {name}", "models": REGISTRY.names()},
+        ) from None
+    if STATE is not None and (spec.model_path, spec.meta_path) == model_paths():
+        return STATE
+    try:
+        return REGISTRY.get(name)
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"error": f"Modèle {name} indisponible", "reason": f"{type(e).__name__}: {e}"},
+        ) from e
+
+
+@app.get("/models")
+def list_models() -> Dict[str, Any]:
+    return REGISTRY.stats()
+
+
+@app.post("/models/{name}/predict", response_model=PredictResponse)
+@timed_handler
+def predict_model(name: str, req: PredictRequest, uncertainty: bool = False) -> PredictResponse:
+    state = _registry_state(name)
+    t0 = time.perf_counter()
+    response = _predict_one(state, req.data, uncertainty)
+    REGISTRY.record(name, (time.perf_counter() - t0) * 1e3)
+    return response
+
+
+@app.post("/predict_batch", response_model=PredictBatchResponse)
+@timed_handler
+def predict_batch(req: PredictBatchRequest, uncertainty: bool = False) -> PredictBatchResponse:
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    if len(req.data) > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Lot trop volumineux",
+                "n_rows": len(req.data),
+                "max_rows": MAX_BATCH_ROWS,
+                "hint": "Découpe le lot ou augmente MAX_BATCH_ROWS côté API.",
+            },
+        )
+
+    with stage("encode"):
+        X, valid, errors = normalize_batch([dict(r) for r in req.data], state.meta)
+    threshold = float(state.meta.threshold)
+
+    # un seul predict_proba (ou un seul appel d'ensemble virtuel) pour toutes les lignes valides
+    means: List[Optional[float]] = [None] * len(valid)
+    variances: List[Optional[float]] = [None] * len(valid)
+    if uncertainty and valid:
+        probas, mean, var = _uncertainty(state, X)
+        means, variances = mean.tolist(), var.tolist()
+    else:
+        with stage("inference"):
+            probas = state.predict_proba(X) if valid else np.empty(0)
+
+    results: List[PredictBatchItem] = [PredictBatchItem(index=i, error=e) for i, e in errors.items()]
+    for i, p, m, v in zip(valid, probas, means, variances):
+        pred_class = int(p >= threshold)
+        results.append(
+            PredictBatchItem(index=i, proba=float(p), pred_class=pred_class, label=_label(pred_class),
+                             proba_mean=m, proba_var=v)
+        )
+    results.sort(key=lambda r: r.index)
+
+    return PredictBatchResponse(
+        threshold=threshold, n_ok=len(valid), n_errors=len(errors), results=results
+    )
+
+
+class ExplainRequest(PredictRequest):
+    top_k: Optional[int] = Field(None, ge=1, description="Nombre de contributions renvoyées (toutes si absent)")
+
+
+class ExplainBatchRequest(PredictBatchRequest):
+    top_k: Optional[int] = Field(None, ge=1, description="Nombre de contributions renvoyées par ligne")
+
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: Any
+    # contribution au logit (somme des contributions + base_value = logit de la proba)
+    shap: float
+
+
+class ExplainResponse(BaseModel):
+    proba: float
+    pred_class: int
+    label: str
+    threshold: float
+    base_value: float
+    contributions: List[FeatureContribution]
+
+
+class ExplainBatchItem(BaseModel):
+    index: int
+    proba: Optional[float] = None
+    pred_class: Optional[int] = None
+    label: Optional[str] = None
+    base_value: Optional[float] = None
+    contributions: Optional[List[FeatureContribution]] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+class ExplainBatchResponse(BaseModel):
+    threshold: float
+    n_ok: int
+    n_errors: int
+    results: List[ExplainBatchItem]
+
+
+def _shap_rows(state: ServingState, rows: List[List[Any]]) -> List[np.ndarray]:
+    """SHAP par ligne ; les lignes absentes du cache sont calculées en un seul appel."""
+    keys = [(state.fingerprint, tuple(row)) for row in rows]
+    with stage("cache"):
+        values: List[Optional[np.ndarray]] = [EXPLAIN_CACHE.get(k) for k in keys]
+    missing = [i for i, v in enumerate(values) if v is None]
+    if missing:
+        with stage("shap"):
+            try:
+                computed = state.shap_values([rows[i] for i in missing])
+            except NotImplementedError as e:
+                raise HTTPException(
+                    status_code=501,
+                    detail={"error": "Explications indisponibles", "backend": state.model.name, "reason": str(e)},
+                ) from e
+        for i, shap in zip(missing, computed):
+            values[i] = shap
+            EXPLAIN_CACHE.put(keys[i], shap)
+    return values  # type: ignore[return-value]
+
+
+def _explanation(state: ServingState, row: List[Any], shap: np.ndarray, top_k: Optional[int]) -> Dict[str, Any]:
+    """Proba (logit = base + somme des SHAP) et contributions triées par |SHAP| décroissant."""
+    base_value = float(shap[-1])
+    proba = float(1.0 / (1.0 + np.exp(-(base_value + shap[:-1].sum()))))
+    pred_class = int(proba >= float(state.meta.threshold))
+    order = np.argsort(-np.abs(shap[:-1]), kind="stable")[:top_k]
+    features = state.meta.features
+    row = [v.item() if isinstance(v, np.generic) else v for v in row]
+    return {
+        "proba": proba,
+        "pred_class": pred_class,
+        "label": _label(pred_class),
+        "base_value": base_value,
+        "contributions": [
+            FeatureContribution(feature=features[j], value=None if _is_missing(row[j]) else row[j],
+                                shap=float(shap[j]))
+            for j in order
+        ],
+    }
+
+
+@app.post("/explain", response_model=ExplainResponse)
+@timed_handler
+def explain(req: ExplainRequest) -> ExplainResponse:
+    """Contributions SHAP de chaque feature à la prédiction (échelle logit)."""
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    with stage("encode"):
+        row = state.encoder.encode(req.data)
+    shap = _shap_rows(state, [row])[0]
+    return ExplainResponse(threshold=float(state.meta.threshold), **_explanation(state, row, shap, req.top_k))
+
+
+@app.post("/explain_batch", response_model=ExplainBatchResponse)
+@timed_handler
+def explain_batch(req: ExplainBatchRequest) -> ExplainBatchResponse:
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    if len(req.data) > EXPLAIN_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Lot trop volumineux",
+                "n_rows": len(req.data),
+                "max_rows": EXPLAIN_MAX_ROWS,
+                "hint": "Découpe le lot ou augmente EXPLAIN_MAX_ROWS côté API.",
+            },
+        )
+
+    with stage("encode"):
+        X, valid, errors = normalize_batch([dict(r) for r in req.data], state.meta)
+        rows = [list(r) for r in X.itertuples(index=False)]
+    shaps = _shap_rows(state, rows) if rows else []
+
+    results: List[ExplainBatchItem] = [ExplainBatchItem(index=i, error=e) for i, e in errors.items()]
+    for i, row, shap in zip(valid, rows, shaps):
+        results.append(ExplainBatchItem(index=i, **_explanation(state, row, shap, req.top_k)))
+    results.sort(key=lambda r: r.index)
+    return ExplainBatchResponse(
+        threshold=float(state.meta.threshold), n_ok=len(valid), n_errors=len(errors), results=results
+    )
+
+
+class PartialPredictResponse(PredictResponse):
+    # dispersion (écart-type pondéré) et bornes des probas sur les combinaisons scorées
+    spread: float
+    proba_min: float
+    proba_max: float
+    marginalized_fields: List[str]
+    n_combinations: int
+    # masse de probabilité couverte par les combinaisons scorées (1.0 si exhaustif)
+    coverage: float
+    # par champ marginalisé : "frequencies" (FREQ_TABLES_PATH) ou "uniform" (codes de référence)
+    weights_source: Dict[str, str]
+
+
+def _marginal_table(field: str) -> Tuple[Tuple[List[str], List[float]], str]:
+    # table de fréquences vide (aucune ligne non nulle pour ce champ) -> repli uniforme ;
+    # liste de codes vide si le champ n'a pas non plus d'options de référence
+    if FREQ_TABLES.get(field, ([], []))[0]:
+        return FREQ_TABLES[field], "frequencies"
+    return marginal.normalize_counts({str(c): 1.0 for c in REF_CODES.get(field, [])}), "uniform"
+
+
+@app.post("/predict/partial", response_model=PartialPredictResponse)
+@timed_handler
+def predict_partial(req: PredictRequest) -> PartialPredictResponse:
+    """
+    Prédiction avec champs inconnus (absents ou null) : leurs combinaisons de codes les plus
+    probables (au plus MARGINAL_MAX_COMBINATIONS, champs supposés indépendants) sont scorées
+    en un seul appel, la proba renvoyée est la moyenne pondérée par leurs fréquences.
+    """
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    features = state.meta.features
+    unknown = [f for f in features if _is_missing(req.data.get(f)) and f not in DEFAULTS]
+    tables, sources = {}, {}
+    for f in unknown:
+        tables[f], sources[f] = _marginal_table(f)
+    not_marginalizable = [f for f in unknown if not tables[f][0]]
+    if not_marginalizable:
+        raise HTTPException(
+            status_code=422,
+            detail={**_missing_fields_detail(not_marginalizable),
+                    "hint": "Champs sans fréquences ni options de référence : à fournir."},
+        )
+
+    with stage("encode"):
+        base = state.encoder.encode({**req.data, **{f: None for f in unknown}})
+        combos, weights, coverage = marginal.top_combinations(unknown, tables, MARGINAL_MAX_COMBINATIONS)
+        positions = [features.index(f) for f in unknown]
+        numeric_features = state.meta.numeric_features()
+        numeric = [f in numeric_features and f not in state.meta.cat_features for f in unknown]
+        rows: List[List[Any]] = []
+        for combo in combos:
+            row = list(base)
+            for pos, code, is_num in zip(positions, combo, numeric):
+                row[pos] = float(code) if is_num else code
+            rows.append(row)
+
+    with stage("inference"):
+        probas = state.predict_proba(rows)
+    summary = marginal.weighted_summary(np.asarray(probas, dtype=float), weights)
+    threshold = float(state.meta.threshold)
+    pred_class = int(summary["proba"] >= threshold)
+    return PartialPredictResponse(
+        **summary,
+        pred_class=pred_class,
+        label=_label(pred_class),
+        threshold=threshold,
+        marginalized_fields=unknown,
+        n_combinations=len(combos),
+        coverage=coverage,
+        weights_source=sources,
+    )
+
+
+class SensitivityRequest(PredictRequest):
+    fields: List[str] = Field(..., min_length=1, max_length=2,
+                              description="Un champ (courbe) ou deux champs (grille) à balayer")
+
+
+class SensitivityAxis(BaseModel):
+    field: str
+    codes: List[Any]
+    # position du code du scénario de base dans `codes` (None s'il n'y figure pas)
+    base_index: Optional[int] = None
+
+
+class SensitivityResponse(BaseModel):
+    threshold: float
+    base_proba: float
+    axes: List[SensitivityAxis]
+    # 1 champ : proba par code ; 2 champs : probas[i][j] pour codes[i] du 1er et codes[j] du 2nd
+    probas: Union[List[float], List[List[float]]]
+
+
+@app.post("/sensitivity", response_model=SensitivityResponse)
+@timed_handler
+def sensitivity(req: SensitivityRequest) -> SensitivityResponse:
+    """Probabilités du scénario `data` pour chaque code des champs `fields` (une seule inférence)."""
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    fields = list(req.fields)
+    if len(set(fields)) != len(fields):
+        raise HTTPException(status_code=422, detail={"error": "Champs en double", "fields": fields})
+    unknown = [f for f in fields if f not in state.meta.features or f not in REF_CODES]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "Champs non balayables",
+                "fields": unknown,
+                "hint": "Choisis des champs du modèle ayant des options dans ref_options.json.",
+            },
+        )
+    n_cells = int(np.prod([len(REF_CODES[f]) for f in fields]))
+    if n_cells > SENSITIVITY_MAX_CELLS:
+        raise HTTPException(
+            status_code=413,
+            detail={"error": "Grille trop grande", "n_cells": n_cells, "max_cells": SENSITIVITY_MAX_CELLS},
+        )
+
+    with stage("encode"):
+        base = state.encoder.encode(req.data)
+    positions = [state.meta.features.index(f) for f in fields]
+
+    key = (state.fingerprint, tuple(base), tuple(fields))
+    with stage("cache"):
+        cached = SENSITIVITY_CACHE.get(key)
+    if cached is None:
+        with stage("encode"):
+            # valeur encodée de chaque code, une fois par champ (pas par case de la grille),
+            # seulement en cas de défaut de cache
+            encoded = [[state.encoder.encode({**req.data, f: code})[pos] for code in REF_CODES[f]]
+                       for f, pos in zip(fields, positions)]
+            base_indices = [values.index(base[pos]) if base[pos] in values else None
+                            for pos, values in zip(positions, encoded)]
+            rows: List[List[Any]] = [base]
+            for combo in itertools.product(*encoded):
+                row = list(base)
+                for pos, value in zip(positions, combo):
+                    row[pos] = value
+                rows.append(row)
+        with stage("inference"):
+            probas = state.predict_proba(rows)
+        cached = (float(probas[0]), probas[1:].reshape([len(e) for e in encoded]).tolist(), base_indices)
+        SENSITIVITY_CACHE.put(key, cached)
+    base_proba, grid, base_indices = cached
+
+    axes = [
+        SensitivityAxis(field=f, codes=REF_CODES[f], base_index=i)
+        for f, i in zip(fields, base_indices)
+    ]
+    return SensitivityResponse(threshold=float(state.meta.threshold), base_proba=base_proba, axes=axes, probas=grid)
+
+
+def score_table(
+    table: pa.Table,
+    meta: ModelMeta,
+    predict_proba: Callable[[pd.DataFrame], np.ndarray],
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[pa.Table, int]:
+    """
+    Table de résultats (proba, pred_class, label, error), une ligne par ligne de `table`.
+
+    Partagé par /predict/arrow et `main.py score` : mêmes règles de normalisation, mêmes
+    scores en ligne et hors ligne. `predict_proba` renvoie la proba de la classe 1.
+    Si `timings` est fourni, y ajoute encode_ms et inference_ms. Renvoie aussi le
+    nombre de lignes invalides.
+    """
+    timings = timings if timings is not None else {}
+    n = table.num_rows
+    t0 = time.perf_counter()
+    with stage("encode"):
+        X, valid, errors = normalize_table(table, meta)
+    t1 = time.perf_counter()
+    with stage("inference"):
+        probas = predict_proba(X) if valid else np.empty(0)
+    timings["encode_ms"] = (t1 - t0) * 1e3
+    timings["inference_ms"] = (time.perf_counter() - t1) * 1e3
+
+    threshold = float(meta.threshold)
+    proba = np.full(n, np.nan)
+    proba[valid] = probas
+    invalid = np.ones(n, dtype=bool)
+    invalid[valid] = False
+    pred_class = pa.array((proba >= threshold).astype(np.int8), mask=invalid)
+    error: List[Optional[str]] = [None] * n
+    for i, e in errors.items():
+        error[i] = json.dumps(e, ensure_ascii=False)
+    result = pa.table({
+        "proba": pa.array(proba, mask=invalid),
+        "pred_class": pred_class,
+        "label": pc.take(pa.array([_label(0), _label(1)]), pred_class),
+        "error": pa.array(error, type=pa.string()),
+    })
+    return result, len(errors)
+
+
+def _score_arrow(state: ServingState, body: bytes, fmt: str) -> Response:
+    t0 = time.perf_counter()
+    with stage("decode"):
+        try:
+            table = columnar.read_table(body, fmt, columns=state.meta.features)
+        except (pa.ArrowInvalid, OSError) as e:
+            raise HTTPException(
+                status_code=422,
+                detail={"error": "Table Arrow / Parquet illisible", "format": fmt, "message": str(e)},
+            ) from e
+    n = table.num_rows
+    if n > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Lot trop volumineux",
+                "n_rows": n,
+                "max_rows": MAX_BATCH_ROWS,
+                "hint": "Découpe le lot ou augmente MAX_BATCH_ROWS côté API.",
+            },
+        )
+
+    result, n_errors = score_table(table, state.meta, state.predict_proba)
+    elapsed_s = time.perf_counter() - t0
+    rows_per_s = n / elapsed_s if elapsed_s > 0 else 0.0
+    result = columnar.with_metadata(result, {
+        "model_name": state.meta.model_name,
+        "model_fingerprint": state.fingerprint,
+        "threshold": float(state.meta.threshold),
+        "n_rows": n,
+        "n_ok": n - n_errors,
+        "n_errors": n_errors,
+        "rows_per_s": round(rows_per_s, 1),
+    })
+    with stage("serialize_arrow"):
+        content = columnar.write_ipc_stream(result)
+    return Response(content, media_type=columnar.ARROW_STREAM,
+                    headers={"X-Rows-Per-Second": f"{rows_per_s:.0f}"})
+
+
+@app.post("/predict/arrow")
+async def predict_arrow(request: Request) -> Response:
+    """Scoring colonne : corps Arrow IPC (flux ou fichier) ou Parquet, réponse en flux Arrow IPC.
+
+    Une ligne par ligne d'entrée, dans le même ordre : proba, pred_class, label (null si
+    la ligne est invalide) et error (détail JSON du 422 qu'aurait renvoyé /predict).
+    Métadonnées du schéma : seuil, modèle, n_ok / n_errors, lignes / s.
+    """
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+    body = await request.body()
+    fmt = columnar.detect_format(body, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail={
+                "error": "Format non supporté",
+                "accepted": [columnar.ARROW_STREAM, columnar.ARROW_FILE, columnar.PARQUET],
+            },
+        )
+    return await run_in_threadpool(_score_arrow, state, body, fmt)
+
+
+def _score_stream_chunk(state: ServingState, lines: List[Tuple[int, Any]]) -> Tuple[bytes, int, int]:
+    """Parse, normalise et score un bloc de lignes NDJSON ; renvoie (NDJSON, n_ok, n_errors).
+
+    Chaque élément de `lines` est (numéro de ligne, octets bruts) ou (numéro, dict d'erreur)
+    pour une ligne déjà rejetée à la lecture.
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    records: List[Dict[str, Any]] = []
+    numbers: List[int] = []
+    for n, raw in lines:
+        if isinstance(raw, dict):
+            results[n] = {"line": n, "error": raw}
+            continue
+        try:
+            obj = json.loads(raw)
+        except ValueError as e:
+            results[n] = {"line": n, "error": {"error": "JSON invalide", "message": str(e)}}
+            continue
+        if not isinstance(obj, dict):
+            results[n] = {"line": n, "error": {"error": "Objet JSON attendu", "value": obj}}
+            continue
+        records.append(obj)
+        numbers.append(n)
+
+    if records:
+        X, valid, errors = normalize_batch(records, state.meta)
+        for i, e in errors.items():
+            results[numbers[i]] = {"line": numbers[i], "error": e}
+        probas = state.predict_proba(X) if valid else np.empty(0)
+        threshold = float(state.meta.threshold)
+        for i, p in zip(valid, probas):
+            pred_class = int(p >= threshold)
+            results[numbers[i]] = {"line": numbers[i], "proba": float(p), "pred_class": pred_class,
+                                   "label": _label(pred_class)}
+
+    n_errors = sum("error" in r for r in results.values())
+    body = "".join(json.dumps(results[n], ensure_ascii=False) + "\n" for n in sorted(results))
+    return body.encode("utf-8"), len(results) - n_errors, n_errors
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request) -> NDJSONStreamResponse:
+    """Scoring NDJSON : une ligne JSON par enregistrement en entrée, une ligne résultat par enregistrement.
+
+    Le corps est lu par blocs de STREAM_CHUNK_ROWS lignes ; un bloc n'est lu qu'après
+    l'envoi des résultats du précédent (contre-pression : un client lent freine la lecture,
+    la mémoire reste bornée par la taille d'un bloc). Dernière ligne : {"summary": ...}.
+    """
+    state = STATE
+    if state is None:
+        raise HTTPException(status_code=503, detail="Modèle non prêt (startup en cours).")
+
+    async def results():
+        chunk: List[Tuple[int, Any]] = []
+        n_ok = n_errors = 0
+        async for item in ndjson_lines(request.stream(), STREAM_MAX_LINE_BYTES):
+            chunk.append(item)
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                body, ok, err = await run_in_threadpool(_score_stream_chunk, state, chunk)
+                n_ok, n_errors, chunk = n_ok + ok, n_errors + err, []
+                yield body
+        if chunk:
+            body, ok, err = await run_in_threadpool(_score_stream_chunk, state, chunk)
+            n_ok, n_errors = n_ok + ok, n_errors + err
+            yield body
+        summary = {"n_ok": n_ok, "n_errors": n_errors, "threshold": float(state.meta.threshold)}
+        yield (json.dumps({"summary": summary}) + "\n").encode("utf-8")
 
-    return PredictResponse(proba=proba, pred_class=pred_class, label=label, threshold=threshold)
+    return NDJSONStreamResponse(results())
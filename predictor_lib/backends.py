@@ -0,0 +1,244 @@
+"""
+Backends d'inférence interchangeables pour l'API.
+
+Chaque backend charge le modèle depuis le .cbm et expose la même interface :
+- load(model_path)        : charge / compile le modèle
+- predict_proba(rows)     : lot de lignes (ordre des features) -> tableau (n, 2)
+- describe()              : infos pour /health (nom, temps de chargement, parité)
+
+Les backends à arbres (catboost, numpy) exposent aussi predict_raw sur une plage
+d'arbres et les bornes min/max des feuilles de chaque arbre (early-exit), ainsi que
+shap_values (ShapValues CatBoost) et virtual_ensembles (ensembles virtuels CatBoost) ;
+le backend numpy délègue ces deux derniers à CatBoost.
+
+Backends disponibles (clé de BACKENDS) :
+- catboost : CatBoostClassifier natif (référence)
+- numpy    : ObliviousTreeEngine (NumPy pur, voir predictor_lib.oblivious)
+- onnx     : ONNX Runtime CPU sur l'export ONNX CatBoost du modèle. L'export ONNX
+             de CatBoost ne gère pas les features catégorielles : ce backend ne
+             peut servir qu'un modèle à features numériques (chargement refusé sinon).
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from predictor_lib.oblivious import ObliviousTreeEngine
+
+
+class InferenceBackend:
+    """Interface commune ; les sous-classes implémentent _load et predict_proba."""
+
+    name = "base"
+
+    def __init__(self, thread_count: int = -1) -> None:
+        # threads par appel d'inférence (-1 : tous les cœurs), pour les backends qui le gèrent
+        self.thread_count = int(thread_count)
+        self.model_path: Optional[Path] = None
+        self.feature_names: Optional[List[Any]] = None
+        self.load_ms: Optional[float] = None
+        self.parity: Optional[Dict[str, Any]] = None
+
+    def load(self, model_path: str | Path) -> "InferenceBackend":
+        t0 = time.perf_counter()
+        self.model_path = Path(model_path)
+        self._load(self.model_path)
+        self.load_ms = (time.perf_counter() - t0) * 1e3
+        return self
+
+    def _load(self, model_path: Path) -> None:
+        raise NotImplementedError
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict_raw(self, rows: Any, ntree_start: int = 0, ntree_end: int = 0) -> np.ndarray:
+        """Logit des arbres [ntree_start, ntree_end) ; biais inclus seulement si ntree_start == 0."""
+        raise NotImplementedError(f"Backend {self.name} : évaluation partielle des arbres non supportée")
+
+    def tree_leaf_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(min, max) de la contribution de chaque arbre au logit (échelle incluse)."""
+        raise NotImplementedError(f"Backend {self.name} : bornes des feuilles non disponibles")
+
+    def shap_values(self, rows: Any) -> np.ndarray:
+        """Contributions SHAP au logit, (n, n_features + 1) : dernière colonne = valeur de base."""
+        raise NotImplementedError(f"Backend {self.name} : valeurs SHAP non disponibles")
+
+    def virtual_ensembles(self, rows: Any, count: int) -> np.ndarray:
+        """Logit de chaque membre d'un ensemble virtuel, (n, count) : le dernier membre est le modèle complet."""
+        raise NotImplementedError(f"Backend {self.name} : ensembles virtuels non disponibles")
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_path": str(self.model_path) if self.model_path else None,
+            "load_ms": round(self.load_ms, 1) if self.load_ms is not None else None,
+            "thread_count": self.thread_count,
+            "parity": self.parity,
+        }
+
+
+class CatBoostBackend(InferenceBackend):
+    name = "catboost"
+
+    def _load(self, model_path: Path) -> None:
+        from catboost import CatBoostClassifier
+
+        self.model = CatBoostClassifier()
+        self.model.load_model(str(model_path))
+        self.feature_names = list(self.model.feature_names_)
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        return self.model.predict_proba(rows, thread_count=self.thread_count)
+
+    def predict_raw(self, rows: Any, ntree_start: int = 0, ntree_end: int = 0) -> np.ndarray:
+        return self.model.predict(
+            rows, prediction_type="RawFormulaVal",
+            ntree_start=ntree_start, ntree_end=ntree_end or self.model.tree_count_,
+            thread_count=self.thread_count,
+        )
+
+    def tree_leaf_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        scale, _ = self.model.get_scale_and_bias()
+        leaves = np.split(self.model.get_leaf_values(), np.cumsum(self.model.get_tree_leaf_counts())[:-1])
+        return (scale * np.array([v.min() for v in leaves]), scale * np.array([v.max() for v in leaves]))
+
+    def shap_values(self, rows: Any) -> np.ndarray:
+        from catboost import Pool
+
+        # un seul appel pour tout le lot
+        pool = Pool(rows, cat_features=self.model.get_cat_feature_indices(), feature_names=self.feature_names)
+        return self.model.get_feature_importance(pool, type="ShapValues", thread_count=self.thread_count)
+
+    def virtual_ensembles(self, rows: Any, count: int) -> np.ndarray:
+        # membres = modèles tronqués dans la seconde moitié des arbres : il en faut au moins 2 par membre
+        if self.model.tree_count_ < 2 * count:
+            raise NotImplementedError(
+                f"{self.model.tree_count_} arbres : trop peu pour {count} membres d'ensemble virtuel"
+            )
+        return self.model.virtual_ensembles_predict(
+            rows, prediction_type="VirtEnsembles", virtual_ensembles_count=count, thread_count=self.thread_count,
+        )[:, :, 0]
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "n_trees": self.model.tree_count_}
+
+
+class NumpyBackend(InferenceBackend):
+    name = "numpy"
+
+    def _load(self, model_path: Path) -> None:
+        self.engine = ObliviousTreeEngine.from_cbm(model_path)
+        self.feature_names = list(self.engine.feature_names)
+        self._catboost: Optional[CatBoostBackend] = None
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        return self.engine.predict_proba(rows)
+
+    def predict_raw(self, rows: Any, ntree_start: int = 0, ntree_end: int = 0) -> np.ndarray:
+        return self.engine.predict_raw(rows, ntree_start, ntree_end)
+
+    def tree_leaf_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        e = self.engine
+        leaves = np.split(e.leaf_values, e.leaf_offsets[1:])
+        return (e.scale * np.array([v.min() for v in leaves]), e.scale * np.array([v.max() for v in leaves]))
+
+    def _catboost_backend(self) -> CatBoostBackend:
+        # CatBoost sur le même .cbm, chargé au premier appel (SHAP, ensembles virtuels)
+        if self._catboost is None:
+            self._catboost = CatBoostBackend(self.thread_count).load(self.model_path)
+        return self._catboost
+
+    def shap_values(self, rows: Any) -> np.ndarray:
+        return self._catboost_backend().shap_values(rows)
+
+    def virtual_ensembles(self, rows: Any, count: int) -> np.ndarray:
+        return self._catboost_backend().virtual_ensembles(rows, count)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "n_trees": self.engine.n_trees}
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime (CPUExecutionProvider) sur <modèle>.onnx, exporté depuis le .cbm si absent."""
+
+    name = "onnx"
+
+    def _load(self, model_path: Path) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("Backend onnx : installer onnxruntime (uv add onnxruntime)") from e
+        from catboost import CatBoostClassifier, CatBoostError
+
+        model = CatBoostClassifier()
+        model.load_model(str(model_path))
+        self.feature_names = list(model.feature_names_)
+
+        onnx_path = model_path.with_suffix(".onnx")
+        with tempfile.TemporaryDirectory() as tmp:
+            if not onnx_path.exists():
+                onnx_path = Path(tmp) / "model.onnx"
+                try:
+                    model.save_model(str(onnx_path), format="onnx")
+                except CatBoostError as e:
+                    raise ValueError(
+                        f"Export ONNX impossible pour {model_path.name} "
+                        f"({len(model.get_cat_feature_indices())} features catégorielles) : {e}"
+                    ) from e
+            options = ort.SessionOptions()
+            if self.thread_count > 0:
+                options.intra_op_num_threads = self.thread_count
+            self.session = ort.InferenceSession(
+                str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+        self._input_name = self.session.get_inputs()[0].name
+        self._proba_output = next(
+            (o.name for o in self.session.get_outputs() if o.name == "probabilities"),
+            self.session.get_outputs()[-1].name,
+        )
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        X = np.asarray(rows, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        (out,) = self.session.run([self._proba_output], {self._input_name: X})
+        if isinstance(out, list):  # sortie ZipMap : [{classe: proba}, ...]
+            out = [[d[k] for k in sorted(d)] for d in out]
+        return np.asarray(out, dtype=np.float64)
+
+
+BACKENDS = {b.name: b for b in (CatBoostBackend, NumpyBackend, OnnxBackend)}
+
+
+def create_backend(name: str, model_path: str | Path, thread_count: int = -1) -> InferenceBackend:
+    """Instancie et charge le backend `name` (clé de BACKENDS)."""
+    if name not in BACKENDS:
+        raise ValueError(f"Backend d'inférence inconnu: {name} ({' | '.join(BACKENDS)})")
+    return BACKENDS[name](thread_count).load(model_path)
+
+
+def parity_check(
+    backend: InferenceBackend,
+    reference: InferenceBackend,
+    probe_rows: Sequence[Sequence[Any]],
+    max_abs_diff: float,
+) -> Dict[str, Any]:
+    """Compare les probabilités sur un jeu de sonde fixe ; ValueError si l'écart dépasse max_abs_diff."""
+    diff = float(np.abs(
+        backend.predict_proba(probe_rows)[:, 1] - reference.predict_proba(probe_rows)[:, 1]
+    ).max())
+    result = {"reference": reference.name, "n_rows": len(probe_rows),
+              "max_abs_diff": diff, "tolerance": max_abs_diff}
+    if not diff <= max_abs_diff:
+        raise ValueError(
+            f"Parité {backend.name} vs {reference.name} non respectée : "
+            f"écart max {diff:.2e} > {max_abs_diff:.0e} sur {len(probe_rows)} lignes"
+        )
+    backend.parity = result
+    return result
@@ -0,0 +1,169 @@
+"""
+Micro-batching dynamique devant predict_proba.
+
+Les requêtes /predict concurrentes déposent leur ligne encodée dans une file ;
+un thread répartiteur regroupe jusqu'à `max_batch_size` lignes arrivées dans
+une fenêtre de `max_wait_ms`, lance une seule inférence puis renvoie à chaque
+appelant son résultat (la probabilité, ou tout objet renvoyé par `predict_fn`
+pour sa ligne). Si l'inférence du lot échoue, les lignes sont réévaluées une par
+une : seule la ligne fautive reçoit l'exception.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+PredictFn = Callable[[List[List[Any]]], Sequence[Any]]
+
+
+def _bucket_bounds(max_batch_size: int) -> List[int]:
+    """Bornes supérieures des buckets d'histogramme : 1, 2, 4, ... jusqu'à max_batch_size."""
+    bounds = [1]
+    while bounds[-1] < max_batch_size:
+        bounds.append(min(bounds[-1] * 2, max_batch_size))
+    return bounds
+
+
+class MicroBatcher:
+    """Regroupe les lignes soumises depuis plusieurs threads en un seul appel à `predict_fn`."""
+
+    def __init__(self, predict_fn: PredictFn, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_s = max(float(max_wait_ms), 0.0) / 1000.0
+
+        self._queue: "queue.Queue[Tuple[List[Any], Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._lock = threading.Lock()
+        self._bounds = _bucket_bounds(self.max_batch_size)
+        self._hist = [0] * len(self._bounds)
+        self._n_batches = 0
+        self._n_rows = 0
+        self._max_queue_depth = 0
+        self._n_fallbacks = 0
+
+    # -----------------------------
+    # Cycle de vie
+    # -----------------------------
+
+    def start(self) -> "MicroBatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # libère les appelants encore en attente
+        while True:
+            try:
+                _, fut = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            fut.set_exception(RuntimeError("MicroBatcher arrêté"))
+
+    # -----------------------------
+    # API appelant
+    # -----------------------------
+
+    def submit(self, row: List[Any]) -> Future:
+        if self._stop.is_set() or self._thread is None:
+            raise RuntimeError("MicroBatcher non démarré")
+        fut: Future = Future()
+        self._queue.put((row, fut))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+        return fut
+
+    def predict(self, row: List[Any], timeout: Optional[float] = None) -> Any:
+        """Soumet une ligne et attend son résultat (bloquant)."""
+        return self.submit(row).result(timeout)
+
+    # -----------------------------
+    # Répartiteur
+    # -----------------------------
+
+    def _collect(self) -> List[Tuple[List[Any], Future]]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            rows = [row for row, _ in batch]
+            try:
+                results = list(self.predict_fn(rows))
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._run_rows(batch)
+            else:
+                for (_, fut), r in zip(batch, results):
+                    fut.set_result(r)
+            self._record(len(batch))
+
+    def _run_rows(self, batch: List[Tuple[List[Any], Future]]) -> None:
+        """Lot en échec : une inférence par ligne, l'exception ne va qu'aux lignes fautives."""
+        with self._lock:
+            self._n_fallbacks += 1
+        for row, fut in batch:
+            try:
+                fut.set_result(list(self.predict_fn([row]))[0])
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _record(self, size: int) -> None:
+        idx = next(i for i, b in enumerate(self._bounds) if size <= b)
+        with self._lock:
+            self._hist[idx] += 1
+            self._n_batches += 1
+            self._n_rows += size
+
+    # -----------------------------
+    # Statistiques
+    # -----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_s * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._n_batches,
+                "rows": self._n_rows,
+                "mean_batch_size": (self._n_rows / self._n_batches) if self._n_batches else 0.0,
+                # lots en échec réévalués ligne par ligne
+                "row_fallbacks": self._n_fallbacks,
+                # {"<=1": n, "<=2": n, ...} : nombre de lots par taille
+                "batch_size_histogram": {f"<={b}": n for b, n in zip(self._bounds, self._hist)},
+            }
@@ -0,0 +1,53 @@
+"""
+Budget de threads d'inférence partagé entre tous les modèles servis.
+
+Chaque appel d'inférence utilise `threads_per_call` threads (thread_count
+CatBoost) ; au plus total_threads // threads_per_call appels tournent en
+même temps, quel que soit le modèle. Les autres attendent leur tour au lieu
+de sursouscrire les cœurs.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+
+class ThreadBudget:
+    """Sémaphore d'appels d'inférence concurrents, utilisable comme context manager."""
+
+    def __init__(self, total_threads: int, threads_per_call: int):
+        self.total_threads = max(1, int(total_threads))
+        self.threads_per_call = min(max(1, int(threads_per_call)), self.total_threads)
+        self.slots = max(1, self.total_threads // self.threads_per_call)
+        self._sem = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._max_active = 0
+        self._waits = 0
+
+    def __enter__(self) -> "ThreadBudget":
+        if not self._sem.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            self._sem.acquire()
+        with self._lock:
+            self._active += 1
+            self._max_active = max(self._max_active, self._active)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        with self._lock:
+            self._active -= 1
+        self._sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total_threads": self.total_threads,
+                "threads_per_call": self.threads_per_call,
+                "slots": self.slots,
+                "active": self._active,
+                "max_active": self._max_active,
+                "waits": self._waits,
+            }
@@ -0,0 +1,154 @@
+"""
+CityHash64 (v1.0.x) en Python pur.
+
+CatBoost hache chaque valeur catégorielle avec CityHash64 tronqué à 32 bits
+(CalcCatFeatureHash). Le moteur NumPy en a besoin pour retrouver, à partir
+des chaînes reçues, les valeurs one-hot et les clés des tables de CTR.
+"""
+
+from __future__ import annotations
+
+import struct
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+K0 = 0xC3A5C85C97CB3127
+K1 = 0xB492B66FBE98F273
+K2 = 0x9AE16A3B2F90404F
+K3 = 0xC949D7C7509E6557
+_KMUL = 0x9DDFEA08EB382D69
+
+
+def _fetch64(s: bytes, i: int) -> int:
+    return struct.unpack_from("<Q", s, i)[0]
+
+
+def _fetch32(s: bytes, i: int) -> int:
+    return struct.unpack_from("<I", s, i)[0]
+
+
+def _rotate(v: int, shift: int) -> int:
+    return v if shift == 0 else ((v >> shift) | (v << (64 - shift))) & _MASK
+
+
+def _rotate_at_least_1(v: int, shift: int) -> int:
+    return ((v >> shift) | (v << (64 - shift))) & _MASK
+
+
+def _shift_mix(v: int) -> int:
+    return v ^ (v >> 47)
+
+
+def _hash_len16(u: int, v: int) -> int:
+    a = ((u ^ v) * _KMUL) & _MASK
+    a ^= a >> 47
+    b = ((v ^ a) * _KMUL) & _MASK
+    b ^= b >> 47
+    return (b * _KMUL) & _MASK
+
+
+def _hash_len0to16(s: bytes) -> int:
+    n = len(s)
+    if n > 8:
+        a = _fetch64(s, 0)
+        b = _fetch64(s, n - 8)
+        return _hash_len16(a, _rotate_at_least_1((b + n) & _MASK, n)) ^ b
+    if n >= 4:
+        a = _fetch32(s, 0)
+        return _hash_len16((n + (a << 3)) & _MASK, _fetch32(s, n - 4))
+    if n > 0:
+        a, b, c = s[0], s[n >> 1], s[n - 1]
+        y = (a + (b << 8)) & 0xFFFFFFFF
+        z = (n + (c << 2)) & 0xFFFFFFFF
+        return (_shift_mix(((y * K2) ^ (z * K3)) & _MASK) * K2) & _MASK
+    return K2
+
+
+def _hash_len17to32(s: bytes) -> int:
+    n = len(s)
+    a = (_fetch64(s, 0) * K1) & _MASK
+    b = _fetch64(s, 8)
+    c = (_fetch64(s, n - 8) * K2) & _MASK
+    d = (_fetch64(s, n - 16) * K0) & _MASK
+    return _hash_len16(
+        (_rotate((a - b) & _MASK, 43) + _rotate(c, 30) + d) & _MASK,
+        (a + _rotate(b ^ K3, 20) - c + n) & _MASK,
+    )
+
+
+def _weak_hash_len32_with_seeds(s: bytes, i: int, a: int, b: int) -> tuple[int, int]:
+    w, x, y, z = _fetch64(s, i), _fetch64(s, i + 8), _fetch64(s, i + 16), _fetch64(s, i + 24)
+    a = (a + w) & _MASK
+    b = _rotate((b + a + z) & _MASK, 21)
+    c = a
+    a = (a + x + y) & _MASK
+    b = (b + _rotate(a, 44)) & _MASK
+    return (a + z) & _MASK, (b + c) & _MASK
+
+
+def _hash_len33to64(s: bytes) -> int:
+    n = len(s)
+    z = _fetch64(s, 24)
+    a = (_fetch64(s, 0) + (n + _fetch64(s, n - 16)) * K0) & _MASK
+    b = _rotate((a + z) & _MASK, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, 8)) & _MASK
+    c = (c + _rotate(a, 7)) & _MASK
+    a = (a + _fetch64(s, 16)) & _MASK
+    vf = (a + z) & _MASK
+    vs = (b + _rotate(a, 31) + c) & _MASK
+    a = (_fetch64(s, 16) + _fetch64(s, n - 32)) & _MASK
+    z = _fetch64(s, n - 8)
+    b = _rotate((a + z) & _MASK, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, n - 24)) & _MASK
+    c = (c + _rotate(a, 7)) & _MASK
+    a = (a + _fetch64(s, n - 16)) & _MASK
+    wf = (a + z) & _MASK
+    ws = (b + _rotate(a, 31) + c) & _MASK
+    r = _shift_mix(((vf + ws) * K2 + (wf + vs) * K0) & _MASK)
+    return (_shift_mix((r * K0 + vs) & _MASK) * K2) & _MASK
+
+
+def city_hash64(s: bytes) -> int:
+    n = len(s)
+    if n <= 16:
+        return _hash_len0to16(s)
+    if n <= 32:
+        return _hash_len17to32(s)
+    if n <= 64:
+        return _hash_len33to64(s)
+
+    x = _fetch64(s, 0)
+    y = _fetch64(s, n - 16) ^ K1
+    z = _fetch64(s, n - 56) ^ K0
+    v = _weak_hash_len32_with_seeds(s, n - 64, n, y)
+    w = _weak_hash_len32_with_seeds(s, n - 32, (n * K1) & _MASK, K0)
+    z = (z + _shift_mix(v[1]) * K1) & _MASK
+    x = (_rotate((x + z) & _MASK, 37) * K1) & _MASK
+    y = (_rotate((y + v[1]) & _MASK, 42) * K1) & _MASK
+    x ^= w[1]
+    y ^= v[0]
+    pos = 0
+    remaining = (n - 1) & ~63
+    while True:
+        x = (_rotate((x + y + v[0] + _fetch64(s, pos + 16)) & _MASK, 37) * K1) & _MASK
+        y = (_rotate((y + v[1] + _fetch64(s, pos + 48)) & _MASK, 42) * K1) & _MASK
+        x ^= w[1]
+        y ^= v[0]
+        z = _rotate(z ^ w[0], 33)
+        v = _weak_hash_len32_with_seeds(s, pos, (v[1] * K1) & _MASK, (x + w[0]) & _MASK)
+        w = _weak_hash_len32_with_seeds(s, pos + 32, (z + w[1]) & _MASK, y)
+        z, x = x, z
+        pos += 64
+        remaining -= 64
+        if remaining == 0:
+            break
+    return _hash_len16(
+        (_hash_len16(v[0], w[0]) + _shift_mix(y) * K1 + z) & _MASK,
+        (_hash_len16(v[1], w[1]) + x) & _MASK,
+    )
+
+
+def cat_feature_hash(value: str) -> int:
+    """Hash CatBoost d'une valeur catégorielle : CityHash64 UTF-8 tronqué à 32 bits."""
+    return city_hash64(value.encode("utf-8")) & 0xFFFFFFFF
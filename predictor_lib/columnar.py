@@ -0,0 +1,83 @@
+"""
+Entrées / sorties Arrow pour POST /predict/arrow.
+
+- read_table() lit un flux Arrow IPC, un fichier Arrow IPC ou un fichier Parquet
+  (détecté par Content-Type, sinon par les octets magiques).
+- select_columns() ne garde que les colonnes demandées : Table.select ne copie
+  pas les buffers, seules les colonnes du modèle seront matérialisées ensuite.
+- write_ipc_stream() sérialise la table de résultats en flux Arrow IPC.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Dict, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET = "application/vnd.apache.parquet"
+
+_CONTENT_TYPES = {
+    ARROW_STREAM: "stream",
+    ARROW_FILE: "file",
+    PARQUET: "parquet",
+    "application/x-parquet": "parquet",
+}
+
+
+def detect_format(body: bytes, content_type: Optional[str] = None) -> Optional[str]:
+    """'stream', 'file' ou 'parquet' ; None si le format n'est pas reconnu."""
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media in _CONTENT_TYPES:
+        return _CONTENT_TYPES[media]
+    if body[:4] == b"PAR1":
+        return "parquet"
+    if body[:6] == b"ARROW1":
+        return "file"
+    # un flux IPC commence par le marqueur de continuation 0xFFFFFFFF
+    if body[:4] == b"\xff\xff\xff\xff":
+        return "stream"
+    return None
+
+
+def read_table(body: bytes, fmt: str, columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """Table Arrow depuis les octets reçus ; Parquet ne lit que `columns` (si fournies et présentes)."""
+    buf = pa.py_buffer(body)
+    if fmt == "parquet":
+        source = pa.BufferReader(buf)
+        if columns is not None:
+            present = set(pq.read_schema(source).names)
+            columns = [c for c in columns if c in present]
+            source = pa.BufferReader(buf)
+        return pq.read_table(source, columns=columns)
+    if fmt == "file":
+        return ipc.open_file(buf).read_all()
+    if fmt == "stream":
+        return ipc.open_stream(buf).read_all()
+    raise ValueError(f"Format Arrow inconnu: {fmt}")
+
+
+def missing_columns(table: pa.Table, columns: Sequence[str]) -> List[str]:
+    return [c for c in columns if c not in table.column_names]
+
+
+def select_columns(table: pa.Table, columns: Sequence[str]) -> pa.Table:
+    """Colonnes de `columns` présentes dans la table, dans cet ordre, sans copie."""
+    return table.select([c for c in columns if c in table.column_names])
+
+
+def write_ipc_stream(table: pa.Table) -> bytes:
+    sink = io.BytesIO()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def with_metadata(table: pa.Table, metadata: Dict[str, object]) -> pa.Table:
+    """Ajoute des métadonnées de schéma (valeurs converties en str)."""
+    return table.replace_schema_metadata({str(k): str(v) for k, v in metadata.items()})
+
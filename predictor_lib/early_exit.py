@@ -0,0 +1,125 @@
+"""
+Inférence à sortie anticipée (early-exit) par évaluation partielle des arbres.
+
+Les arbres sont évalués par paliers (défaut 50 %, 75 %, 90 % puis 100 %). Après
+chaque palier, la contribution des arbres restants est bornée par la somme des
+feuilles min / max de chaque arbre (précalculées au chargement) :
+
+    logit_final ∈ [logit_partiel + Σ min, logit_partiel + Σ max]
+
+Si tout l'intervalle est du même côté de logit(seuil), la classe est exacte et
+la ligne sort : sa probabilité est celle du logit partiel ramené dans
+l'intervalle, donc approximative (signalée comme telle). Les autres lignes
+continuent au palier suivant ; au dernier, la probabilité est exacte.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_STAGES = (0.5, 0.75, 0.9)
+
+
+class EarlyExitPredictor:
+    """Enveloppe un backend exposant predict_raw(ntree_start, ntree_end) et tree_leaf_bounds()."""
+
+    def __init__(self, backend: Any, threshold: float, stages: Sequence[float] = DEFAULT_STAGES):
+        if not 0.0 < threshold < 1.0:
+            raise ValueError(f"Seuil hors de ]0, 1[ : {threshold}")
+        self.backend = backend
+        self.logit_threshold = math.log(threshold / (1.0 - threshold))
+
+        mins, maxs = backend.tree_leaf_bounds()
+        self.n_trees = len(mins)
+        # cuts : nombre d'arbres évalués à chaque palier, le dernier = tous
+        cuts = {min(self.n_trees, max(1, round(f * self.n_trees))) for f in stages}
+        self.cuts = sorted(cuts - {self.n_trees}) + [self.n_trees]
+        # reste_min[k] / reste_max[k] : bornes de la somme des arbres k..n-1
+        self._rest_min = np.append(np.cumsum(mins[::-1])[::-1], 0.0)
+        self._rest_max = np.append(np.cumsum(maxs[::-1])[::-1], 0.0)
+
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._rows = 0
+        self._exits = [0] * len(self.cuts)
+        self._trees_evaluated = 0
+        self._elapsed_s = 0.0
+        self.full_call_ms: float | None = None
+
+    def predict(self, rows: Sequence[Sequence[Any]]) -> List[Tuple[float, bool]]:
+        """[(proba, approximative)] par ligne ; la classe (proba >= seuil) est toujours exacte."""
+        t0 = time.perf_counter()
+        n = len(rows)
+        raw = np.zeros(n, dtype=np.float64)
+        approximate = np.zeros(n, dtype=bool)
+        active = np.arange(n)
+        exits = [0] * len(self.cuts)
+        trees = 0
+        start = 0
+        for stage, end in enumerate(self.cuts):
+            raw[active] += self.backend.predict_raw([rows[i] for i in active], start, end)
+            trees += len(active) * (end - start)
+            start = end
+            if end == self.n_trees:
+                exits[stage] += len(active)
+                break
+            lo = raw[active] + self._rest_min[end]
+            hi = raw[active] + self._rest_max[end]
+            decided = (lo >= self.logit_threshold) | (hi < self.logit_threshold)
+            done = active[decided]
+            raw[done] = np.clip(raw[done], lo[decided], hi[decided])
+            approximate[done] = True
+            exits[stage] += len(done)
+            active = active[~decided]
+            if not len(active):
+                break
+
+        proba = 1.0 / (1.0 + np.exp(-raw))
+        self._record(n, exits, trees, time.perf_counter() - t0)
+        return list(zip(proba.tolist(), approximate.tolist()))
+
+    def calibrate(self, row: Sequence[Any], repeat: int = 20) -> float:
+        """Latence médiane (ms) d'une évaluation complète d'une ligne, référence du gain estimé."""
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            self.backend.predict_raw([row])
+            runs.append((time.perf_counter() - t0) * 1e3)
+        self.full_call_ms = statistics.median(runs)
+        return self.full_call_ms
+
+    def _record(self, n: int, exits: List[int], trees: int, elapsed_s: float) -> None:
+        with self._lock:
+            self._calls += 1
+            self._rows += n
+            self._exits = [a + b for a, b in zip(self._exits, exits)]
+            self._trees_evaluated += trees
+            self._elapsed_s += elapsed_s
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            early = sum(self._exits[:-1])
+            mean_call_ms = (self._elapsed_s / self._calls * 1e3) if self._calls else 0.0
+            return {
+                "enabled": True,
+                "n_trees": self.n_trees,
+                "stages": self.cuts,
+                "calls": self._calls,
+                "rows": self._rows,
+                "rows_early_exit": early,
+                "early_exit_fraction": (early / self._rows) if self._rows else 0.0,
+                # {"300": n, ...} : lignes sorties après ce nombre d'arbres
+                "exits_by_stage": {str(c): n for c, n in zip(self.cuts, self._exits)},
+                "mean_trees_per_row": (self._trees_evaluated / self._rows) if self._rows else 0.0,
+                "mean_call_ms": mean_call_ms,
+                "full_call_ms": self.full_call_ms,
+                "est_saved_ms_per_call": (
+                    self.full_call_ms - mean_call_ms if self.full_call_ms is not None and self._calls else None
+                ),
+            }
@@ -0,0 +1,106 @@
+"""
+Tables de fréquences des codes et marginalisation des champs inconnus.
+
+- frequency_tables() compte les codes de chaque champ catégoriel d'une table Arrow
+  (codes convertis en texte comme le fait normalize_table), save/load en JSON.
+- top_combinations() énumère, par ordre de probabilité décroissante, les combinaisons
+  de codes les plus probables pour plusieurs champs inconnus, supposés indépendants
+  (produit des fréquences marginales), dans la limite de `max_combinations`.
+- weighted_summary() : moyenne pondérée des probas, écart-type pondéré, min / max.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# {champ: (codes triés par fréquence décroissante, fréquences relatives)}
+FrequencyTables = Dict[str, Tuple[List[str], List[float]]]
+
+
+def frequency_tables(table: pa.Table, fields: Sequence[str]) -> Dict[str, Dict[str, int]]:
+    """{champ: {code: effectif}} sur les lignes non nulles de `table`."""
+    counts: Dict[str, Dict[str, int]] = {}
+    for f in fields:
+        col = table.column(f)
+        if pa.types.is_floating(col.type):
+            col = pc.if_else(pc.is_nan(col), pa.scalar(None, col.type), col)
+        if not (pa.types.is_string(col.type) or pa.types.is_large_string(col.type)):
+            col = pc.cast(col, pa.string())
+        values = pc.value_counts(col.drop_null())
+        counts[f] = {v["values"].as_py(): v["counts"].as_py() for v in values}
+    return counts
+
+
+def save_frequency_tables(path: str | Path, counts: Mapping[str, Mapping[str, int]], source: str, rows: int) -> None:
+    payload = {"source": source, "rows": rows, "fields": {f: dict(c) for f, c in counts.items()}}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def load_frequency_tables(path: str | Path) -> FrequencyTables:
+    """Tables normalisées (somme 1 par champ), codes triés par fréquence décroissante."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        fields = json.load(f)["fields"]
+    return {field: normalize_counts(counts) for field, counts in fields.items()}
+
+
+def normalize_counts(counts: Mapping[str, float]) -> Tuple[List[str], List[float]]:
+    items = sorted(((str(c), float(n)) for c, n in counts.items() if n > 0), key=lambda kv: (-kv[1], kv[0]))
+    total = sum(n for _, n in items)
+    return [c for c, _ in items], [n / total for _, n in items]
+
+
+def top_combinations(
+    fields: Sequence[str], tables: FrequencyTables, max_combinations: int
+) -> Tuple[List[Tuple[str, ...]], np.ndarray, float]:
+    """
+    (combinaisons, poids normalisés, masse couverte) des `max_combinations` combinaisons
+    de codes les plus probables pour `fields`.
+
+    Parcours du meilleur d'abord sur les index des codes triés : exact pour un produit
+    de marginales, sans énumérer tout le produit cartésien. ValueError si un champ n'a
+    aucun code (table vide).
+    """
+    codes = [tables[f][0] for f in fields]
+    probs = [tables[f][1] for f in fields]
+    empty = [f for f, c in zip(fields, codes) if not c]
+    if empty:
+        raise ValueError(f"Table de fréquences vide pour : {', '.join(empty)}")
+
+    def mass(idx: Tuple[int, ...]) -> float:
+        return float(np.prod([p[i] for p, i in zip(probs, idx)]))
+
+    start = (0,) * len(fields)
+    heap = [(-mass(start), start)]
+    seen = {start}
+    combos: List[Tuple[str, ...]] = []
+    weights: List[float] = []
+    while heap and len(combos) < max_combinations:
+        neg_mass, idx = heapq.heappop(heap)
+        combos.append(tuple(c[i] for c, i in zip(codes, idx)))
+        weights.append(-neg_mass)
+        for k in range(len(fields)):
+            nxt = idx[:k] + (idx[k] + 1,) + idx[k + 1:]
+            if nxt[k] < len(codes[k]) and nxt not in seen:
+                seen.add(nxt)
+                heapq.heappush(heap, (-mass(nxt), nxt))
+    w = np.asarray(weights)
+    covered = float(w.sum())
+    return combos, w / covered, covered
+
+
+def weighted_summary(probas: np.ndarray, weights: np.ndarray) -> Dict[str, float]:
+    mean = float(np.dot(weights, probas))
+    return {
+        "proba": mean,
+        "spread": float(np.sqrt(np.dot(weights, (probas - mean) ** 2))),
+        "proba_min": float(probas.min()),
+        "proba_max": float(probas.max()),
+    }
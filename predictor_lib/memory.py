@@ -0,0 +1,28 @@
+"""
+Mesure mémoire du processus courant (RSS), sans dépendance externe.
+
+Linux : /proc/self/statm ; ailleurs : pic RSS via resource.getrusage.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import sys
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS du processus depuis son démarrage (Mo)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # octets sur macOS, kilo-octets sur Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb() -> float:
+    """RSS courant (Mo) ; retombe sur le pic si /proc n'est pas disponible."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
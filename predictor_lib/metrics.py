@@ -0,0 +1,213 @@
+"""
+Instrumentation légère de l'API : histogrammes à buckets fixes, compteurs,
+export au format texte Prometheus et en-tête Server-Timing.
+
+- MetricsMiddleware (ASGI pur) démarre un chronomètre par requête, compte les
+  réponses par route et statut, et ajoute l'en-tête Server-Timing.
+- @timed_handler sur un endpoint mesure "parse" (lecture du corps + validation
+  Pydantic, jusqu'à l'entrée dans l'endpoint) et "serialize" (de la sortie de
+  l'endpoint à l'envoi des en-têtes).
+- `with stage("encode"):` chronomètre une étape à l'intérieur d'un endpoint.
+
+Sans requête en cours (appel direct, tests), stage() ne mesure rien.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# bornes en secondes : 100 µs à 10 s
+DEFAULT_BUCKETS_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                     0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), n: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + n
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_fmt_labels(self.labelnames, k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS_S):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # par jeu de labels : [compte par bucket (+Inf en dernier), somme]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def count(self, labels: Tuple[str, ...]) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {total:.9g}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "predictor_stage_duration_seconds", "Durée de chaque étape du traitement d'une requête", ("route", "stage")
+)
+REQUESTS = Counter("predictor_requests_total", "Requêtes HTTP par route et statut", ("route", "method", "status"))
+# appels au modèle par type ("predict", "shap") : comparer le coût des explications à celui des prédictions
+MODEL_CALL_SECONDS = Histogram("predictor_model_call_seconds", "Durée d'un appel au modèle par type", ("kind",))
+MODEL_ROWS = Counter("predictor_model_rows_total", "Lignes passées au modèle par type d'appel", ("kind",))
+
+
+@contextmanager
+def model_call(kind: str, n_rows: int) -> Iterator[None]:
+    """Chronomètre un appel au modèle (hors attente du budget de threads)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_CALL_SECONDS.observe((kind,), time.perf_counter() - t0)
+        MODEL_ROWS.inc((kind,), n_rows)
+
+
+class RequestTimer:
+    """Chronomètre d'une requête : début, entrée / sortie d'endpoint, durées par étape."""
+
+    __slots__ = ("t0", "handler_start", "handler_end", "stages")
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+_CURRENT: contextvars.ContextVar[Optional[RequestTimer]] = contextvars.ContextVar("request_timer", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timer = _CURRENT.get()
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - t0)
+
+
+def timed_handler(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Marque l'entrée / la sortie d'un endpoint synchrone (étapes parse et serialize)."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        timer = _CURRENT.get()
+        if timer is not None:
+            timer.handler_start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if timer is not None:
+                timer.handler_end = time.perf_counter()
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : compteurs par route / statut, histogrammes d'étapes, en-tête Server-Timing."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timer = RequestTimer()
+        token = _CURRENT.set(timer)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timer.handler_start is not None:
+                    timer.stages["parse"] = timer.handler_start - timer.t0
+                if timer.handler_end is not None:
+                    timer.stages["serialize"] = now - timer.handler_end
+                timer.stages["total"] = now - timer.t0
+                route = getattr(scope.get("route"), "path", "other")
+                REQUESTS.inc((route, scope["method"], str(message["status"])))
+                for name, seconds in timer.stages.items():
+                    STAGE_SECONDS.observe((route, name), seconds)
+                header = ", ".join(f"{n};dur={s * 1e3:.3f}" for n, s in timer.stages.items())
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _CURRENT.reset(token)
+
+
+def sample_lines(name: str, help_text: str, value: float, kind: str = "gauge",
+                 labels: Optional[Dict[str, str]] = None) -> List[str]:
+    """Une série calculée au moment du scrape (ex. compteurs du cache, profondeur de file)."""
+    names, values = zip(*labels.items()) if labels else ((), ())
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}",
+            f"{name}{_fmt_labels(names, values)} {value:g}"]
+
+
+def render(*metrics: Any, extra_lines: Sequence[str] = ()) -> str:
+    """Format texte Prometheus 0.0.4."""
+    lines: List[str] = []
+    for m in metrics:
+        lines += m.render()
+    lines += list(extra_lines)
+    return "\n".join(lines) + "\n"
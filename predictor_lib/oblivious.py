@@ -0,0 +1,311 @@
+"""
+Moteur d'inférence NumPy pour les modèles CatBoost à arbres symétriques (oblivious).
+
+Le modèle est lu depuis l'export JSON de CatBoost puis précompilé en tableaux
+plats : hash des valeurs catégorielles (CityHash64 tronqué, mémoïsé), une table
+de CTR globale triée pour une recherche vectorisée (np.searchsorted), indices
+de split par arbre et feuilles concaténées. Un lot est évalué en un nombre
+d'opérations NumPy indépendant du nombre de CTR et d'arbres : features
+binaires d'abord, puis indice de feuille de chaque arbre bit à bit
+(indice = somme des bits << profondeur).
+
+Périmètre : classification binaire, features float + catégorielles, CTR
+Borders / Buckets / Counter / FeatureFreq (les types utilisés par CatBoostClassifier).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from predictor_lib.cityhash import cat_feature_hash
+
+_HASH_MULT = np.uint64(0x4906BA494954CB65)
+# taille des sous-lots évalués d'un coup (borne la mémoire : n x n_arbres)
+DEFAULT_CHUNK_ROWS = 1024
+
+
+def _as_hash_word(h: int) -> int:
+    """Hash 32 bits -> mot uint64 tel que CatBoost le combine (int32 étendu en signe)."""
+    h &= 0xFFFFFFFF
+    return h | 0xFFFFFFFF00000000 if h & 0x80000000 else h
+
+
+def _combine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """CalcHash(a, b) de CatBoost, en arithmétique uint64 modulo 2**64."""
+    with np.errstate(over="ignore"):
+        return _HASH_MULT * (a + _HASH_MULT * b)
+
+
+_CTR_KINDS = {"Borders": 0, "Counter": 1, "FeatureFreq": 1, "Buckets": 2}
+
+
+class ObliviousTreeEngine:
+    """Évalue un CatBoostClassifier symétrique exporté en JSON, sans la bibliothèque CatBoost."""
+
+    def __init__(self, model_json: Dict[str, Any], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.chunk_rows = int(chunk_rows)
+        info = model_json["features_info"]
+        cat_infos = info.get("categorical_features", [])
+        float_infos = info.get("float_features", [])
+
+        self.n_features = 1 + max(
+            [f["flat_feature_index"] for f in cat_infos + float_infos], default=-1
+        )
+        self.feature_names: List[Any] = [None] * self.n_features
+        for f in cat_infos + float_infos:
+            self.feature_names[f["flat_feature_index"]] = f.get("feature_id")
+
+        # colonnes d'entrée (ordre plat du modèle) de chaque feature catégorielle / float
+        self._cat_cols = np.array([f["flat_feature_index"] for f in cat_infos], dtype=np.int64)
+        self._float_cols = np.array([f["flat_feature_index"] for f in float_infos], dtype=np.int64)
+        self._float_nan_true = np.array(
+            [f.get("nan_value_treatment") == "AsTrue" for f in float_infos], dtype=bool
+        )
+        self._hash_memo: List[Dict[str, int]] = [{} for _ in cat_infos]
+
+        # "sources" : colonnes uint64 dérivées des entrées, partagées par les features binaires
+        # et les projections de CTR. Clés : ("cat", ci), ("float", fi, border), ("exact", ci, hash)
+        direct_keys: List[Tuple[Any, ...]] = []
+        for fi, f in enumerate(float_infos):
+            direct_keys += [("float", fi, float(b)) for b in f.get("borders", [])]
+        for ci, f in enumerate(cat_infos):
+            direct_keys += [("exact", ci, _as_hash_word(int(v))) for v in f.get("values", [])]
+
+        projections: Dict[Tuple[Tuple[Any, ...], ...], int] = {}
+        tables: Dict[str, int] = {}
+        lookups: Dict[Tuple[int, int], int] = {}
+        ctr_rows = []
+        ctr_bins_ctr: List[int] = []
+        ctr_bins_border: List[float] = []
+        for c in info.get("ctrs", []):
+            cats, floats, exacts = [], [], []
+            for e in c["elements"]:
+                kind = e["combination_element"]
+                if kind == "cat_feature_value":
+                    cats.append(("cat", e["cat_feature_index"]))
+                elif kind == "float_feature":
+                    floats.append(("float", e["float_feature_index"], float(e["border"])))
+                elif kind == "cat_feature_exact_value":
+                    exacts.append(("exact", e["cat_feature_index"], _as_hash_word(int(e["value"]))))
+                else:
+                    raise ValueError(f"Élément de projection CTR non supporté: {kind}")
+            if c["ctr_type"] not in _CTR_KINDS:
+                raise ValueError(f"Type de CTR non supporté: {c['ctr_type']}")
+            # ordre de hachage CatBoost : catégorielles, splits float, valeurs one-hot
+            proj = projections.setdefault(tuple(cats + floats + exacts), len(projections))
+            table = tables.setdefault(c["identifier"], len(tables))
+            look = lookups.setdefault((proj, table), len(lookups))
+            ctr_rows.append((look, table, _CTR_KINDS[c["ctr_type"]], int(c.get("target_border_idx", 0)),
+                             c.get("prior_numerator", 0.0), c.get("prior_denomerator", 1.0),
+                             c.get("shift", 0.0), c.get("scale", 1.0)))
+            for b in c.get("borders", []):
+                ctr_bins_ctr.append(len(ctr_rows) - 1)
+                ctr_bins_border.append(b)
+
+        # indices définitifs des sources : [catégorielles | splits float | égalités one-hot]
+        used = direct_keys + [k for p in projections for k in p]
+        float_srcs = list(dict.fromkeys(k for k in used if k[0] == "float"))
+        exact_srcs = list(dict.fromkeys(k for k in used if k[0] == "exact"))
+        n_cat = len(cat_infos)
+        src_index: Dict[Tuple[Any, ...], int] = {("cat", ci): ci for ci in range(n_cat)}
+        src_index.update({k: n_cat + i for i, k in enumerate(float_srcs)})
+        src_index.update({k: n_cat + len(float_srcs) + i for i, k in enumerate(exact_srcs)})
+        self._n_src = len(src_index)
+        self._float_src_fi = np.array([k[1] for k in float_srcs], dtype=np.int64)
+        self._float_src_border = np.array([k[2] for k in float_srcs], dtype=np.float32)
+        self._exact_src_ci = np.array([k[1] for k in exact_srcs], dtype=np.int64)
+        self._exact_src_value = np.array([k[2] for k in exact_srcs], dtype=np.uint64)
+
+        # projections : indices de sources complétés à droite, longueur réelle
+        max_len = max((len(p) for p in projections), default=0)
+        self._proj_src = np.zeros((len(projections), max_len), dtype=np.int64)
+        self._proj_len = np.zeros(len(projections), dtype=np.int64)
+        for p, i in projections.items():
+            self._proj_src[i, :len(p)] = [src_index[k] for k in p]
+            self._proj_len[i] = len(p)
+
+        self._look_proj = np.array([p for p, _ in lookups], dtype=np.int64)
+        self._look_table = np.array([t for _, t in lookups], dtype=np.uint64)
+        self._compile_tables(model_json.get("ctr_data", {}), tables)
+
+        ctr = np.array(ctr_rows, dtype=np.float64).reshape(-1, 8)
+        self._ctr_look = ctr[:, 0].astype(np.int64)
+        self._ctr_table = ctr[:, 1].astype(np.int64)
+        self._ctr_kind = ctr[:, 2].astype(np.int64)
+        self._ctr_tbi = ctr[:, 3].astype(np.int64)
+        self._ctr_prior_num, self._ctr_prior_denom, self._ctr_shift, self._ctr_scale = (
+            ctr[:, k].astype(np.float32) for k in range(4, 8)
+        )
+        self._direct_bins = np.array([src_index[k] for k in direct_keys], dtype=np.int64)
+        self._ctr_bins_ctr = np.array(ctr_bins_ctr, dtype=np.int64)
+        self._ctr_bins_border = np.array(ctr_bins_border, dtype=np.float32)
+        self.n_bins = len(direct_keys) + len(ctr_bins_ctr)
+
+        # arbres : splits par profondeur (complétés avec la colonne "toujours 0" = n_bins)
+        trees = model_json["oblivious_trees"]
+        depths = [len(t.get("splits") or []) for t in trees]
+        self.max_depth = max(depths, default=0)
+        if self.max_depth > 8:
+            raise ValueError("Profondeur > 8 non supportée (indices de feuille sur uint8)")
+        self.tree_splits = np.full((len(trees), self.max_depth), self.n_bins, dtype=np.int64)
+        for ti, t in enumerate(trees):
+            for d, s in enumerate(t.get("splits") or []):
+                self.tree_splits[ti, d] = s["split_index"]
+
+        leaf_counts = [len(t["leaf_values"]) for t in trees]
+        self.leaf_offsets = np.concatenate([[0], np.cumsum(leaf_counts)[:-1]]).astype(np.int64)
+        self.leaf_values = np.concatenate([np.asarray(t["leaf_values"], dtype=np.float64) for t in trees])
+        if len(self.leaf_values) != sum(2 ** d for d in depths):
+            raise ValueError("Modèle multi-dimensionnel non supporté (classification binaire uniquement)")
+        self.n_trees = len(trees)
+
+        scale, bias = model_json.get("scale_and_bias", [1.0, [0.0]])
+        self.scale = float(scale)
+        self.bias = float(bias[0] if isinstance(bias, list) else bias)
+
+    # -----------------------------
+    # Compilation
+    # -----------------------------
+
+    def _compile_tables(self, ctr_data: Dict[str, Any], tables: Dict[str, int]) -> None:
+        """Fusionne toutes les tables de CTR en un seul index trié sur (hash, table)."""
+        keys, hashes, table_ids, counts = [], [], [], []
+        self._table_denominator = np.zeros(len(tables), dtype=np.float32)
+        width = 2
+        for ident, t in tables.items():
+            data = ctr_data[ident]
+            stride = int(data["hash_stride"])
+            flat = data["hash_map"]
+            h = np.array([int(k) for k in flat[0::stride]], dtype=np.uint64)
+            c = np.array([flat[i + 1:i + stride] for i in range(0, len(flat), stride)],
+                         dtype=np.float32).reshape(len(h), stride - 1)
+            width = max(width, stride - 1)
+            hashes.append(h)
+            keys.append(_combine(h, np.full(len(h), t, dtype=np.uint64)))
+            table_ids.append(np.full(len(h), t, dtype=np.int64))
+            counts.append(c)
+            self._table_denominator[t] = float(data.get("counter_denominator", 0))
+
+        padded = [np.pad(c, ((0, 0), (0, width - c.shape[1]))) for c in counts]
+        all_keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+        order = np.argsort(all_keys, kind="stable")
+        self._gkeys = all_keys[order]
+        self._ghash = np.concatenate(hashes)[order] if hashes else np.zeros(0, dtype=np.uint64)
+        self._gtable = np.concatenate(table_ids)[order] if table_ids else np.zeros(0, dtype=np.int64)
+        self._gcounts = np.concatenate(padded)[order] if padded else np.zeros((0, width), dtype=np.float32)
+
+    @classmethod
+    def from_json(cls, json_path: str | Path, **kwargs: Any) -> "ObliviousTreeEngine":
+        with Path(json_path).open("r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    @classmethod
+    def from_cbm(cls, model_path: str | Path, **kwargs: Any) -> "ObliviousTreeEngine":
+        """Exporte le .cbm en JSON via CatBoost (seule étape qui utilise la bibliothèque) puis compile."""
+        from catboost import CatBoostClassifier
+
+        model = CatBoostClassifier()
+        model.load_model(str(model_path))
+        fd, tmp = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            model.save_model(tmp, format="json")
+            return cls.from_json(tmp, **kwargs)
+        finally:
+            os.unlink(tmp)
+
+    # -----------------------------
+    # Évaluation
+    # -----------------------------
+
+    def _hash_column(self, ci: int, column: np.ndarray) -> np.ndarray:
+        uniques, inverse = np.unique(column.astype(str), return_inverse=True)
+        memo = self._hash_memo[ci]
+        hashed = np.empty(len(uniques), dtype=np.uint64)
+        for i, u in enumerate(uniques):
+            h = memo.get(u)
+            if h is None:
+                h = memo[u] = _as_hash_word(cat_feature_hash(u))
+            hashed[i] = h
+        return hashed[inverse.reshape(-1)]
+
+    def _sources(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        src = np.empty((n, self._n_src), dtype=np.uint64)
+        n_cat = len(self._cat_cols)
+        for ci, c in enumerate(self._cat_cols):
+            src[:, ci] = self._hash_column(ci, X[:, c])
+        if len(self._float_src_fi):
+            floats = X[:, self._float_cols].astype(np.float32)[:, self._float_src_fi]
+            bits = (floats > self._float_src_border) | (self._float_nan_true[self._float_src_fi] & np.isnan(floats))
+            src[:, n_cat:n_cat + len(self._float_src_fi)] = bits
+        if len(self._exact_src_ci):
+            src[:, n_cat + len(self._float_src_fi):] = src[:, self._exact_src_ci] == self._exact_src_value
+        return src
+
+    def _ctr_values(self, src: np.ndarray) -> np.ndarray:
+        n = src.shape[0]
+        # hash de chaque projection, élément par élément
+        h = np.zeros((n, len(self._proj_len)), dtype=np.uint64)
+        for k in range(self._proj_src.shape[1]):
+            h = np.where(k < self._proj_len, _combine(h, src[:, self._proj_src[:, k]]), h)
+
+        # recherche (hash, table) dans l'index global trié
+        q = h[:, self._look_proj]
+        mixed = _combine(q, self._look_table)
+        if len(self._gkeys):
+            pos = np.minimum(np.searchsorted(self._gkeys, mixed), len(self._gkeys) - 1)
+            found = (self._gkeys[pos] == mixed) & (self._ghash[pos] == q) & \
+                (self._gtable[pos] == self._look_table.astype(np.int64))
+            counts = self._gcounts[pos] * found[..., None]
+        else:
+            found = np.zeros(q.shape, dtype=bool)
+            counts = np.zeros(q.shape + (self._gcounts.shape[1],), dtype=np.float32)
+
+        c = counts[:, self._ctr_look, :]
+        kind = self._ctr_kind
+        good = np.where(kind == 0, c[..., 1],
+                        np.where(kind == 1, c[..., 0],
+                                 np.take_along_axis(c, self._ctr_tbi[None, :, None], axis=2)[..., 0]))
+        total = np.where(kind == 0, c[..., 0] + c[..., 1],
+                         np.where(kind == 1, self._table_denominator[self._ctr_table], c.sum(axis=2)))
+        value = (good.astype(np.float32) + self._ctr_prior_num) / (total.astype(np.float32) + self._ctr_prior_denom)
+        return (value + self._ctr_shift) * self._ctr_scale
+
+    def _binarize(self, X: np.ndarray) -> np.ndarray:
+        src = self._sources(X)
+        bins = np.zeros((X.shape[0], self.n_bins + 1), dtype=np.uint8)
+        n_direct = len(self._direct_bins)
+        bins[:, :n_direct] = src[:, self._direct_bins]
+        if len(self._ctr_bins_ctr):
+            bins[:, n_direct:self.n_bins] = self._ctr_values(src)[:, self._ctr_bins_ctr] > self._ctr_bins_border
+        return bins
+
+    def predict_raw(self, X: Any, ntree_start: int = 0, ntree_end: int = 0) -> np.ndarray:
+        """Valeur brute (logit) pour chaque ligne ; X : lignes dans l'ordre des features du modèle."""
+        X = np.asarray(X, dtype=object)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        end = ntree_end or self.n_trees
+        splits = self.tree_splits[ntree_start:end]
+        offsets = self.leaf_offsets[ntree_start:end]
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_rows):
+            bins = self._binarize(X[start:start + self.chunk_rows])
+            leaf = np.zeros((bins.shape[0], splits.shape[0]), dtype=np.uint8)
+            for d in range(self.max_depth):
+                leaf |= bins[:, splits[:, d]] << np.uint8(d)
+            out[start:start + bins.shape[0]] = self.leaf_values[offsets + leaf].sum(axis=1)
+        bias = self.bias if ntree_start == 0 else 0.0
+        return self.scale * out + bias
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Même forme que CatBoostClassifier.predict_proba : (n, 2)."""
+        p1 = 1.0 / (1.0 + np.exp(-self.predict_raw(X)))
+        return np.column_stack([1.0 - p1, p1])
@@ -0,0 +1,95 @@
+"""
+Codes de référence compilés pour la validation côté API.
+
+compile_code_sets() transforme {champ: [codes]} de data/ref_options.json en
+{champ: frozenset} de codes canoniques. Le code canonique est le texte que
+l'encodeur envoie au modèle : str(code), les flottants entiers écrits comme des
+entiers (1, "1" et 1.0 sont le même code, comme le cast texte d'Arrow), et c'est
+bien la valeur scorée qui est contrôlée. canonical_code (ligne à ligne),
+canonical_codes (pandas) et canonical_column (Arrow) appliquent cette même règle
+pour /predict, /predict_batch et /predict/arrow. Chaque contrôle est une appartenance
+à un ensemble haché : ligne à ligne (invalid_codes), ou par colonne sur les seules
+valeurs distinctes (invalid_rows pour pandas, invalid_positions pour Arrow).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# {champ: codes canoniques acceptés}
+CodeSets = Dict[str, FrozenSet[str]]
+
+
+def canonical_code(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def canonical_codes(column: pd.Series, missing: str) -> pd.Series:
+    """Codes canoniques (str) d'une colonne pandas, `missing` pour les valeurs manquantes.
+
+    Les colonnes de seuls entiers ou textes (cas courant) sont converties d'un bloc ;
+    les autres (flottants, types mêlés) passent par canonical_code valeur par valeur.
+    """
+    if pd.api.types.infer_dtype(column, skipna=True) not in ("string", "integer", "empty"):
+        column = column.map(canonical_code, na_action="ignore")
+    return column.astype("string").fillna(missing).astype(str)
+
+
+def canonical_column(column: pa.ChunkedArray | pa.Array) -> pa.ChunkedArray | pa.Array:
+    """Codes canoniques d'une colonne Arrow (nulls conservés) : le cast texte d'Arrow écrit
+    déjà les flottants entiers comme des entiers (1.0 -> "1")."""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        return column
+    return pc.cast(column, pa.string())
+
+
+def compile_code_sets(codes: Mapping[str, Iterable[Any]], fields: Optional[Iterable[str]] = None) -> CodeSets:
+    """Ensembles de codes canoniques des champs de `codes` (restreints à `fields` si fourni)."""
+    keep = None if fields is None else set(fields)
+    return {
+        f: frozenset(canonical_code(c) for c in values)
+        for f, values in codes.items()
+        if keep is None or f in keep
+    }
+
+
+def field_checks(code_sets: CodeSets, features: Sequence[str]) -> Tuple[Tuple[int, str, FrozenSet[str]], ...]:
+    """(position, champ, codes) des features contrôlées, dans l'ordre des colonnes du modèle."""
+    return tuple((i, f, code_sets[f]) for i, f in enumerate(features) if f in code_sets)
+
+
+def invalid_codes(
+    row: Sequence[str], checks: Iterable[Tuple[int, str, FrozenSet[str]]], missing: str
+) -> Dict[str, str]:
+    """{champ: code} des codes encodés de `row` hors référence ; `missing` (valeur absente) est toujours accepté."""
+    return {f: row[i] for i, f, codes in checks if row[i] not in codes and row[i] != missing}
+
+
+def invalid_rows(column: pd.Series, codes: FrozenSet[str], missing: str) -> np.ndarray:
+    """Indices des lignes d'une colonne de codes encodés (str) hors référence.
+
+    Seules les valeurs distinctes sont contrôlées ; les lignes ne sont parcourues
+    qu'en présence d'un code inconnu.
+    """
+    unknown = {v for v in column.unique() if v not in codes and v != missing}
+    if not unknown:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(column.isin(unknown).to_numpy())
+
+
+def invalid_positions(column: pa.ChunkedArray | pa.Array, codes: FrozenSet[str]) -> np.ndarray:
+    """Indices des valeurs non nulles d'une colonne Arrow texte hors référence (mêmes règles)."""
+    unknown = set(pc.unique(column).drop_null().to_pylist()) - codes
+    if not unknown:
+        return np.empty(0, dtype=np.intp)
+    mask = pc.fill_null(pc.is_in(column, value_set=pa.array(sorted(unknown), column.type)), False)
+    return np.flatnonzero(mask.to_numpy(zero_copy_only=False))
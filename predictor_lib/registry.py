@@ -0,0 +1,152 @@
+"""
+Registre de modèles nommés servis par un même processus.
+
+Chaque modèle est décrit par un ModelSpec (nom, .cbm, meta.json) et chargé
+à la première requête via la fonction `loader` fournie par l'API. Au-delà de
+`max_loaded` modèles en mémoire, le moins récemment utilisé est déchargé
+(il sera rechargé à sa prochaine requête). Latence et mémoire par modèle
+sont exposées par stats().
+"""
+
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from predictor_lib.memory import rss_mb
+
+LATENCY_WINDOW = 1024
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    model_path: Path
+    meta_path: Path
+
+
+def parse_registry(spec: str) -> Dict[str, ModelSpec]:
+    """'nom=modele.cbm,meta.json;nom2=...' -> {nom: ModelSpec}."""
+    specs: Dict[str, ModelSpec] = {}
+    for entry in filter(None, (e.strip() for e in spec.split(";"))):
+        name, sep, paths = entry.partition("=")
+        model_path, comma, meta_path = paths.partition(",")
+        if not sep or not comma or not name.strip():
+            raise ValueError(f"Entrée de registre invalide (attendu nom=modele.cbm,meta.json): {entry}")
+        specs[name.strip()] = ModelSpec(name.strip(), Path(model_path.strip()), Path(meta_path.strip()))
+    return specs
+
+
+class _Entry:
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.value: Any = None
+        self.load_lock = threading.Lock()
+        self.loads = 0
+        self.unloads = 0
+        self.last_load_ms: Optional[float] = None
+        self.rss_delta_mb: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.requests = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+
+class ModelRegistry:
+    """Chargement paresseux par nom, déchargement LRU au-delà de `max_loaded` modèles."""
+
+    def __init__(self, specs: Dict[str, ModelSpec], loader: Callable[[ModelSpec], Any], max_loaded: int = 2):
+        self.loader = loader
+        self.max_loaded = max(1, int(max_loaded))
+        self._entries = {name: _Entry(spec) for name, spec in specs.items()}
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def spec(self, name: str) -> ModelSpec:
+        """KeyError si le nom n'est pas déclaré."""
+        return self._entries[name].spec
+
+    def get(self, name: str) -> Any:
+        """Modèle chargé (chargé à la demande) ; KeyError si inconnu, l'erreur du loader sinon."""
+        entry = self._entries[name]
+        value = entry.value
+        if value is None:
+            # un verrou par modèle : charger l'un ne bloque pas les requêtes des autres
+            with entry.load_lock:
+                value = entry.value
+                if value is None:
+                    value = self._load(entry)
+        self._touch(name)
+        return value
+
+    def _load(self, entry: _Entry) -> Any:
+        rss_before = rss_mb()
+        t0 = time.perf_counter()
+        try:
+            value = self.loader(entry.spec)
+        except Exception as e:
+            entry.last_error = f"{type(e).__name__}: {e}"
+            raise
+        entry.last_load_ms = (time.perf_counter() - t0) * 1e3
+        # approximatif si d'autres allocations ont lieu pendant le chargement
+        entry.rss_delta_mb = rss_mb() - rss_before
+        entry.last_error = None
+        entry.loads += 1
+        entry.value = value
+        return value
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+            while len(self._lru) > self.max_loaded:
+                old, _ = self._lru.popitem(last=False)
+                self._unload(old)
+
+    def _unload(self, name: str) -> None:
+        entry = self._entries[name]
+        # les requêtes en cours gardent leur référence ; la mémoire est rendue après elles
+        entry.value = None
+        entry.unloads += 1
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            self._lru.pop(name, None)
+            self._unload(name)
+
+    def record(self, name: str, latency_ms: float) -> None:
+        entry = self._entries[name]
+        with self._lock:
+            entry.requests += 1
+            entry.latencies_ms.append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for name, e in self._entries.items():
+                lat = sorted(e.latencies_ms)
+                models[name] = {
+                    "loaded": e.value is not None,
+                    "model_path": str(e.spec.model_path),
+                    "meta_path": str(e.spec.meta_path),
+                    "loads": e.loads,
+                    "unloads": e.unloads,
+                    "last_load_ms": e.last_load_ms,
+                    "rss_delta_mb": e.rss_delta_mb,
+                    "last_error": e.last_error,
+                    "requests": e.requests,
+                    "latency_ms": {
+                        "mean": statistics.fmean(lat),
+                        "p50": lat[len(lat) // 2],
+                        "p95": lat[min(len(lat) - 1, int(0.95 * len(lat)))],
+                        "max": lat[-1],
+                    } if lat else None,
+                }
+            return {"max_loaded": self.max_loaded, "loaded": list(self._lru), "rss_mb": rss_mb(), "models": models}
@@ -0,0 +1,76 @@
+"""
+Surveillance de fichiers pour le rechargement à chaud du modèle.
+
+Un thread interroge périodiquement (mtime, taille) de chaque fichier. Un
+changement n'est signalé qu'une fois la signature stable sur deux relevés
+consécutifs, pour ne pas recharger un .cbm en cours de copie.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+def file_signature(paths: Sequence[str | Path]) -> Signature:
+    """(mtime_ns, taille) de chaque fichier, None s'il est absent."""
+    sig = []
+    for p in paths:
+        try:
+            st = Path(p).stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class FileWatcher:
+    """Appelle `on_change()` quand l'un des fichiers change puis reste stable."""
+
+    def __init__(self, paths: Sequence[str | Path], interval_s: float, on_change: Callable[[], None]):
+        if interval_s <= 0:
+            raise ValueError("interval_s doit être > 0")
+        self.paths = [Path(p) for p in paths]
+        self.interval_s = float(interval_s)
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._current = file_signature(self.paths)
+
+    def start(self) -> "FileWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self, pending: Optional[Signature] = None) -> Optional[Signature]:
+        """Un relevé ; renvoie la signature en attente de stabilisation (None sinon)."""
+        sig = file_signature(self.paths)
+        if sig == self._current:
+            return None
+        if sig != pending:
+            return sig  # changement vu une première fois : attendre le relevé suivant
+        self._current = sig
+        try:
+            self.on_change()
+        except Exception:  # le thread doit survivre à un rechargement raté
+            logger.exception("Rechargement après modification de %s en échec", self.paths)
+        return None
+
+    def _run(self) -> None:
+        pending: Optional[Signature] = None
+        while not self._stop.wait(self.interval_s):
+            pending = self.poll(pending)
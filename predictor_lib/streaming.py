@@ -0,0 +1,68 @@
+"""
+Lecture NDJSON incrémentale et réponse en flux pour POST /predict/stream.
+
+- ndjson_lines() découpe un flux d'octets en lignes numérotées (à partir de 1),
+  sans jamais garder plus d'une ligne incomplète en mémoire ; une ligne plus
+  longue que `max_line_bytes` est remplacée par un dict d'erreur puis ignorée
+  jusqu'au saut de ligne suivant.
+- NDJSONStreamResponse envoie les morceaux d'un générateur asynchrone. Contrairement
+  à StreamingResponse, elle ne lance pas de tâche d'écoute de la déconnexion en
+  parallèle : cette tâche consommerait les messages du corps de la requête, que le
+  générateur lit lui-même (une déconnexion y lève ClientDisconnect).
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Tuple, Union
+
+from starlette.responses import Response
+
+Line = Tuple[int, Union[bytes, Dict[str, Any]]]
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[Line]:
+    """(numéro, octets) par ligne non vide ; (numéro, erreur) pour une ligne trop longue."""
+    pending = b""  # début de la ligne en cours
+    number = 0
+    skipping = False  # ligne trop longue déjà signalée : ignorer jusqu'au prochain saut de ligne
+    async for piece in chunks:
+        if not piece:
+            continue
+        *complete, rest = piece.split(b"\n")
+        for part in complete:
+            number += 1
+            if skipping:
+                skipping = False
+                continue
+            line, pending = pending + part, b""
+            if len(line) > max_line_bytes:
+                yield number, {"error": "Ligne trop longue", "max_bytes": max_line_bytes}
+            elif line.strip():
+                yield number, line
+        if skipping:
+            continue
+        pending += rest
+        if len(pending) > max_line_bytes:
+            # signalée tout de suite ; son numéro sera compté à son saut de ligne
+            yield number + 1, {"error": "Ligne trop longue", "max_bytes": max_line_bytes}
+            pending, skipping = b"", True
+    if pending.strip() and not skipping:
+        yield number + 1, pending
+
+
+class NDJSONStreamResponse(Response):
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content: AsyncIterable[bytes], status_code: int = 200) -> None:
+        self.body_iterator = content
+        self.status_code = status_code
+        self.background = None
+        self.init_headers(None)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async for chunk in self.body_iterator:
+            # send() ne rend la main qu'une fois le morceau accepté par le serveur :
+            # le bloc suivant n'est lu qu'ensuite (contre-pression)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
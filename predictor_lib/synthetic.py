@@ -0,0 +1,47 @@
+"""
+Génération d'enregistrements synthétiques à partir de data/ref_options.json.
+
+Sert aux benchmarks et aux prédictions de chauffe : chaque champ du modèle
+reçoit un code tiré uniformément parmi les options de référence.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_REF_PATH = BASE_DIR / "data" / "ref_options.json"
+
+
+def load_codes(ref_path: str | Path = DEFAULT_REF_PATH) -> Dict[str, List[Any]]:
+    """Retourne {champ: [codes]} pour chaque champ à options du fichier de référence."""
+    with Path(ref_path).open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        field: [opt["code"] for opt in options]
+        for field, options in data.items()
+        if isinstance(options, list)
+    }
+
+
+def synthetic_records(
+    n: int,
+    features: Sequence[str],
+    ref_path: str | Path = DEFAULT_REF_PATH,
+    seed: int = 0,
+    fallback: Optional[Mapping[str, Sequence[Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Tire `n` enregistrements {feature: code} reproductibles (graine `seed`).
+
+    `fallback` fournit des valeurs pour les champs absents du fichier de référence
+    (ex. `minute` du modèle product15).
+    """
+    codes = {**(fallback or {}), **load_codes(ref_path)}
+    missing = [f for f in features if f not in codes]
+    if missing:
+        raise ValueError(f"Champs absents du fichier de référence: {missing}")
+    rng = random.Random(seed)
+    return [{f: rng.choice(codes[f]) for f in features} for _ in range(n)]
@@ -0,0 +1,91 @@
+"""
+Configuration d'inférence recommandée par `main.py tune` (workers, threads, taille de lot).
+
+Le fichier JSON (TUNING_PATH, défaut out/tuning.json) contient la recommandation
+et toutes les mesures du balayage :
+
+    {"workers": 4, "thread_count": 4, "batch_size": 64, "cpu_count": 16,
+     "p99_budget_ms": 50.0, "created_at": ..., "results": [...]}
+
+Il est lu par start.py (nombre de workers uvicorn) et par predictor.py
+(INFERENCE_THREAD_COUNT, INFERENCE_THREADS, MICROBATCH_MAX_SIZE). Une variable
+d'environnement définie l'emporte toujours sur le fichier (tuned_int).
+Ce module n'importe ni CatBoost ni predictor : start.py le charge sans coût.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_TUNING_PATH = BASE_DIR / "out" / "tuning.json"
+
+
+def tuning_path() -> Path:
+    return Path(os.getenv("TUNING_PATH", str(DEFAULT_TUNING_PATH)))
+
+
+def load_tuning(path: Optional[str | Path] = None) -> Dict[str, Any]:
+    """Recommandation enregistrée ; {} si le fichier est absent ou illisible."""
+    path = Path(path) if path is not None else tuning_path()
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def save_tuning(path: str | Path, recommendation: Mapping[str, Any], results: Sequence[Mapping[str, Any]],
+                **extra: Any) -> Dict[str, Any]:
+    config = {**recommendation, **extra, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "results": [dict(r) for r in results]}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(config, ensure_ascii=False, indent=1), encoding="utf-8")
+    return config
+
+
+def tuned_int(env: str, config: Mapping[str, Any], key: str, default: int) -> int:
+    """Variable d'environnement `env` si définie, sinon `config[key]`, sinon `default`."""
+    if os.getenv(env) is not None:
+        return int(os.environ[env])
+    value = config.get(key)
+    return int(value) if value is not None else default
+
+
+def recommend(results: Sequence[Mapping[str, Any]], p99_budget_ms: float) -> Dict[str, Any]:
+    """
+    Meilleur débit parmi les mesures dont le p99 tient dans le budget.
+
+    Si aucune ne le tient, la mesure de plus faible p99. À débit égal à 5 % près,
+    la configuration de plus faible p99 est préférée.
+    """
+    if not results:
+        raise ValueError("Aucune mesure à départager")
+    within = [r for r in results if r["p99_ms"] <= p99_budget_ms]
+    if not within:
+        best = min(results, key=lambda r: r["p99_ms"])
+    else:
+        top = max(r["rows_per_s"] for r in within)
+        best = min((r for r in within if r["rows_per_s"] >= 0.95 * top), key=lambda r: r["p99_ms"])
+    return {
+        "workers": int(best["workers"]),
+        "thread_count": int(best["thread_count"]),
+        "batch_size": int(best["batch_size"]),
+        "rows_per_s": best["rows_per_s"],
+        "p99_ms": best["p99_ms"],
+        "within_budget": bool(within),
+    }
+
+
+def default_grid(cpu_count: int) -> List[int]:
+    """1, 2, 4, ... jusqu'au nombre de cœurs (inclus)."""
+    values, v = [], 1
+    while v < cpu_count:
+        values.append(v)
+        v *= 2
+    return values + [cpu_count]
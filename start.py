@@ -1,6 +1,10 @@
 """
 Lance l'API FastAPI (predictor) et l'interface Streamlit en parallele.
 
+Le nombre de workers uvicorn vient de API_WORKERS, sinon du reglage ecrit par
+`main.py tune` (TUNING_PATH, defaut out/tuning.json), sinon 1. Chaque worker
+reprend du meme fichier ses threads CatBoost et sa taille de micro-lot.
+
 Usage:
     uv run python start.py
 """
@@ -10,19 +14,31 @@ import sys
 import signal
 import os
 
+from predictor_lib.tuning import load_tuning, tuned_int
+
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def api_workers(config=None):
+    """Workers uvicorn : API_WORKERS, sinon le reglage de `main.py tune`, sinon 1."""
+    return max(1, tuned_int("API_WORKERS", load_tuning() if config is None else config, "workers", 1))
+
+
+def api_command(workers=1):
+    cmd = [sys.executable, "-m", "uvicorn", "predictor:app", "--host", "0.0.0.0", "--port", "8000"]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    return cmd
+
+
 def main():
     procs = []
 
     # 1. Lancer l'API FastAPI
-    api_proc = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "predictor:app", "--host", "0.0.0.0", "--port", "8000"],
-        cwd=PROJECT_DIR,
-    )
+    workers = api_workers()
+    api_proc = subprocess.Popen(api_command(workers), cwd=PROJECT_DIR)
     procs.append(api_proc)
-    print(f"[start] API FastAPI lancee (PID {api_proc.pid}) sur http://localhost:8000")
+    print(f"[start] API FastAPI lancee (PID {api_proc.pid}, {workers} worker(s)) sur http://localhost:8000")
 
     # 2. Lancer Streamlit
     st_proc = subprocess.Popen(
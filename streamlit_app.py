@@ -32,7 +32,9 @@ st.set_page_config(
 
 
 # T017: Load reference data on initialization
-@st.cache_data
+# cache_resource: one shared read-only object (with its ReferenceIndex) instead of an
+# unpickled copy per rerun as with cache_data
+@st.cache_resource
 def load_reference_data():
     """Load reference data from JSON file (cached)."""
     try:
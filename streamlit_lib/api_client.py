@@ -2,16 +2,26 @@
 API client for FastAPI prediction backend.
 
 This module provides functions to:
-- Call the /predict endpoint
+- Call the /predict endpoint through a shared, pooled keep-alive session
+- Retry connection errors (only) with jittered exponential backoff
+- Fail fast while the API is down (process-wide circuit breaker, half-open /health probes)
+- Probe /health in the background and cache the result for the UI
+- Memoize successful predictions per (model fingerprint, canonical inputs), shared by all sessions
+- Run predictions in background threads (speculative prediction before "Predire" is pressed)
 - Handle timeouts and errors
 - Format responses for Streamlit display
 """
 
 import logging
 import os
+import random
+import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
 
 logger = logging.getLogger(__name__)
@@ -20,13 +30,340 @@ logger = logging.getLogger(__name__)
 # API configuration
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 PREDICT_ENDPOINT = f"{API_URL}/predict"
-REQUEST_TIMEOUT = 10  # 10 seconds
+HEALTH_ENDPOINT = f"{API_URL}/health"
+CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))  # seconds to open the TCP/TLS connection
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "10"))  # seconds to wait for the response
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Connection pool shared by Streamlit's script threads (one per browser session rerun)
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+# Retries after a connection error (request never reached the API); timeouts are not retried
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+RETRY_BACKOFF_S = float(os.getenv("API_RETRY_BACKOFF_S", "0.2"))
+
+# Circuit breaker: open after N consecutive failed calls, probe /health again after BREAKER_RESET_S
+BREAKER_FAILURES = int(os.getenv("API_BREAKER_FAILURES", "3"))
+BREAKER_RESET_S = float(os.getenv("API_BREAKER_RESET_S", "5"))
+# Background /health probe whose cached result the UI displays, with short timeouts
+HEALTH_PROBE_INTERVAL_S = float(os.getenv("API_HEALTH_INTERVAL_S", "5"))
+HEALTH_TIMEOUT = (1.0, 2.0)
+
+# Error types that count as a failure of the API itself (not of the user's inputs)
+BREAKER_ERROR_TYPES = {"timeout", "connection", "network", "server"}
+
+# Memo of successful predictions shared by all sessions of this Streamlit server (0 disables)
+MEMO_MAX_ENTRIES = int(os.getenv("API_MEMO_MAX_ENTRIES", "1024"))
+MEMO_TTL_S = float(os.getenv("API_MEMO_TTL_S", "600"))
+
+# Background threads for speculative predictions (shared by all sessions)
+SPECULATIVE_WORKERS = int(os.getenv("API_SPECULATIVE_WORKERS", "4"))
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide HTTP session, creating it on first use.
+
+    The session keeps connections alive (no TCP/TLS handshake per prediction) and its
+    pool holds up to POOL_SIZE connections, so concurrent script threads reuse
+    connections instead of opening new ones. requests' own retries are disabled:
+    connection errors are retried by _post_with_retry.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session (its pooled connections); the next call opens a new one."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, RETRY_BACKOFF_S * 2**attempt]."""
+    return random.uniform(0, RETRY_BACKOFF_S * (2 ** attempt))
+
+
+def _post_with_retry(url: str, **kwargs: Any) -> requests.Response:
+    """
+    POST through the shared session, retrying connection errors up to MAX_RETRIES times.
+
+    Timeouts (including connect timeouts) and HTTP error statuses are returned or raised
+    immediately: only failures where the request could not be sent are retried.
+    """
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return session.post(url, **kwargs)
+        except requests.ConnectionError as e:
+            if isinstance(e, Timeout) or attempt == MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(
+                "Prediction API connection error (%s), retry %d/%d in %.0f ms",
+                type(e).__name__, attempt + 1, MAX_RETRIES, delay * 1000
+            )
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def probe_health() -> dict[str, Any]:
+    """
+    Call GET /health once (short timeouts, no retry).
+
+    Returns:
+        {"status": "up" | "loading" | "down", "model_name": str | None,
+         "model_fingerprint": str | None, "ready": bool | None, "checked_at": float, "latency_ms": float}
+    """
+    start_time = time.time()
+    result: dict[str, Any] = {"status": "down", "model_name": None, "model_fingerprint": None, "ready": None}
+    try:
+        response = get_session().get(HEALTH_ENDPOINT, timeout=HEALTH_TIMEOUT)
+        if response.status_code == 200:
+            body = response.json()
+            result.update(
+                status="up" if body.get("status") == "ok" else "loading",
+                model_name=body.get("model_name"),
+                model_fingerprint=body.get("model_fingerprint"),
+                ready=body.get("ready"),
+            )
+    except Exception as e:
+        logger.debug("Health probe failed: %s", type(e).__name__)
+    result.update(checked_at=time.time(), latency_ms=(time.time() - start_time) * 1000)
+    return result
+
+
+class CircuitBreaker:
+    """
+    Process-wide circuit breaker shared by Streamlit's script threads.
+
+    - closed: calls go through; `failure_threshold` consecutive failures open it
+    - open: calls fail fast for `reset_s` seconds
+    - half-open: then a single thread runs `probe` (GET /health) while the others keep
+      failing fast; a successful probe closes the breaker, a failed one reopens it
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_s: float,
+        probe: Callable[[], bool],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self._probe = probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = 0.0
+            self.fast_failures = 0
+
+    def allow(self) -> bool:
+        """True if a call may be sent now (possibly after a successful half-open probe)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN or self._clock() - self.opened_at < self.reset_s:
+                self.fast_failures += 1
+                return False
+            self.state = self.HALF_OPEN
+        # probe outside the lock: other threads fail fast meanwhile instead of waiting
+        ok = self._probe()
+        with self._lock:
+            if ok:
+                self.state, self.failures = self.CLOSED, 0
+                logger.info("Prediction API circuit closed (health probe succeeded)")
+            else:
+                self.state, self.opened_at = self.OPEN, self._clock()
+                self.fast_failures += 1
+        return ok
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Prediction API circuit closed")
+            self.state, self.failures = self.CLOSED, 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self.state, self.opened_at = self.OPEN, self._clock()
+                logger.warning("Prediction API circuit open after %d consecutive failures", self.failures)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "fast_failures": self.fast_failures}
+
+
+class HealthMonitor:
+    """Daemon thread calling `probe` every `interval_s` seconds; the last result is cached for the UI."""
+
+    def __init__(self, interval_s: float, probe: Callable[[], dict[str, Any]] = probe_health):
+        self.interval_s = interval_s
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last: dict[str, Any] = {"status": "unknown", "checked_at": None}
+
+    def start(self) -> "HealthMonitor":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="api-health-probe", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def probe_now(self) -> dict[str, Any]:
+        result = self._probe()
+        self.last = result
+        if result["status"] != "down":
+            # the API answers again: close the breaker without waiting for its own probe
+            BREAKER.record_success()
+        return result
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe_now()
+            self._stop.wait(self.interval_s)
+
+
+BREAKER = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_S, lambda: probe_health()["status"] != "down")
+HEALTH = HealthMonitor(HEALTH_PROBE_INTERVAL_S)
+
+
+def get_api_health() -> dict[str, Any]:
+    """
+    Cached API health for display, without blocking the script thread.
+
+    Starts the background probe on first use; its status is "unknown" until the first
+    probe completes.
+
+    Returns:
+        Last probe_health() result plus "breaker": CircuitBreaker.stats() and "memo": PredictionMemo.stats()
+    """
+    HEALTH.start()
+    return {**HEALTH.last, "breaker": BREAKER.stats(), "memo": MEMO.stats()}
+
+
+class PredictionMemo:
+    """
+    Thread-safe LRU memo of successful predictions: at most `max_entries`, each kept `ttl_s` seconds.
+
+    Keys include the model fingerprint reported by /health, so a model reload on the API
+    side never serves a result computed by the previous model.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: OrderedDict[tuple, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(fingerprint: str, inputs: dict[str, Any]) -> tuple:
+        """Canonical key: codes compared as text (1 and "1" are the same code), field order ignored."""
+        return (fingerprint, tuple(sorted((field, str(value)) for field, value in inputs.items())))
+
+    def get(self, key: tuple) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self._clock() - item[0] > self.ttl_s:
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(item[1])
+
+    def put(self, key: tuple, result: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock(), dict(result))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate()}
+
+
+MEMO = PredictionMemo(MEMO_MAX_ENTRIES, MEMO_TTL_S)
+
+
+def _memo_key(inputs: dict[str, Any]) -> tuple | None:
+    """
+    Memo key for `inputs`, or None while the model fingerprint is unknown.
+
+    The fingerprint comes from the cached background /health probe (started by
+    get_api_health), never from an extra request on the prediction path.
+    """
+    if MEMO.max_entries <= 0:
+        return None
+    fingerprint = HEALTH.last.get("model_fingerprint")
+    return PredictionMemo.key(fingerprint, inputs) if fingerprint else None
+
+
+def _connection_error() -> dict[str, Any]:
+    return {
+        "error": "connection",
+        "message": "Impossible de se connecter au service de prédiction. Vérifiez que l'API est démarrée."
+    }
 
 
 def call_predict_api(inputs: dict[str, Any]) -> dict[str, Any]:
     """
     Call the FastAPI prediction endpoint.
 
+    Successful results are memoized (see PredictionMemo): pressing "Predire" again with the
+    same inputs, in any session, returns without an HTTP call while the model is unchanged.
+    While the circuit breaker is open, fails fast with the "connection" error instead of
+    waiting for a timeout. Timeouts, connection/network errors and 5xx responses count as
+    failures; any other response (including 422) closes the breaker.
+
     Args:
         inputs: Dictionary with 15 prediction input fields
 
@@ -36,18 +373,49 @@ def call_predict_api(inputs: dict[str, Any]) -> dict[str, Any]:
         - Error: {"error": str, "message": str, "details": list} (details optional)
 
     Error Types:
-        - "timeout": Request took longer than 10 seconds
+        - "timeout": No response within READ_TIMEOUT seconds (10 by default)
         - "validation": Server rejected inputs (422 error)
         - "server": Server error (500 error)
         - "network": Connection failed or other network error
+        - "connection": Circuit breaker open (API considered down)
     """
     start_time = time.time()
+    key = _memo_key(inputs)
+    if key is not None:
+        cached = MEMO.get(key)
+        if cached is not None:
+            logger.info(
+                "Prediction memo hit: response_time_ms=%.1f, memo_hit_rate=%.2f (%d/%d)",
+                (time.time() - start_time) * 1000, MEMO.hit_rate(), MEMO.hits, MEMO.hits + MEMO.misses
+            )
+            return cached
+
+    if not BREAKER.allow():
+        logger.warning("Prediction API circuit open: failing fast")
+        return _connection_error()
+    result = _send_predict(inputs)
+    if result.get("error") in BREAKER_ERROR_TYPES:
+        BREAKER.record_failure()
+    else:
+        BREAKER.record_success()
+
+    if key is not None and is_success_response(result):
+        MEMO.put(key, result)
+        logger.info(
+            "Prediction memo miss: response_time_ms=%.1f, memo_hit_rate=%.2f (%d/%d)",
+            (time.time() - start_time) * 1000, MEMO.hit_rate(), MEMO.hits, MEMO.hits + MEMO.misses
+        )
+    return result
+
+
+def _send_predict(inputs: dict[str, Any]) -> dict[str, Any]:
+    """Send one /predict request and map the response or exception to call_predict_api's dicts."""
+    start_time = time.time()
     try:
-        response = requests.post(
+        response = _post_with_retry(
             PREDICT_ENDPOINT,
             json={"data": inputs},
             timeout=REQUEST_TIMEOUT,
-            headers={"Content-Type": "application/json", "Accept": "application/json"}
         )
         response_time_ms = (time.time() - start_time) * 1000
 
@@ -123,7 +491,8 @@ def call_predict_api(inputs: dict[str, Any]) -> dict[str, Any]:
         )
         return {
             "error": "timeout",
-            "message": "Le service met trop de temps à répondre (>10s). Veuillez réessayer dans quelques instants."
+            "message": f"Le service met trop de temps à répondre (>{READ_TIMEOUT:g}s). "
+                       "Veuillez réessayer dans quelques instants."
         }
 
     except ConnectionError:
@@ -132,10 +501,7 @@ def call_predict_api(inputs: dict[str, Any]) -> dict[str, Any]:
         logger.error(
             "Prediction API connection error after %.1f ms", response_time_ms
         )
-        return {
-            "error": "connection",
-            "message": "Impossible de se connecter au service de prédiction. Vérifiez que l'API est démarrée."
-        }
+        return _connection_error()
 
     except RequestException as e:
         # Generic network/request error
@@ -162,6 +528,22 @@ def call_predict_api(inputs: dict[str, Any]) -> dict[str, Any]:
         }
 
 
+def submit_predict_api(inputs: dict[str, Any]) -> Future:
+    """
+    Run call_predict_api(inputs) in a background thread.
+
+    The returned future resolves to the same dictionaries as call_predict_api (it never
+    raises for API errors). A queued call can still be cancelled; a running one completes
+    and its result is only memoized.
+    """
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="api-speculative")
+    return _executor.submit(call_predict_api, dict(inputs))
+
+
 def is_success_response(response: dict[str, Any]) -> bool:
     """
     Check if API response is a success.
@@ -215,6 +597,7 @@ def set_api_url(url: str) -> None:
     Args:
         url: Base API URL (e.g., "http://localhost:8000")
     """
-    global API_URL, PREDICT_ENDPOINT
+    global API_URL, PREDICT_ENDPOINT, HEALTH_ENDPOINT
     API_URL = url
     PREDICT_ENDPOINT = f"{API_URL}/predict"
+    HEALTH_ENDPOINT = f"{API_URL}/health"
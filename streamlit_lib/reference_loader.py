@@ -5,23 +5,140 @@ This module provides functions to:
 - Load reference data from data/ref_options.json
 - Validate reference data against schema
 - Format dropdown options as "code — libellé"
+- Index codes once (ReferenceIndex) for O(1) label, position, option and membership lookups
 """
 
 import json
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 
-def load_reference_data(json_path: str = "data/ref_options.json") -> dict[str, list[dict[str, Any]]]:
+class ReferenceData(dict):
+    """Reference data dict (field -> options) carrying its ReferenceIndex, built once at load time."""
+
+    index: "ReferenceIndex"
+
+
+@dataclass(frozen=True)
+class FieldIndex:
+    """Lookups for one field; dict keys are canonical codes (str(code)), first option wins."""
+
+    options: tuple[str, ...]          # formatted "code — libellé", in reference order
+    labels: dict[str, str]            # code -> label
+    positions: dict[str, int]         # code -> position in options
+    parsed: dict[str, str | int]      # formatted option -> parse_dropdown_value(option)
+    codes: frozenset                  # original codes (int or str), for strict membership
+
+
+class ReferenceIndex:
+    """
+    Immutable index over reference data, built once per load.
+
+    Replaces the linear scans of the option lists (label lookup, list.index on the
+    formatted options, valid-code lists) with dict and set lookups. Fields are the
+    keys whose value is a list of options ("help_texts" is skipped).
     """
-    Load and validate reference data from JSON file.
+
+    __slots__ = ("_fields",)
+
+    def __init__(self, reference_data: dict[str, Any]):
+        fields = {}
+        for field_name, options in reference_data.items():
+            if isinstance(options, list):
+                fields[field_name] = _index_field(options)
+        object.__setattr__(self, "_fields", fields)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ReferenceIndex is immutable")
+
+    def __reduce__(self):
+        # the data also lives in st.session_state, which may be pickled or deep-copied
+        # (runner.enforceSerializableSessionState, copy.deepcopy); __slots__ + read-only
+        # attributes need explicit support
+        return (_restore_index, (self._fields,))
+
+    def __contains__(self, field_name: str) -> bool:
+        return field_name in self._fields
+
+    def field(self, field_name: str) -> FieldIndex:
+        """Raises KeyError if field_name is not in the reference data."""
+        try:
+            return self._fields[field_name]
+        except KeyError:
+            raise KeyError(f"Field '{field_name}' not found in reference data") from None
+
+    def options(self, field_name: str) -> tuple[str, ...]:
+        """Formatted dropdown options "code — libellé" (built once)."""
+        return self.field(field_name).options
+
+    def label(self, field_name: str, code: int | str) -> str:
+        """Label of `code` (1 and "1" are the same code). Raises ValueError if unknown."""
+        try:
+            return self.field(field_name).labels[str(code)]
+        except KeyError:
+            raise ValueError(f"Code '{code}' not found in field '{field_name}'") from None
+
+    def position(self, field_name: str, code: int | str, default: int = 0) -> int:
+        """Position of `code` in options(field_name), or `default` if unknown."""
+        return self.field(field_name).positions.get(str(code), default)
+
+    def code_for_option(self, field_name: str, formatted_value: str) -> str | int:
+        """Code of a selected dropdown option (same result as parse_dropdown_value)."""
+        parsed = self.field(field_name).parsed.get(formatted_value)
+        return parse_dropdown_value(formatted_value) if parsed is None else parsed
+
+    def is_valid(self, field_name: str, value: Any) -> bool:
+        """True if `value` is one of the field's codes, compared as-is (1 is not "1")."""
+        try:
+            return value in self.field(field_name).codes
+        except TypeError:  # unhashable value
+            return False
+
+
+def _index_field(options: list[dict[str, Any]]) -> FieldIndex:
+    formatted = tuple(format_dropdown_option(opt['code'], opt['label']) for opt in options)
+    labels: dict[str, str] = {}
+    positions: dict[str, int] = {}
+    for position, opt in enumerate(options):
+        key = str(opt['code'])
+        labels.setdefault(key, opt['label'])
+        positions.setdefault(key, position)
+    return FieldIndex(
+        options=formatted,
+        labels=labels,
+        positions=positions,
+        parsed={option: parse_dropdown_value(option) for option in formatted},
+        codes=frozenset(opt['code'] for opt in options),
+    )
+
+
+def _restore_index(fields: dict[str, FieldIndex]) -> ReferenceIndex:
+    index = ReferenceIndex.__new__(ReferenceIndex)
+    object.__setattr__(index, "_fields", fields)
+    return index
+
+
+def get_reference_index(reference_data: dict[str, Any]) -> ReferenceIndex:
+    """
+    Index of `reference_data`: the one built by load_reference_data(), or a new one
+    for a plain dict (e.g. built by hand in tests).
+    """
+    index = getattr(reference_data, "index", None)
+    return index if isinstance(index, ReferenceIndex) else ReferenceIndex(reference_data)
+
+
+def load_reference_data(json_path: str = "data/ref_options.json") -> ReferenceData:
+    """
+    Load and validate reference data from JSON file, and build its ReferenceIndex.
 
     Args:
         json_path: Path to ref_options.json file (default: data/ref_options.json)
 
     Returns:
         Dictionary with field names as keys and lists of option dicts as values.
-        Each option dict has 'code' and 'label' keys.
+        Each option dict has 'code' and 'label' keys. The index is available as
+        `.index` (see get_reference_index).
 
     Raises:
         FileNotFoundError: If JSON file does not exist
@@ -71,6 +188,8 @@ def load_reference_data(json_path: str = "data/ref_options.json") -> dict[str, l
             if 'label' not in option:
                 raise ValueError(f"Field '{field}' option {idx} is missing 'label' key")
 
+    data = ReferenceData(data)
+    data.index = ReferenceIndex(data)
     return data
 
 
@@ -111,8 +230,7 @@ def get_dropdown_options(reference_data: dict[str, list[dict[str, Any]]], field_
     if field_name not in reference_data:
         raise KeyError(f"Field '{field_name}' not found in reference data")
 
-    options = reference_data[field_name]
-    return [format_dropdown_option(opt['code'], opt['label']) for opt in options]
+    return list(get_reference_index(reference_data).options(field_name))
 
 
 def parse_dropdown_value(formatted_value: str) -> str | int:
@@ -167,12 +285,7 @@ def get_label_for_code(reference_data: dict[str, list[dict[str, Any]]], field_na
     if field_name not in reference_data:
         raise KeyError(f"Field '{field_name}' not found in reference data")
 
-    options = reference_data[field_name]
-    for opt in options:
-        if opt['code'] == code or str(opt['code']) == str(code):
-            return opt['label']
-
-    raise ValueError(f"Code '{code}' not found in field '{field_name}'")
+    return get_reference_index(reference_data).label(field_name, code)
 
 
 def get_field_help(reference_data: dict[str, list[dict[str, Any]]], field_name: str) -> dict[str, Any] | None:
@@ -6,13 +6,18 @@ This module provides helper functions to:
 - Manage current page navigation
 - Store and retrieve prediction inputs
 - Handle prediction results
+- Launch the prediction speculatively as soon as the form is complete
 - Generate recap tables for display
 """
 
+import logging
+import time
 from typing import Any
 import streamlit as st
 import pandas as pd
-from streamlit_lib import validation, reference_loader
+from streamlit_lib import validation, reference_loader, api_client
+
+logger = logging.getLogger(__name__)
 
 
 def initialize_state(reference_data: dict[str, list[dict[str, Any]]]) -> None:
@@ -42,6 +47,12 @@ def initialize_state(reference_data: dict[str, list[dict[str, Any]]]) -> None:
     if 'is_form_complete' not in st.session_state:
         st.session_state.is_form_complete = False
 
+    if 'speculative_prediction' not in st.session_state:
+        st.session_state.speculative_prediction = None
+
+    if 'consumed_prediction_key' not in st.session_state:
+        st.session_state.consumed_prediction_key = None
+
 
 def get_current_page() -> int:
     """
@@ -87,8 +98,11 @@ def reset_form() -> None:
     - prediction_inputs
     - last_prediction
     - validation_errors
+    - speculative_prediction (cancelled if still queued) and consumed_prediction_key
     - Sets current_page to 1
     """
+    cancel_speculative_prediction()
+    st.session_state.consumed_prediction_key = None
     st.session_state.prediction_inputs = {}
     st.session_state.last_prediction = None
     st.session_state.validation_errors = {}
@@ -209,7 +223,9 @@ def update_form_complete_status() -> None:
     """
     Update is_form_complete flag based on current prediction_inputs.
 
-    Checks if all 15 required fields are filled.
+    Checks if all 15 required fields are filled. As soon as they are, the prediction is
+    launched in the background (see start_speculative_prediction); if the form is no
+    longer complete, the pending one is cancelled.
     """
     required_fields = [
         "dep", "lum", "atm", "catr", "agg", "int", "circ",
@@ -223,6 +239,88 @@ def update_form_complete_status() -> None:
         for field in required_fields
     )
 
+    if st.session_state.is_form_complete:
+        start_speculative_prediction(inputs)
+    else:
+        cancel_speculative_prediction()
+
+
+def _inputs_key(inputs: dict[str, Any]) -> tuple:
+    """Canonical inputs (codes as text, field order ignored), as in api_client's memo."""
+    return tuple(sorted((field, str(value)) for field, value in inputs.items()))
+
+
+def start_speculative_prediction(inputs: dict[str, Any]) -> None:
+    """
+    Launch the prediction for `inputs` in a background worker.
+
+    The in-flight future is kept in session state. Same inputs: the current one is kept;
+    changed inputs: it is cancelled and replaced. Inputs whose prediction was already
+    taken (see take_prediction) are not relaunched on later reruns.
+
+    Args:
+        inputs: Complete prediction inputs (15 fields)
+    """
+    key = _inputs_key(inputs)
+    current = st.session_state.get('speculative_prediction')
+    if current is not None and current["key"] == key:
+        return
+    if st.session_state.get('consumed_prediction_key') == key:
+        return
+    cancel_speculative_prediction()
+    st.session_state.speculative_prediction = {
+        "key": key,
+        "future": api_client.submit_predict_api(inputs),
+        "started_at": time.perf_counter(),
+    }
+
+
+def cancel_speculative_prediction() -> None:
+    """Drop the speculative prediction (cancelled if it has not started yet)."""
+    current = st.session_state.get('speculative_prediction')
+    if current is not None:
+        current["future"].cancel()
+    st.session_state.speculative_prediction = None
+
+
+def take_prediction(inputs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Prediction result for `inputs`, reusing the speculative one when it matches.
+
+    A matching speculative prediction is returned at once if ready, or waited for if still
+    in flight; otherwise (no speculation, other inputs, or a failed speculative call) the
+    API is called directly. The speculative prediction is consumed either way, and the
+    inputs are remembered so that reruns do not speculate on them again. The
+    perceived latency (from the "Predire" click to the result) is logged with its source.
+
+    Args:
+        inputs: Complete prediction inputs (15 fields)
+
+    Returns:
+        Response dictionary from api_client.call_predict_api()
+    """
+    start_time = time.perf_counter()
+    key = _inputs_key(inputs)
+    current = st.session_state.get('speculative_prediction')
+    st.session_state.speculative_prediction = None
+    st.session_state.consumed_prediction_key = key
+
+    response = None
+    source = "direct"
+    if current is not None and current["key"] == key and not current["future"].cancelled():
+        source = "speculative" if current["future"].done() else "speculative_wait"
+        response = current["future"].result()
+        if not api_client.is_success_response(response):
+            response, source = None, "direct_retry"
+    if response is None:
+        response = api_client.call_predict_api(inputs)
+
+    logger.info(
+        "Prediction displayed: source=%s, perceived_latency_ms=%.1f",
+        source, (time.perf_counter() - start_time) * 1000
+    )
+    return response
+
 
 def is_form_complete() -> bool:
     """
@@ -9,6 +9,8 @@ This module provides functions to:
 
 from typing import Any
 
+from streamlit_lib import reference_loader
+
 
 # Required fields for prediction
 REQUIRED_FIELDS = [
@@ -155,12 +157,8 @@ def validate_field(field_name: str, value: Any, reference_data: dict[str, list[d
     if value is None or value == "":
         return False, f"{FIELD_LABELS.get(field_name, field_name)} est requis"
 
-    # Get valid codes from reference data
-    valid_options = reference_data[field_name]
-    valid_codes = [opt['code'] for opt in valid_options]
-
-    # Check if value is in valid codes
-    if value not in valid_codes:
+    # Check if value is one of the field's codes (set lookup in the reference index)
+    if not reference_loader.get_reference_index(reference_data).is_valid(field_name, value):
         return False, f"Valeur invalide pour {FIELD_LABELS.get(field_name, field_name)}"
 
     return True, ""
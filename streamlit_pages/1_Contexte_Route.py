@@ -19,19 +19,15 @@ def render():
 
     # Get reference data
     ref_data = session_state.get_reference_data()
+    ref_index = reference_loader.get_reference_index(ref_data)
 
     # Field 1: Departement (dep)
     st.subheader("Departement")
-    dep_options = reference_loader.get_dropdown_options(ref_data, "dep")
+    dep_options = ref_index.options("dep")
     current_dep = session_state.get_prediction_input("dep")
 
     # Find index for current value
-    dep_index = 0
-    if current_dep:
-        formatted_current = reference_loader.format_dropdown_option(current_dep,
-            reference_loader.get_label_for_code(ref_data, "dep", current_dep))
-        if formatted_current in dep_options:
-            dep_index = dep_options.index(formatted_current)
+    dep_index = ref_index.position("dep", current_dep) if current_dep else 0
 
     dep_selected = st.selectbox(
         "Departement",
@@ -40,7 +36,7 @@ def render():
         key="dep_input"
     )
     if dep_selected:
-        dep_code = reference_loader.parse_dropdown_value(dep_selected)
+        dep_code = ref_index.code_for_option("dep", dep_selected)
         session_state.set_prediction_input("dep", dep_code)
 
     # Help expander for dep
@@ -53,15 +49,10 @@ def render():
 
     # Field 2: Agglomeration (agg)
     st.subheader("Agglomeration")
-    agg_options = reference_loader.get_dropdown_options(ref_data, "agg")
+    agg_options = ref_index.options("agg")
     current_agg = session_state.get_prediction_input("agg")
 
-    agg_index = 0
-    if current_agg:
-        formatted_current = reference_loader.format_dropdown_option(current_agg,
-            reference_loader.get_label_for_code(ref_data, "agg", current_agg))
-        if formatted_current in agg_options:
-            agg_index = agg_options.index(formatted_current)
+    agg_index = ref_index.position("agg", current_agg) if current_agg else 0
 
     agg_selected = st.selectbox(
         "Agglomeration",
@@ -71,7 +62,7 @@ def render():
         help="Accident en ou hors agglomeration"
     )
     if agg_selected:
-        agg_code = reference_loader.parse_dropdown_value(agg_selected)
+        agg_code = ref_index.code_for_option("agg", agg_selected)
         session_state.set_prediction_input("agg", agg_code)
 
     agg_help = reference_loader.get_field_help(ref_data, "agg")
@@ -83,15 +74,10 @@ def render():
 
     # Field 3: Categorie de route (catr)
     st.subheader("Categorie de route")
-    catr_options = reference_loader.get_dropdown_options(ref_data, "catr")
+    catr_options = ref_index.options("catr")
     current_catr = session_state.get_prediction_input("catr")
 
-    catr_index = 0
-    if current_catr:
-        formatted_current = reference_loader.format_dropdown_option(current_catr,
-            reference_loader.get_label_for_code(ref_data, "catr", current_catr))
-        if formatted_current in catr_options:
-            catr_index = catr_options.index(formatted_current)
+    catr_index = ref_index.position("catr", current_catr) if current_catr else 0
 
     catr_selected = st.selectbox(
         "Categorie de route",
@@ -100,7 +86,7 @@ def render():
         key="catr_input"
     )
     if catr_selected:
-        catr_code = reference_loader.parse_dropdown_value(catr_selected)
+        catr_code = ref_index.code_for_option("catr", catr_selected)
         session_state.set_prediction_input("catr", catr_code)
 
     catr_help = reference_loader.get_field_help(ref_data, "catr")
@@ -112,15 +98,10 @@ def render():
 
     # Field 4: VMA bucket
     st.subheader("Vitesse maximale autorisee")
-    vma_options = reference_loader.get_dropdown_options(ref_data, "vma_bucket")
+    vma_options = ref_index.options("vma_bucket")
     current_vma = session_state.get_prediction_input("vma_bucket")
 
-    vma_index = 0
-    if current_vma:
-        formatted_current = reference_loader.format_dropdown_option(current_vma,
-            reference_loader.get_label_for_code(ref_data, "vma_bucket", current_vma))
-        if formatted_current in vma_options:
-            vma_index = vma_options.index(formatted_current)
+    vma_index = ref_index.position("vma_bucket", current_vma) if current_vma else 0
 
     vma_selected = st.selectbox(
         "Vitesse maximale autorisee",
@@ -129,7 +110,7 @@ def render():
         key="vma_input"
     )
     if vma_selected:
-        vma_code = reference_loader.parse_dropdown_value(vma_selected)
+        vma_code = ref_index.code_for_option("vma_bucket", vma_selected)
         session_state.set_prediction_input("vma_bucket", vma_code)
 
     vma_help = reference_loader.get_field_help(ref_data, "vma_bucket")
@@ -16,22 +16,18 @@ def render():
     st.caption("Type d'intersection et regime de circulation")
 
     ref_data = session_state.get_reference_data()
+    ref_index = reference_loader.get_reference_index(ref_data)
 
     # Field: Type d'intersection (int)
     st.subheader("Type d'intersection")
-    int_options = reference_loader.get_dropdown_options(ref_data, "int")
+    int_options = ref_index.options("int")
     current_int = session_state.get_prediction_input("int")
 
-    int_index = 0
-    if current_int:
-        formatted_current = reference_loader.format_dropdown_option(current_int,
-            reference_loader.get_label_for_code(ref_data, "int", current_int))
-        if formatted_current in int_options:
-            int_index = int_options.index(formatted_current)
+    int_index = ref_index.position("int", current_int) if current_int else 0
 
     int_selected = st.selectbox("Type d'intersection", options=int_options, index=int_index, key="int_input")
     if int_selected:
-        int_code = reference_loader.parse_dropdown_value(int_selected)
+        int_code = ref_index.code_for_option("int", int_selected)
         session_state.set_prediction_input("int", int_code)
 
     int_help = reference_loader.get_field_help(ref_data, "int")
@@ -43,19 +39,14 @@ def render():
 
     # Field: Regime de circulation (circ)
     st.subheader("Regime de circulation")
-    circ_options = reference_loader.get_dropdown_options(ref_data, "circ")
+    circ_options = ref_index.options("circ")
     current_circ = session_state.get_prediction_input("circ")
 
-    circ_index = 0
-    if current_circ:
-        formatted_current = reference_loader.format_dropdown_option(current_circ,
-            reference_loader.get_label_for_code(ref_data, "circ", current_circ))
-        if formatted_current in circ_options:
-            circ_index = circ_options.index(formatted_current)
+    circ_index = ref_index.position("circ", current_circ) if current_circ else 0
 
     circ_selected = st.selectbox("Regime de circulation", options=circ_options, index=circ_index, key="circ_input")
     if circ_selected:
-        circ_code = reference_loader.parse_dropdown_value(circ_selected)
+        circ_code = ref_index.code_for_option("circ", circ_selected)
         session_state.set_prediction_input("circ", circ_code)
 
     circ_help = reference_loader.get_field_help(ref_data, "circ")
@@ -16,22 +16,18 @@ def render():
     st.caption("Type de collision, point de choc et manoeuvre")
 
     ref_data = session_state.get_reference_data()
+    ref_index = reference_loader.get_reference_index(ref_data)
 
     # Field: Type de collision (col)
     st.subheader("Type de collision")
-    col_options = reference_loader.get_dropdown_options(ref_data, "col")
+    col_options = ref_index.options("col")
     current_col = session_state.get_prediction_input("col")
 
-    col_index = 0
-    if current_col:
-        formatted_current = reference_loader.format_dropdown_option(current_col,
-            reference_loader.get_label_for_code(ref_data, "col", current_col))
-        if formatted_current in col_options:
-            col_index = col_options.index(formatted_current)
+    col_index = ref_index.position("col", current_col) if current_col else 0
 
     col_selected = st.selectbox("Type de collision", options=col_options, index=col_index, key="col_input")
     if col_selected:
-        col_code = reference_loader.parse_dropdown_value(col_selected)
+        col_code = ref_index.code_for_option("col", col_selected)
         session_state.set_prediction_input("col", col_code)
 
     col_help = reference_loader.get_field_help(ref_data, "col")
@@ -43,19 +39,14 @@ def render():
 
     # Field: Point de choc (choc_mode)
     st.subheader("Point de choc initial")
-    choc_options = reference_loader.get_dropdown_options(ref_data, "choc_mode")
+    choc_options = ref_index.options("choc_mode")
     current_choc = session_state.get_prediction_input("choc_mode")
 
-    choc_index = 0
-    if current_choc:
-        formatted_current = reference_loader.format_dropdown_option(current_choc,
-            reference_loader.get_label_for_code(ref_data, "choc_mode", current_choc))
-        if formatted_current in choc_options:
-            choc_index = choc_options.index(formatted_current)
+    choc_index = ref_index.position("choc_mode", current_choc) if current_choc else 0
 
     choc_selected = st.selectbox("Point de choc", options=choc_options, index=choc_index, key="choc_input")
     if choc_selected:
-        choc_code = reference_loader.parse_dropdown_value(choc_selected)
+        choc_code = ref_index.code_for_option("choc_mode", choc_selected)
         session_state.set_prediction_input("choc_mode", choc_code)
 
     choc_help = reference_loader.get_field_help(ref_data, "choc_mode")
@@ -67,19 +58,14 @@ def render():
 
     # Field: Manoeuvre (manv_mode)
     st.subheader("Manoeuvre")
-    manv_options = reference_loader.get_dropdown_options(ref_data, "manv_mode")
+    manv_options = ref_index.options("manv_mode")
     current_manv = session_state.get_prediction_input("manv_mode")
 
-    manv_index = 0
-    if current_manv:
-        formatted_current = reference_loader.format_dropdown_option(current_manv,
-            reference_loader.get_label_for_code(ref_data, "manv_mode", current_manv))
-        if formatted_current in manv_options:
-            manv_index = manv_options.index(formatted_current)
+    manv_index = ref_index.position("manv_mode", current_manv) if current_manv else 0
 
     manv_selected = st.selectbox("Manoeuvre", options=manv_options, index=manv_index, key="manv_input")
     if manv_selected:
-        manv_code = reference_loader.parse_dropdown_value(manv_selected)
+        manv_code = ref_index.code_for_option("manv_mode", manv_selected)
         session_state.set_prediction_input("manv_mode", manv_code)
 
     manv_help = reference_loader.get_field_help(ref_data, "manv_mode")
@@ -16,22 +16,18 @@ def render():
     st.caption("Informations sur le conducteur et le type de vehicule")
 
     ref_data = session_state.get_reference_data()
+    ref_index = reference_loader.get_reference_index(ref_data)
 
     # Field: Classe d'age conducteur
     st.subheader("Classe d'age du conducteur")
-    age_options = reference_loader.get_dropdown_options(ref_data, "driver_age_bucket")
+    age_options = ref_index.options("driver_age_bucket")
     current_age = session_state.get_prediction_input("driver_age_bucket")
 
-    age_index = 0
-    if current_age:
-        formatted_current = reference_loader.format_dropdown_option(current_age,
-            reference_loader.get_label_for_code(ref_data, "driver_age_bucket", current_age))
-        if formatted_current in age_options:
-            age_index = age_options.index(formatted_current)
+    age_index = ref_index.position("driver_age_bucket", current_age) if current_age else 0
 
     age_selected = st.selectbox("Classe d'age", options=age_options, index=age_index, key="age_input")
     if age_selected:
-        age_code = reference_loader.parse_dropdown_value(age_selected)
+        age_code = ref_index.code_for_option("driver_age_bucket", age_selected)
         session_state.set_prediction_input("driver_age_bucket", age_code)
 
     age_help = reference_loader.get_field_help(ref_data, "driver_age_bucket")
@@ -43,19 +39,14 @@ def render():
 
     # Field: Famille de trajet
     st.subheader("Type de trajet")
-    trajet_options = reference_loader.get_dropdown_options(ref_data, "driver_trajet_family")
+    trajet_options = ref_index.options("driver_trajet_family")
     current_trajet = session_state.get_prediction_input("driver_trajet_family")
 
-    trajet_index = 0
-    if current_trajet:
-        formatted_current = reference_loader.format_dropdown_option(current_trajet,
-            reference_loader.get_label_for_code(ref_data, "driver_trajet_family", current_trajet))
-        if formatted_current in trajet_options:
-            trajet_index = trajet_options.index(formatted_current)
+    trajet_index = ref_index.position("driver_trajet_family", current_trajet) if current_trajet else 0
 
     trajet_selected = st.selectbox("Type de trajet", options=trajet_options, index=trajet_index, key="trajet_input")
     if trajet_selected:
-        trajet_code = reference_loader.parse_dropdown_value(trajet_selected)
+        trajet_code = ref_index.code_for_option("driver_trajet_family", trajet_selected)
         session_state.set_prediction_input("driver_trajet_family", trajet_code)
 
     trajet_help = reference_loader.get_field_help(ref_data, "driver_trajet_family")
@@ -67,19 +58,14 @@ def render():
 
     # Field: Famille de vehicule
     st.subheader("Famille de vehicule")
-    catv_options = reference_loader.get_dropdown_options(ref_data, "catv_family_4")
+    catv_options = ref_index.options("catv_family_4")
     current_catv = session_state.get_prediction_input("catv_family_4")
 
-    catv_index = 0
-    if current_catv:
-        formatted_current = reference_loader.format_dropdown_option(current_catv,
-            reference_loader.get_label_for_code(ref_data, "catv_family_4", current_catv))
-        if formatted_current in catv_options:
-            catv_index = catv_options.index(formatted_current)
+    catv_index = ref_index.position("catv_family_4", current_catv) if current_catv else 0
 
     catv_selected = st.selectbox("Famille de vehicule", options=catv_options, index=catv_index, key="catv_input")
     if catv_selected:
-        catv_code = reference_loader.parse_dropdown_value(catv_selected)
+        catv_code = ref_index.code_for_option("catv_family_4", catv_selected)
         session_state.set_prediction_input("catv_family_4", catv_code)
 
     catv_help = reference_loader.get_field_help(ref_data, "catv_family_4")
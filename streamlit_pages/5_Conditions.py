@@ -16,22 +16,18 @@ def render():
     st.caption("Conditions d'eclairage, meteorologiques et tranche horaire")
 
     ref_data = session_state.get_reference_data()
+    ref_index = reference_loader.get_reference_index(ref_data)
 
     # Field: Conditions d'eclairage (lum)
     st.subheader("Conditions d'eclairage")
-    lum_options = reference_loader.get_dropdown_options(ref_data, "lum")
+    lum_options = ref_index.options("lum")
     current_lum = session_state.get_prediction_input("lum")
 
-    lum_index = 0
-    if current_lum:
-        formatted_current = reference_loader.format_dropdown_option(current_lum,
-            reference_loader.get_label_for_code(ref_data, "lum", current_lum))
-        if formatted_current in lum_options:
-            lum_index = lum_options.index(formatted_current)
+    lum_index = ref_index.position("lum", current_lum) if current_lum else 0
 
     lum_selected = st.selectbox("Luminosite", options=lum_options, index=lum_index, key="lum_input")
     if lum_selected:
-        lum_code = reference_loader.parse_dropdown_value(lum_selected)
+        lum_code = ref_index.code_for_option("lum", lum_selected)
         session_state.set_prediction_input("lum", lum_code)
 
     lum_help = reference_loader.get_field_help(ref_data, "lum")
@@ -43,19 +39,14 @@ def render():
 
     # Field: Conditions atmospheriques (atm)
     st.subheader("Conditions atmospheriques")
-    atm_options = reference_loader.get_dropdown_options(ref_data, "atm")
+    atm_options = ref_index.options("atm")
     current_atm = session_state.get_prediction_input("atm")
 
-    atm_index = 0
-    if current_atm:
-        formatted_current = reference_loader.format_dropdown_option(current_atm,
-            reference_loader.get_label_for_code(ref_data, "atm", current_atm))
-        if formatted_current in atm_options:
-            atm_index = atm_options.index(formatted_current)
+    atm_index = ref_index.position("atm", current_atm) if current_atm else 0
 
     atm_selected = st.selectbox("Conditions atmospheriques", options=atm_options, index=atm_index, key="atm_input")
     if atm_selected:
-        atm_code = reference_loader.parse_dropdown_value(atm_selected)
+        atm_code = ref_index.code_for_option("atm", atm_selected)
         session_state.set_prediction_input("atm", atm_code)
 
     atm_help = reference_loader.get_field_help(ref_data, "atm")
@@ -67,15 +58,10 @@ def render():
 
     # Field: Tranche horaire (time_bucket)
     st.subheader("Tranche horaire")
-    time_bucket_options = reference_loader.get_dropdown_options(ref_data, "time_bucket")
+    time_bucket_options = ref_index.options("time_bucket")
     current_time_bucket = session_state.get_prediction_input("time_bucket")
 
-    time_bucket_index = 0
-    if current_time_bucket is not None:
-        formatted_current = reference_loader.format_dropdown_option(current_time_bucket,
-            reference_loader.get_label_for_code(ref_data, "time_bucket", current_time_bucket))
-        if formatted_current in time_bucket_options:
-            time_bucket_index = time_bucket_options.index(formatted_current)
+    time_bucket_index = ref_index.position("time_bucket", current_time_bucket) if current_time_bucket is not None else 0
 
     time_bucket_selected = st.selectbox(
         "Plage horaire",
@@ -85,7 +71,7 @@ def render():
         help="Tranche horaire de l'accident"
     )
     if time_bucket_selected:
-        time_bucket_code = reference_loader.parse_dropdown_value(time_bucket_selected)
+        time_bucket_code = ref_index.code_for_option("time_bucket", time_bucket_selected)
         session_state.set_prediction_input("time_bucket", time_bucket_code)
 
     time_bucket_help = reference_loader.get_field_help(ref_data, "time_bucket")
@@ -81,15 +81,24 @@ def render():
     # Prediction button (disabled if form incomplete)
     st.subheader("Lancer la prediction")
 
+    # Cached API status from the background /health probe (no request on rerun)
+    health = api_client.get_api_health()
+    if health["status"] == "down" or health["breaker"]["state"] != "closed":
+        st.warning("Le service de prediction ne repond pas pour le moment. "
+                   "La prediction echouera tant qu'il n'est pas redemarre.")
+    elif health["status"] == "loading":
+        st.info("Le service de prediction demarre (chargement du modele)...")
+
     if not is_complete:
         st.button("Predire", disabled=True, width="stretch", type="primary",
                   help="Veuillez remplir les 15 champs obligatoires")
         st.caption("Le bouton sera active une fois tous les champs remplis")
     else:
         if st.button("Predire", width="stretch", type="primary"):
-            # T061-T062: Call API with loading spinner
+            # T061-T062: Call API with loading spinner; usually already computed in the
+            # background since the form became complete (speculative prediction)
             with st.spinner("Prediction en cours..."):
-                response = api_client.call_predict_api(all_inputs)
+                response = session_state.take_prediction(all_inputs)
 
             # T063-T065: Display prediction result or error
             if api_client.is_success_response(response):
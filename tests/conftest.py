@@ -0,0 +1,69 @@
+"""
+Shared fixtures for predictor (FastAPI) tests.
+
+The real CatBoost model (model/*.cbm) is not versioned, so predictor tests run
+against a tiny CatBoost model trained on synthetic records drawn from
+data/ref_options.json, with the production meta.json feature layout.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+META_V2 = PROJECT_DIR / "out" / "catboost_product15_v2_time_bucket_final_meta.json"
+
+
+@pytest.fixture(scope="session")
+def tiny_model_paths(tmp_path_factory):
+    """Train a small CatBoost model once per session; returns (model_path, meta_path)."""
+    pytest.importorskip("catboost")
+    import pandas as pd
+    from catboost import CatBoostClassifier
+    from predictor_lib.synthetic import synthetic_records
+
+    workdir = tmp_path_factory.mktemp("tiny_model")
+    meta = json.loads(META_V2.read_text(encoding="utf-8"))
+    features = meta["features"]
+
+    records = synthetic_records(400, features, seed=42)
+    X = pd.DataFrame(records, columns=features).astype(str)
+    y = [int(r["lum"] in (3, 4) or r["vma_bucket"] in ("81-90", "91-110") or i % 3 == 0)
+         for i, r in enumerate(records)]
+
+    model = CatBoostClassifier(iterations=40, depth=3, verbose=0, random_seed=0,
+                               cat_features=features, allow_writing_files=False)
+    model.fit(X, y)
+
+    model_path = workdir / "tiny.cbm"
+    meta_path = workdir / "tiny_meta.json"
+    model.save_model(str(model_path))
+    shutil.copy(META_V2, meta_path)
+    return model_path, meta_path
+
+
+@pytest.fixture
+def api(tiny_model_paths, monkeypatch):
+    """FastAPI TestClient with the tiny model loaded through the startup hook."""
+    from fastapi.testclient import TestClient
+    import predictor
+
+    model_path, meta_path = tiny_model_paths
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setenv("META_PATH", str(meta_path))
+    with TestClient(predictor.app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def _reset_api_client():
+    """Client tests must not leak the circuit breaker state or memoized predictions."""
+    from streamlit_lib import api_client
+
+    api_client.BREAKER.reset()
+    api_client.MEMO.clear()
+    yield
+    api_client.BREAKER.reset()
+    api_client.MEMO.clear()
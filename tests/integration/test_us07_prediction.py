@@ -52,7 +52,7 @@ class TestUS07Prediction:
         }
 
         # Act
-        with patch('requests.post', return_value=mock_response):
+        with patch('requests.Session.post', return_value=mock_response):
             result = api_client.call_predict_api(valid_inputs)
 
         # Assert
@@ -101,7 +101,7 @@ class TestUS07Prediction:
         }
 
         # Act
-        with patch('requests.post', return_value=mock_response):
+        with patch('requests.Session.post', return_value=mock_response):
             result = api_client.call_predict_api(inputs)
 
         # Assert
@@ -145,7 +145,7 @@ class TestUS07Prediction:
         }
 
         # Act
-        with patch('requests.post', return_value=mock_response):
+        with patch('requests.Session.post', return_value=mock_response):
             result = api_client.call_predict_api(inputs)
 
         # Assert
@@ -189,7 +189,7 @@ class TestUS07Prediction:
         }
 
         # Act
-        with patch('requests.post', return_value=mock_response):
+        with patch('requests.Session.post', return_value=mock_response):
             result = api_client.call_predict_api(inputs)
 
         # Assert
@@ -217,7 +217,7 @@ class TestUS07Prediction:
         }
 
         # Act
-        with patch('requests.post', return_value=mock_response):
+        with patch('requests.Session.post', return_value=mock_response):
             result = api_client.call_predict_api(invalid_inputs)
 
         # Assert
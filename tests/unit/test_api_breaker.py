@@ -0,0 +1,158 @@
+"""
+Unit tests for api_client's circuit breaker and background health probe.
+
+Tests:
+- The breaker opens after N consecutive failures; successes (and 422s) reset the count
+- While open, call_predict_api fails fast with the "connection" error dict (no request sent)
+- After reset_s, a single half-open /health probe closes or reopens the breaker
+- probe_health maps /health to up / loading / down
+- get_api_health returns the cached probe result and the breaker state
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.exceptions import ReadTimeout
+
+from streamlit_lib import api_client
+
+SAMPLE_INPUTS = {"dep": "59", "lum": 1}
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = "x"
+    response.json.return_value = body
+    return response
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = api_client.CircuitBreaker(3, 5, probe=lambda: True, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow() and breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.stats()["fast_failures"] == 1
+
+    def test_half_open_probe(self, clock):
+        probe = MagicMock(side_effect=[False, True])
+        breaker = api_client.CircuitBreaker(1, 5, probe=probe, clock=clock)
+        breaker.record_failure()
+
+        clock.now += 4.9
+        assert not breaker.allow() and probe.call_count == 0
+        clock.now += 0.2
+        assert not breaker.allow() and breaker.state == "open"  # failed probe reopens
+        assert not breaker.allow() and probe.call_count == 1    # ... for another reset_s
+        clock.now += 5
+        assert breaker.allow() and breaker.state == "closed"
+        assert probe.call_count == 2
+
+    def test_single_probe_while_half_open(self, clock):
+        probing, release = threading.Event(), threading.Event()
+
+        def slow_probe():
+            probing.set()
+            release.wait(5)
+            return True
+
+        breaker = api_client.CircuitBreaker(1, 5, probe=slow_probe, clock=clock)
+        breaker.record_failure()
+        clock.now += 5
+        results = []
+        prober = threading.Thread(target=lambda: results.append(breaker.allow()))
+        prober.start()
+        assert probing.wait(5)
+        assert breaker.state == "half_open" and not breaker.allow()
+        release.set()
+        prober.join()
+        assert results == [True] and breaker.state == "closed"
+
+
+class TestCallPredictWithBreaker:
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_fails_fast_when_open(self, mock_post, monkeypatch):
+        monkeypatch.setattr(api_client.BREAKER, "_probe", lambda: False)
+        mock_post.side_effect = ReadTimeout()
+        for _ in range(api_client.BREAKER.failure_threshold):
+            assert api_client.call_predict_api(SAMPLE_INPUTS)["error"] == "timeout"
+        assert api_client.BREAKER.state == "open"
+
+        calls = mock_post.call_count
+        result = api_client.call_predict_api(SAMPLE_INPUTS)
+        assert result["error"] == "connection"
+        assert "Impossible de se connecter" in result["message"]
+        assert mock_post.call_count == calls
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_server_errors_count_validation_errors_do_not(self, mock_post):
+        threshold = api_client.BREAKER.failure_threshold
+        mock_post.return_value = _response(500, {"detail": "boom"})
+        for _ in range(threshold - 1):
+            api_client.call_predict_api(SAMPLE_INPUTS)
+        mock_post.return_value = _response(422, {"detail": []})
+        assert api_client.call_predict_api(SAMPLE_INPUTS)["error"] == "validation"
+        assert api_client.BREAKER.stats()["failures"] == 0
+
+        mock_post.return_value = _response(500, {"detail": "boom"})
+        for _ in range(threshold):
+            api_client.call_predict_api(SAMPLE_INPUTS)
+        assert api_client.BREAKER.state == "open"
+
+
+class TestHealthProbe:
+
+    @pytest.mark.parametrize("status_code, body, expected", [
+        (200, {"status": "ok", "ready": True, "model_name": "m"}, "up"),
+        (200, {"status": "loading", "ready": False}, "loading"),
+        (503, {}, "down"),
+    ])
+    @patch("streamlit_lib.api_client.requests.Session.get")
+    def test_probe_health(self, mock_get, status_code, body, expected):
+        mock_get.return_value = _response(status_code, body)
+        result = api_client.probe_health()
+        assert result["status"] == expected
+        assert mock_get.call_args.args[0] == api_client.HEALTH_ENDPOINT
+        assert mock_get.call_args.kwargs["timeout"] == api_client.HEALTH_TIMEOUT
+
+    @patch("streamlit_lib.api_client.requests.Session.get")
+    def test_probe_health_unreachable(self, mock_get):
+        mock_get.side_effect = ReadTimeout()
+        assert api_client.probe_health()["status"] == "down"
+
+    def test_cached_health_closes_breaker(self, monkeypatch):
+        monitor = api_client.HealthMonitor(60, probe=lambda: {"status": "up", "checked_at": 1.0})
+        monkeypatch.setattr(api_client, "HEALTH", monitor)
+        api_client.BREAKER.failures = api_client.BREAKER.failure_threshold - 1
+        api_client.BREAKER.record_failure()
+        assert api_client.BREAKER.state == "open"
+
+        monitor.probe_now()
+        health = api_client.get_api_health()
+        monitor.stop()
+        assert health["status"] == "up"
+        assert health["breaker"]["state"] == "closed"
@@ -0,0 +1,110 @@
+"""
+Unit tests for api_client's prediction memo.
+
+Tests:
+- Pressing "Predire" again with the same inputs does not send a new request
+- Keys are canonical: field order and 1 vs "1" do not matter
+- A new model fingerprint (API reload) misses; an unknown fingerprint bypasses the memo
+- Errors are never memoized
+- Entries expire after ttl_s and the oldest are evicted beyond max_entries
+- Hits and misses are logged with the memo hit rate
+"""
+
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.exceptions import ReadTimeout
+
+from streamlit_lib import api_client
+
+SAMPLE_INPUTS = {"dep": "59", "lum": 1, "agg": 2}
+
+
+def _ok_response(proba=0.68):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"proba": proba, "label": "grave", "threshold": 0.47}
+    return response
+
+
+@pytest.fixture
+def health(monkeypatch):
+    """Cached /health result without the background thread; tests set the fingerprint."""
+    monitor = api_client.HealthMonitor(60)
+    monitor.last = {"status": "up", "model_fingerprint": "fp-1"}
+    monkeypatch.setattr(api_client, "HEALTH", monitor)
+    return monitor
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCallPredictMemo:
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_repeat_press_is_served_from_memo(self, mock_post, health, caplog):
+        mock_post.return_value = _ok_response()
+        with caplog.at_level(logging.INFO, logger="streamlit_lib.api_client"):
+            first = api_client.call_predict_api(SAMPLE_INPUTS)
+            second = api_client.call_predict_api({"agg": "2", "lum": "1", "dep": "59"})
+
+        assert mock_post.call_count == 1
+        assert second == first == {"probability": 0.68, "prediction": "grave", "threshold": 0.47}
+        assert api_client.MEMO.stats()["hit_rate"] == 0.5
+        messages = [r.getMessage() for r in caplog.records]
+        assert any("memo miss" in m and "memo_hit_rate=0.00" in m for m in messages)
+        assert any("memo hit" in m and "memo_hit_rate=0.50 (1/2)" in m for m in messages)
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_model_reload_misses(self, mock_post, health):
+        mock_post.side_effect = [_ok_response(0.68), _ok_response(0.12)]
+        api_client.call_predict_api(SAMPLE_INPUTS)
+        health.last = {"status": "up", "model_fingerprint": "fp-2"}
+        assert api_client.call_predict_api(SAMPLE_INPUTS)["probability"] == 0.12
+        assert mock_post.call_count == 2
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_unknown_fingerprint_bypasses_memo(self, mock_post, health):
+        health.last = {"status": "unknown", "checked_at": None}
+        mock_post.return_value = _ok_response()
+        api_client.call_predict_api(SAMPLE_INPUTS)
+        api_client.call_predict_api(SAMPLE_INPUTS)
+        assert mock_post.call_count == 2
+        assert api_client.MEMO.stats()["size"] == 0
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_errors_are_not_memoized(self, mock_post, health):
+        mock_post.side_effect = [ReadTimeout(), _ok_response()]
+        assert api_client.call_predict_api(SAMPLE_INPUTS)["error"] == "timeout"
+        assert api_client.call_predict_api(SAMPLE_INPUTS)["probability"] == 0.68
+        assert mock_post.call_count == 2
+
+
+class TestPredictionMemo:
+
+    def test_ttl_and_lru_eviction(self):
+        clock = FakeClock()
+        memo = api_client.PredictionMemo(max_entries=2, ttl_s=10, clock=clock)
+        keys = [api_client.PredictionMemo.key("fp", {"dep": str(i)}) for i in range(3)]
+        memo.put(keys[0], {"probability": 0.1})
+        memo.put(keys[1], {"probability": 0.2})
+        assert memo.get(keys[0]) == {"probability": 0.1}
+        memo.put(keys[2], {"probability": 0.3})  # evicts keys[1], the least recently used
+        assert memo.get(keys[1]) is None
+        clock.now = 10.5
+        assert memo.get(keys[0]) is None and memo.get(keys[2]) is None
+        assert memo.stats()["size"] == 0
+
+    def test_returned_results_are_copies(self):
+        memo = api_client.PredictionMemo(max_entries=4, ttl_s=10)
+        key = api_client.PredictionMemo.key("fp", SAMPLE_INPUTS)
+        memo.put(key, {"probability": 0.1})
+        memo.get(key)["probability"] = 0.9
+        assert memo.get(key) == {"probability": 0.1}
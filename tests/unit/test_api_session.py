@@ -0,0 +1,117 @@
+"""
+Unit tests for api_client's pooled session and retry budget.
+
+Tests:
+- One shared session for all threads, pool sized by POOL_SIZE, (connect, read) timeouts passed
+- Consecutive calls reuse one keep-alive connection (local HTTP server)
+- Connection errors are retried with jittered backoff, then reported with the same error dict
+- Timeouts are never retried
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+
+from streamlit_lib import api_client
+
+SAMPLE_INPUTS = {"dep": "59", "lum": 1}
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    api_client.close_session()
+    yield
+    api_client.close_session()
+
+
+def _ok_response():
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"proba": 0.68, "label": "grave", "threshold": 0.47}
+    return response
+
+
+class TestSharedSession:
+
+    def test_one_session_for_all_threads(self):
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(api_client.get_session())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(s) for s in sessions}) == 1
+        adapter = sessions[0].get_adapter("http://localhost")
+        assert adapter._pool_maxsize == api_client.POOL_SIZE
+
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_timeouts_and_normalization(self, mock_post):
+        mock_post.return_value = _ok_response()
+        result = api_client.call_predict_api(SAMPLE_INPUTS)
+        assert result == {"probability": 0.68, "prediction": "grave", "threshold": 0.47}
+        assert mock_post.call_args.kwargs["timeout"] == (api_client.CONNECT_TIMEOUT, api_client.READ_TIMEOUT)
+
+    def test_keep_alive_reuses_connection(self, monkeypatch):
+        peers = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                peers.append(self.client_address)
+                body = json.dumps({"proba": 0.2, "label": "non_grave", "threshold": 0.47}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setattr(api_client, "PREDICT_ENDPOINT", f"http://127.0.0.1:{server.server_port}/predict")
+        try:
+            results = [api_client.call_predict_api(SAMPLE_INPUTS) for _ in range(5)]
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert all(r["prediction"] == "non_grave" for r in results)
+        assert len(peers) == 5 and len(set(peers)) == 1
+
+
+class TestRetries:
+
+    @patch("streamlit_lib.api_client.time.sleep")
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_connection_errors_retried(self, mock_post, mock_sleep, monkeypatch):
+        monkeypatch.setattr(api_client, "MAX_RETRIES", 2)
+        mock_post.side_effect = [ConnectionError("reset"), ConnectionError("refused"), _ok_response()]
+        result = api_client.call_predict_api(SAMPLE_INPUTS)
+        assert result["probability"] == 0.68 and mock_post.call_count == 3
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert 0 <= delays[0] <= api_client.RETRY_BACKOFF_S and 0 <= delays[1] <= 2 * api_client.RETRY_BACKOFF_S
+
+    @patch("streamlit_lib.api_client.time.sleep")
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_budget_exhausted_keeps_error_contract(self, mock_post, mock_sleep, monkeypatch):
+        monkeypatch.setattr(api_client, "MAX_RETRIES", 1)
+        mock_post.side_effect = ConnectionError("refused")
+        result = api_client.call_predict_api(SAMPLE_INPUTS)
+        assert mock_post.call_count == 2
+        assert result["error"] == "network" and "refused" in result["message"]
+
+    @pytest.mark.parametrize("error", [ReadTimeout("slow"), ConnectTimeout("slow connect")])
+    @patch("streamlit_lib.api_client.time.sleep")
+    @patch("streamlit_lib.api_client.requests.Session.post")
+    def test_timeouts_not_retried(self, mock_post, mock_sleep, error):
+        mock_post.side_effect = error
+        result = api_client.call_predict_api(SAMPLE_INPUTS)
+        assert mock_post.call_count == 1 and not mock_sleep.called
+        assert result["error"] == "timeout"
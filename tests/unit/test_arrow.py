@@ -0,0 +1,136 @@
+"""
+Unit tests for POST /predict/arrow (Arrow IPC / Parquet in, Arrow IPC out).
+
+Tests:
+- detect_format() recognises content types and magic bytes
+- normalize_table() matches normalize_batch (extra columns ignored, nulls -> MISSING_CAT, ints -> str)
+- IPC stream, IPC file and Parquet bodies give the /predict_batch probabilities, in input order
+- A missing feature column -> 422; an unreadable body -> 422; an unknown format -> 415
+- Result metadata reports threshold, counts and rows/s
+"""
+
+import dataclasses
+import io
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import pytest
+
+from predictor_lib import columnar
+from predictor_lib.synthetic import synthetic_records
+
+
+def _table(records, features):
+    return pa.table({c: [r[c] for r in records] for c in features})
+
+
+def _ipc_stream(table):
+    return columnar.write_ipc_stream(table)
+
+
+def _ipc_file(table):
+    sink = io.BytesIO()
+    with ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _parquet(table):
+    sink = io.BytesIO()
+    pq.write_table(table, sink)
+    return sink.getvalue()
+
+
+class TestDetectFormat:
+
+    def test_content_type_and_magic(self):
+        table = pa.table({"a": [1, 2]})
+        assert columnar.detect_format(b"", "application/vnd.apache.parquet") == "parquet"
+        assert columnar.detect_format(_parquet(table)) == "parquet"
+        assert columnar.detect_format(_ipc_file(table)) == "file"
+        assert columnar.detect_format(_ipc_stream(table)) == "stream"
+        assert columnar.detect_format(b'{"data": []}', "application/json") is None
+
+
+def _post(api, body, content_type=columnar.ARROW_STREAM):
+    return api.post("/predict/arrow", content=body, headers={"Content-Type": content_type})
+
+
+def _read(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == columnar.ARROW_STREAM
+    return ipc.open_stream(pa.py_buffer(response.content)).read_all()
+
+
+class TestNormalizeTable:
+
+    def test_matches_normalize_batch(self, api):
+        import predictor
+
+        meta = predictor.STATE.meta
+        records = synthetic_records(20, meta.features, seed=61)
+        records[3][meta.cat_features[0]] = None
+        table = _table(records, meta.features).append_column("extra", pa.array(range(20)))
+
+        X_table, valid, errors = predictor.normalize_table(table, meta)
+        X_batch, _, _ = predictor.normalize_batch(records, meta)
+        assert valid == list(range(20)) and errors == {}
+        assert X_table.columns.tolist() == meta.features
+        assert X_table.astype(str).equals(X_batch.astype(str))
+        assert X_table[meta.cat_features[0]].iat[3] == predictor.MISSING_CAT
+
+    def test_invalid_numeric_rows(self, api, monkeypatch):
+        import predictor
+
+        field = predictor.STATE.meta.features[-1]
+        meta = dataclasses.replace(predictor.STATE.meta,
+                                   cat_features=[c for c in predictor.STATE.meta.cat_features if c != field])
+        monkeypatch.setattr(predictor, "NUMERIC_FIELDS", {field})
+        records = synthetic_records(4, meta.features, seed=64)
+        for r, v in zip(records, ["12", "12:30", "abc", None]):
+            r[field] = v
+
+        X, valid, errors = predictor.normalize_table(_table(records, meta.features), meta)
+        assert valid == [0, 3]
+        assert errors[1]["error"] == "Format invalide" and errors[2]["error"] == "Valeur numérique invalide"
+        assert X[field].tolist()[0] == 12.0 and errors[2]["value"] == "abc"
+
+
+class TestPredictArrow:
+
+    @pytest.mark.parametrize("encode,content_type", [
+        (_ipc_stream, columnar.ARROW_STREAM),
+        (_ipc_file, columnar.ARROW_FILE),
+        (_parquet, columnar.PARQUET),
+    ])
+    def test_matches_batch(self, api, encode, content_type):
+        import predictor
+
+        records = synthetic_records(25, predictor.STATE.meta.features, seed=62)
+        result = _read(_post(api, encode(_table(records, predictor.STATE.meta.features)), content_type))
+        batch = api.post("/predict_batch", json={"data": records}).json()["results"]
+
+        assert result.num_rows == 25
+        assert result.column("proba").to_pylist() == pytest.approx([b["proba"] for b in batch])
+        assert result.column("pred_class").to_pylist() == [b["pred_class"] for b in batch]
+        assert result.column("label").to_pylist() == [b["label"] for b in batch]
+        assert result.column("error").null_count == 25
+
+        metadata = {k.decode(): v.decode() for k, v in result.schema.metadata.items()}
+        assert float(metadata["threshold"]) == predictor.STATE.meta.threshold
+        assert metadata["n_ok"] == "25" and metadata["n_errors"] == "0"
+        assert float(metadata["rows_per_s"]) > 0
+
+    def test_missing_column(self, api):
+        import predictor
+
+        features = predictor.STATE.meta.features
+        records = synthetic_records(3, features, seed=63)
+        r = _post(api, _ipc_stream(_table(records, features[1:])))
+        assert r.status_code == 422
+        assert r.json()["detail"]["missing_fields"] == [features[0]]
+
+    def test_bad_bodies(self, api):
+        assert _post(api, b"PAR1 pas un parquet").status_code == 422
+        assert _post(api, b'{"data": []}', "application/json").status_code == 415
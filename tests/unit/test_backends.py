@@ -0,0 +1,150 @@
+"""
+Unit tests for predictor_lib.backends (pluggable inference backends).
+
+Tests:
+- create_backend() loads catboost / numpy and rejects unknown names
+- parity_check() records the max abs diff and refuses divergent backends
+- catboost and numpy agree on tree-range logits and per-tree leaf bounds
+- shap_values() sums to the raw logit; numpy delegates it to CatBoost; the base backend refuses
+- virtual_ensembles(): last member = full-model logit; numpy delegates; too few trees refused
+- onnx backend refuses a model with categorical features, and explains a missing onnxruntime
+- load_model_and_meta() runs the startup parity check; /health describes the backend
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("catboost")
+
+from predictor_lib.backends import BACKENDS, InferenceBackend, create_backend, parity_check
+
+
+class _ShiftedBackend(InferenceBackend):
+    name = "shifted"
+
+    def __init__(self, inner, shift):
+        super().__init__()
+        self.inner, self.shift = inner, shift
+
+    def predict_proba(self, rows):
+        p = np.clip(self.inner.predict_proba(rows)[:, 1] + self.shift, 0, 1)
+        return np.column_stack([1 - p, p])
+
+
+@pytest.fixture(scope="module")
+def probe(tiny_model_paths):
+    import predictor
+
+    _, meta_path = tiny_model_paths
+    return predictor.probe_rows(predictor.ModelMeta.load(meta_path), 64)
+
+
+class TestCreateBackend:
+
+    @pytest.mark.parametrize("name", ["catboost", "numpy"])
+    def test_load_and_describe(self, tiny_model_paths, probe, name):
+        model_path, _ = tiny_model_paths
+        backend = create_backend(name, model_path)
+        assert backend.predict_proba(probe).shape == (len(probe), 2)
+        info = backend.describe()
+        assert info["backend"] == name
+        assert info["load_ms"] >= 0
+        assert info["n_trees"] == 40
+
+    def test_unknown_backend(self, tiny_model_paths):
+        with pytest.raises(ValueError, match="inconnu"):
+            create_backend("tensorrt", tiny_model_paths[0])
+
+    def test_registry(self):
+        assert set(BACKENDS) == {"catboost", "numpy", "onnx"}
+
+    def test_onnx_refuses_categorical_model(self, tiny_model_paths):
+        pytest.importorskip("onnxruntime")
+        with pytest.raises(ValueError, match="onnx|ONNX"):
+            create_backend("onnx", tiny_model_paths[0])
+
+    def test_onnx_requires_onnxruntime(self, tiny_model_paths, monkeypatch):
+        monkeypatch.setitem(sys.modules, "onnxruntime", None)
+        with pytest.raises(ImportError, match="onnxruntime"):
+            create_backend("onnx", tiny_model_paths[0])
+
+
+class TestTreeRange:
+
+    def test_backends_agree(self, tiny_model_paths, probe):
+        model_path, _ = tiny_model_paths
+        native, engine = create_backend("catboost", model_path), create_backend("numpy", model_path)
+        for start, end in [(0, 10), (10, 40), (0, 0)]:
+            np.testing.assert_allclose(native.predict_raw(probe, start, end),
+                                       engine.predict_raw(probe, start, end), atol=1e-9)
+        for a, b in zip(native.tree_leaf_bounds(), engine.tree_leaf_bounds()):
+            np.testing.assert_allclose(a, b)
+
+
+class TestShapValues:
+
+    def test_sum_to_logit_and_numpy_delegates(self, tiny_model_paths, probe):
+        model_path, _ = tiny_model_paths
+        catboost = create_backend("catboost", model_path)
+        shap = catboost.shap_values(probe[:8])
+        assert shap.shape == (8, len(probe[0]) + 1)
+        assert shap.sum(axis=1) == pytest.approx(catboost.predict_raw(probe[:8]), abs=1e-6)
+        assert create_backend("numpy", model_path).shap_values(probe[:8]) == pytest.approx(shap)
+
+    def test_base_backend_refuses(self, probe):
+        with pytest.raises(NotImplementedError, match="SHAP"):
+            _ShiftedBackend(None, 0.0).shap_values(probe[:1])
+
+
+class TestVirtualEnsembles:
+
+    def test_last_member_is_full_model(self, tiny_model_paths, probe):
+        model_path, _ = tiny_model_paths
+        catboost = create_backend("catboost", model_path)
+        members = catboost.virtual_ensembles(probe[:8], 5)
+        assert members.shape == (8, 5)
+        assert members[:, -1] == pytest.approx(catboost.predict_raw(probe[:8]), abs=1e-9)
+        assert members.std(axis=1).max() > 0
+        assert create_backend("numpy", model_path).virtual_ensembles(probe[:8], 5) == pytest.approx(members)
+
+    def test_refused(self, tiny_model_paths, probe):
+        with pytest.raises(NotImplementedError, match="trop peu"):
+            create_backend("catboost", tiny_model_paths[0]).virtual_ensembles(probe[:1], 100)
+        with pytest.raises(NotImplementedError, match="ensembles virtuels"):
+            _ShiftedBackend(None, 0.0).virtual_ensembles(probe[:1], 5)
+
+
+class TestParityCheck:
+
+    def test_numpy_matches_catboost(self, tiny_model_paths, probe):
+        model_path, _ = tiny_model_paths
+        backend = create_backend("numpy", model_path)
+        result = parity_check(backend, create_backend("catboost", model_path), probe, 1e-9)
+        assert result["n_rows"] == len(probe)
+        assert backend.describe()["parity"]["max_abs_diff"] < 1e-9
+
+    def test_divergent_backend_rejected(self, tiny_model_paths, probe):
+        reference = create_backend("catboost", tiny_model_paths[0])
+        with pytest.raises(ValueError, match="Parité"):
+            parity_check(_ShiftedBackend(reference, 0.01), reference, probe, 1e-4)
+
+
+class TestStartup:
+
+    def test_numpy_backend_parity_at_startup(self, tiny_model_paths, monkeypatch):
+        import predictor
+
+        model_path, meta_path = tiny_model_paths
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("META_PATH", str(meta_path))
+        monkeypatch.setattr(predictor, "INFERENCE_ENGINE", "numpy")
+        model, _ = predictor.load_model_and_meta()
+        assert model.parity["n_rows"] == predictor.PARITY_PROBE_ROWS
+        assert model.parity["max_abs_diff"] <= predictor.PARITY_MAX_ABS_DIFF
+
+    def test_health_describes_backend(self, api):
+        body = api.get("/health").json()
+        assert body["backend"]["backend"] == "catboost"
+        assert body["backend"]["parity"] is None
@@ -0,0 +1,99 @@
+"""
+Unit tests for predictor_lib.batching.MicroBatcher.
+
+Tests:
+- Concurrent submissions are coalesced into fewer inference calls
+- Each caller receives its own result
+- Inference errors reach the caller; a failing batch is retried row by row so only the bad row fails
+- Stats expose queue depth and the batch-size histogram
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from predictor_lib.batching import MicroBatcher
+
+
+class RecordingPredict:
+    """Fake predict_fn: proba = first column / 100, records batch sizes."""
+
+    def __init__(self, delay=0.0):
+        self.sizes = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            self.sizes.append(len(rows))
+        time.sleep(self.delay)
+        return [r[0] / 100 for r in rows]
+
+
+@pytest.fixture
+def batcher():
+    fn = RecordingPredict(delay=0.01)
+    b = MicroBatcher(fn, max_batch_size=16, max_wait_ms=20).start()
+    yield b
+    b.stop()
+
+
+class TestMicroBatcher:
+
+    def test_concurrent_calls_are_coalesced(self, batcher):
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(lambda i: batcher.predict([i]), range(64)))
+        assert results == pytest.approx([i / 100 for i in range(64)])
+        sizes = batcher.predict_fn.sizes
+        assert sum(sizes) == 64
+        assert len(sizes) < 64
+        assert max(sizes) <= 16
+
+    def test_error_propagates_to_callers(self):
+        def boom(rows):
+            raise ValueError("inference failed")
+
+        b = MicroBatcher(boom, max_batch_size=4, max_wait_ms=1).start()
+        try:
+            with pytest.raises(ValueError, match="inference failed"):
+                b.predict([1], timeout=2)
+        finally:
+            b.stop()
+
+    def test_bad_row_does_not_fail_batch(self):
+        calls = []
+
+        def predict(rows):
+            calls.append(len(rows))
+            if any(r[0] < 0 for r in rows):
+                raise ValueError("bad row")
+            return [r[0] / 100 for r in rows]
+
+        b = MicroBatcher(predict, max_batch_size=4, max_wait_ms=200).start()
+        try:
+            good, bad = b.submit([50]), b.submit([-1])
+            assert good.result(2) == pytest.approx(0.5)
+            with pytest.raises(ValueError, match="bad row"):
+                bad.result(2)
+            assert calls == [2, 1, 1]
+            assert b.stats()["row_fallbacks"] == 1
+        finally:
+            b.stop()
+
+    def test_stats_histogram(self, batcher):
+        batcher.predict([1], timeout=2)
+        stats = batcher.stats()
+        assert stats["enabled"] is True
+        assert stats["batches"] == 1
+        assert stats["rows"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["batch_size_histogram"]["<=1"] == 1
+        assert list(stats["batch_size_histogram"]) == ["<=1", "<=2", "<=4", "<=8", "<=16"]
+
+    def test_submit_after_stop_raises(self):
+        b = MicroBatcher(RecordingPredict(), max_batch_size=4, max_wait_ms=1).start()
+        b.stop()
+        with pytest.raises(RuntimeError):
+            b.submit([1])
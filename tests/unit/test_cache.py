@@ -0,0 +1,69 @@
+"""
+Unit tests for predictor_lib.cache and the /predict prediction cache.
+
+Tests:
+- LRUCache evicts the least recently used entry and honours the TTL
+- file_fingerprint() changes with file content
+- /predict hits the cache for equivalent payloads (1 vs "1")
+- /health reports the model fingerprint and cache counters
+"""
+
+from predictor_lib.cache import LRUCache, file_fingerprint
+from predictor_lib.synthetic import synthetic_records
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "a" devient le plus récent
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("predictor_lib.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(max_size=10, ttl_s=5)
+        cache.put("a", 1)
+        now[0] += 6
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_zero_size_disables_cache(self):
+        cache = LRUCache(max_size=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_file_fingerprint_tracks_content(self, tmp_path):
+        f = tmp_path / "m.cbm"
+        f.write_bytes(b"v1")
+        first = file_fingerprint(f)
+        f.write_bytes(b"v2")
+        assert file_fingerprint(f) != first
+
+
+class TestPredictCache:
+
+    def test_equivalent_payloads_share_entry(self, api):
+        import predictor
+        predictor.PREDICT_CACHE.clear()
+        before = predictor.PREDICT_CACHE.stats()
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=9)[0]
+        payload["lum"] = 1
+        first = api.post("/predict", json={"data": payload}).json()
+        payload["lum"] = "1"
+        second = api.post("/predict", json={"data": payload}).json()
+        after = predictor.PREDICT_CACHE.stats()
+        assert first == second
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] - before["misses"] == 1
+
+    def test_health_reports_fingerprint_and_counters(self, api, tiny_model_paths):
+        body = api.get("/health").json()
+        assert body["model_fingerprint"] == file_fingerprint(*tiny_model_paths)
+        assert {"hits", "misses", "evictions", "size"} <= set(body["cache"])
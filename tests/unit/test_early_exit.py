@@ -0,0 +1,99 @@
+"""
+Unit tests for predictor_lib.early_exit.EarlyExitPredictor.
+
+Tests:
+- Rows exit at the first stage where the remaining trees cannot flip the class
+- Early-exited probas are flagged approximate and keep the exact class
+- Stats report the early-exit fraction and exits per stage
+- EARLY_EXIT=1 on /predict: same classes as full evaluation, stats in /health
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from predictor_lib.early_exit import EarlyExitPredictor
+from predictor_lib.synthetic import synthetic_records
+
+
+class ConstantTreesBackend:
+    """10 arbres à feuilles dans [-0.1, 0.1] ; chaque arbre ajoute row[0] au logit."""
+
+    n_trees = 10
+
+    def tree_leaf_bounds(self):
+        return np.full(self.n_trees, -0.1), np.full(self.n_trees, 0.1)
+
+    def predict_raw(self, rows, ntree_start=0, ntree_end=0):
+        end = ntree_end or self.n_trees
+        return np.array([r[0] * (end - ntree_start) for r in rows], dtype=float)
+
+
+class TestEarlyExitPredictor:
+
+    def test_exit_stages(self):
+        ee = EarlyExitPredictor(ConstantTreesBackend(), threshold=0.47, stages=(0.5, 0.9))
+        assert ee.cuts == [5, 9, 10]
+        (p_far, a_far), (p_near, a_near), (p_edge, a_edge) = ee.predict([[0.1], [0.0], [-0.02]])
+
+        # 0.5 après 5 arbres, reste dans [-0.5, 0.5] : toujours >= logit(0.47)
+        assert a_far and p_far == pytest.approx(1 / (1 + math.exp(-0.5)))
+        # 0 après 9 arbres, reste dans [-0.1, 0.1] : décidé au 2e palier
+        assert a_near and p_near >= 0.47
+        # -0.2 après 10 arbres : évaluation complète, proba exacte
+        assert not a_edge and p_edge == pytest.approx(1 / (1 + math.exp(0.2)))
+
+        stats = ee.stats()
+        assert stats["exits_by_stage"] == {"5": 1, "9": 1, "10": 1}
+        assert stats["rows_early_exit"] == 2
+        assert stats["early_exit_fraction"] == pytest.approx(2 / 3)
+        assert stats["mean_trees_per_row"] == pytest.approx((5 + 9 + 10) / 3)
+
+    def test_class_always_exact(self):
+        backend = ConstantTreesBackend()
+        ee = EarlyExitPredictor(backend, threshold=0.47, stages=(0.2, 0.5, 0.8))
+        rows = [[c] for c in np.linspace(-0.2, 0.2, 41)]
+        full = 1 / (1 + np.exp(-backend.predict_raw(rows)))
+        for (p, _), f in zip(ee.predict(rows), full):
+            assert (p >= 0.47) == (f >= 0.47)
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError, match="Seuil"):
+            EarlyExitPredictor(ConstantTreesBackend(), threshold=1.0)
+
+    def test_calibrate_sets_reference_latency(self):
+        ee = EarlyExitPredictor(ConstantTreesBackend(), threshold=0.47)
+        assert ee.calibrate([0.0], repeat=3) >= 0
+        ee.predict([[0.0]])
+        assert ee.stats()["est_saved_ms_per_call"] is not None
+
+
+class TestEarlyExitEndpoint:
+
+    def test_predict_with_early_exit(self, tiny_model_paths, monkeypatch):
+        pytest.importorskip("catboost")
+        from fastapi.testclient import TestClient
+        import predictor
+
+        model_path, meta_path = tiny_model_paths
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("META_PATH", str(meta_path))
+        monkeypatch.setattr(predictor, "EARLY_EXIT", True)
+        monkeypatch.setattr(predictor, "PREDICT_CACHE", predictor.LRUCache(0))
+        records = synthetic_records(30, predictor.ModelMeta.load(meta_path).features, seed=11)
+
+        with TestClient(predictor.app) as client:
+            early = [client.post("/predict", json={"data": r}).json() for r in records]
+            stats = client.get("/health").json()["early_exit"]
+        assert stats["enabled"] and stats["rows"] == len(records)
+
+        monkeypatch.setattr(predictor, "EARLY_EXIT", False)
+        with TestClient(predictor.app) as client:
+            full = [client.post("/predict", json={"data": r}).json() for r in records]
+            assert client.get("/health").json()["early_exit"] == {"enabled": False}
+        assert [e["pred_class"] for e in early] == [f["pred_class"] for f in full]
+        for e, f in zip(early, full):
+            if not e["approximate"]:
+                assert e["proba"] == pytest.approx(f["proba"])
+        assert not any(f["approximate"] for f in full)
@@ -0,0 +1,107 @@
+"""
+Unit tests for POST /explain and /explain_batch (SHAP contributions).
+
+Tests:
+- base_value + sum of contributions gives the /predict probability (logit scale)
+- top_k returns the k largest |SHAP| contributions, in decreasing order
+- Batch: one SHAP call for the missing rows, per-row errors kept in place
+- Second request is served by the cache (keyed by encoded row + model fingerprint)
+- SHAP vs predict model-call latency is exported in /metrics
+- A backend without SHAP -> 501
+"""
+
+import math
+
+import pytest
+
+from predictor_lib.synthetic import synthetic_records
+
+
+def _logit(p):
+    return math.log(p / (1 - p))
+
+
+@pytest.fixture
+def explain_api(api):
+    import predictor
+
+    predictor.EXPLAIN_CACHE.clear()
+    predictor.PREDICT_CACHE.clear()
+    return api
+
+
+class TestExplain:
+
+    def test_contributions_sum_to_logit(self, explain_api):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=81)[0]
+        body = explain_api.post("/explain", json={"data": payload}).json()
+        proba = explain_api.post("/predict", json={"data": payload}).json()["proba"]
+
+        assert len(body["contributions"]) == len(predictor.STATE.meta.features)
+        assert body["proba"] == pytest.approx(proba, abs=1e-9)
+        total = body["base_value"] + sum(c["shap"] for c in body["contributions"])
+        assert total == pytest.approx(_logit(proba), abs=1e-6)
+        by_feature = {c["feature"]: c["value"] for c in body["contributions"]}
+        assert by_feature["dep"] == str(payload["dep"])
+
+    def test_top_k(self, explain_api):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=82)[0]
+        full = explain_api.post("/explain", json={"data": payload}).json()["contributions"]
+        top = explain_api.post("/explain", json={"data": payload, "top_k": 3}).json()["contributions"]
+        assert top == full[:3]
+        assert [abs(c["shap"]) for c in full] == sorted((abs(c["shap"]) for c in full), reverse=True)
+        assert explain_api.post("/explain", json={"data": payload, "top_k": 0}).status_code == 422
+
+    def test_batch_and_cache(self, explain_api, monkeypatch):
+        import predictor
+
+        records = synthetic_records(5, predictor.STATE.meta.features, seed=83)
+        records[2] = {"dep": "59"}
+        calls = []
+        shap_values = predictor.ServingState.shap_values
+        monkeypatch.setattr(predictor.ServingState, "shap_values",
+                            lambda self, rows: calls.append(len(rows)) or shap_values(self, rows))
+
+        body = explain_api.post("/explain_batch", json={"data": records, "top_k": 2}).json()
+        assert calls == [4]
+        assert body["n_ok"] == 4 and body["n_errors"] == 1
+        assert [r["index"] for r in body["results"]] == list(range(5))
+        assert "missing_fields" in body["results"][2]["error"]
+        assert all(len(r["contributions"]) == 2 for i, r in enumerate(body["results"]) if i != 2)
+        batch = explain_api.post("/predict_batch", json={"data": records}).json()["results"]
+        assert body["results"][0]["proba"] == pytest.approx(batch[0]["proba"])
+
+        # même contenu, autre ordre des clés / types : servi par le cache
+        again = {k: str(v) for k, v in reversed(list(records[0].items()))}
+        single = explain_api.post("/explain", json={"data": again}).json()
+        assert calls == [4]
+        assert single["proba"] == pytest.approx(body["results"][0]["proba"])
+        assert predictor.EXPLAIN_CACHE.stats()["hits"] >= 1
+        assert explain_api.get("/health").json()["explain_cache"]["size"] == 4
+
+    def test_metrics_track_shap_vs_predict(self, explain_api):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=84)[0]
+        explain_api.post("/explain", json={"data": payload})
+        explain_api.post("/predict", json={"data": payload})
+        text = explain_api.get("/metrics").text
+        assert 'predictor_model_call_seconds_count{kind="shap"}' in text
+        assert 'predictor_model_call_seconds_count{kind="predict"}' in text
+        assert 'predictor_stage_duration_seconds_count{route="/explain",stage="shap"}' in text
+
+    def test_backend_without_shap(self, explain_api, monkeypatch):
+        import predictor
+
+        def unsupported(rows):
+            raise NotImplementedError("Backend onnx : valeurs SHAP non disponibles")
+
+        monkeypatch.setattr(predictor.STATE.model, "shap_values", unsupported)
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=85)[0]
+        r = explain_api.post("/explain", json={"data": payload})
+        assert r.status_code == 501
+        assert r.json()["detail"]["error"] == "Explications indisponibles"
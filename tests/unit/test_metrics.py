@@ -0,0 +1,89 @@
+"""
+Unit tests for predictor_lib.metrics and the /metrics endpoint.
+
+Tests:
+- Histogram renders cumulative fixed buckets, _sum and _count
+- Counter renders one series per label set; stage() is a no-op outside a request
+- /predict responses carry a Server-Timing header with per-stage durations
+- /metrics counts requests by status (200 / 422 / 503) and cache hits
+"""
+
+import re
+
+from predictor_lib.metrics import Counter, Histogram, render, sample_lines, stage
+from predictor_lib.synthetic import synthetic_records
+
+
+class TestPrimitives:
+
+    def test_histogram_buckets(self):
+        h = Histogram("h_seconds", "aide", ("stage",), buckets=(0.001, 0.01))
+        for v in (0.0005, 0.001, 0.005, 2.0):
+            h.observe(("encode",), v)
+        lines = h.render()
+        assert 'h_seconds_bucket{stage="encode",le="0.001"} 2' in lines
+        assert 'h_seconds_bucket{stage="encode",le="0.01"} 3' in lines
+        assert 'h_seconds_bucket{stage="encode",le="+Inf"} 4' in lines
+        assert 'h_seconds_count{stage="encode"} 4' in lines
+        assert h.count(("encode",)) == 4
+
+    def test_counter_and_render(self):
+        c = Counter("c_total", "aide", ("status",))
+        c.inc(("200",))
+        c.inc(("200",))
+        c.inc(("422",))
+        text = render(c, extra_lines=sample_lines("g", "jauge", 3))
+        assert 'c_total{status="200"} 2' in text
+        assert 'c_total{status="422"} 1' in text
+        assert "# TYPE g gauge\ng 3\n" in text
+
+    def test_stage_outside_request(self):
+        with stage("encode"):
+            pass  # aucun chronomètre actif : rien à enregistrer
+
+
+def _metric(text, name, **labels):
+    pattern = re.escape(name) + r"\{" + ",".join(f'{k}="{re.escape(v)}"' for k, v in labels.items()) + r"\} (\S+)"
+    m = re.search(pattern, text)
+    return float(m.group(1)) if m else 0.0
+
+
+class TestMetricsEndpoint:
+
+    def test_server_timing_header(self, api):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=31)[0]
+        predictor.PREDICT_CACHE.clear()
+        header = api.post("/predict", json={"data": payload}).headers["server-timing"]
+        stages = dict(part.split(";dur=") for part in header.split(", "))
+        assert {"parse", "encode", "cache", "inference", "serialize", "total"} <= set(stages)
+        assert float(stages["total"]) >= float(stages["inference"])
+
+    def test_counters(self, api):
+        import predictor
+
+        before = api.get("/metrics").text
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=32)[0]
+        api.post("/predict", json={"data": payload})
+        api.post("/predict", json={"data": payload})  # hit du cache
+        api.post("/predict", json={"data": {}})  # 422
+        state, predictor.STATE = predictor.STATE, None
+        try:
+            assert api.post("/predict", json={"data": payload}).status_code == 503
+        finally:
+            predictor.STATE = state
+
+        after = api.get("/metrics")
+        assert after.headers["content-type"].startswith("text/plain")
+        text = after.text
+
+        def delta(status):
+            labels = dict(route="/predict", method="POST", status=status)
+            return _metric(text, "predictor_requests_total", **labels) - \
+                _metric(before, "predictor_requests_total", **labels)
+
+        assert delta("200") == 2 and delta("422") == 1 and delta("503") == 1
+        hits = lambda t: float(re.search(r"^predictor_cache_hits_total (\S+)$", t, re.M).group(1))
+        assert hits(text) - hits(before) >= 1
+        assert _metric(text, "predictor_stage_duration_seconds_count", route="/predict", stage="encode") > 0
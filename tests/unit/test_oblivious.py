@@ -0,0 +1,106 @@
+"""
+Unit tests for predictor_lib.oblivious (NumPy oblivious-tree engine).
+
+Tests:
+- cat_feature_hash() matches CatBoost's hashes of categorical values
+- ObliviousTreeEngine reproduces CatBoostClassifier.predict_proba (max abs diff)
+- ntree_start/ntree_end slices sum to the full raw value
+- INFERENCE_ENGINE=numpy serves /predict with the engine
+"""
+
+import numpy as np
+import pytest
+
+from predictor_lib.cityhash import cat_feature_hash
+from predictor_lib.synthetic import synthetic_records
+
+pytest.importorskip("catboost")
+
+
+@pytest.fixture(scope="module")
+def native_and_engine(tiny_model_paths):
+    from catboost import CatBoostClassifier
+    from predictor_lib.oblivious import ObliviousTreeEngine
+
+    model_path, _ = tiny_model_paths
+    model = CatBoostClassifier()
+    model.load_model(str(model_path))
+    return model, ObliviousTreeEngine.from_cbm(model_path)
+
+
+@pytest.fixture(scope="module")
+def rows(native_and_engine):
+    _, engine = native_and_engine
+    records = synthetic_records(500, engine.feature_names, seed=7)
+    return [[str(r[c]) for c in engine.feature_names] for r in records]
+
+
+class TestCityHash:
+
+    @pytest.mark.parametrize("value, expected", [("1", 1121341681), ("p", 759035679)])
+    def test_known_values(self, value, expected):
+        assert cat_feature_hash(value) == expected
+
+
+class TestObliviousTreeEngine:
+
+    def test_feature_names_follow_model(self, native_and_engine):
+        model, engine = native_and_engine
+        assert engine.feature_names == list(model.feature_names_)
+
+    def test_parity_with_catboost(self, native_and_engine, rows):
+        model, engine = native_and_engine
+        expected = model.predict_proba(rows)[:, 1]
+        got = engine.predict_proba(rows)[:, 1]
+        assert np.abs(expected - got).max() < 1e-9
+
+    def test_single_row_and_chunking(self, native_and_engine, rows):
+        from predictor_lib.oblivious import ObliviousTreeEngine
+
+        _, engine = native_and_engine
+        small = ObliviousTreeEngine.__new__(ObliviousTreeEngine)
+        small.__dict__.update(engine.__dict__, chunk_rows=7)
+        np.testing.assert_allclose(small.predict_raw(rows), engine.predict_raw(rows))
+        np.testing.assert_allclose(engine.predict_raw(rows[0]), engine.predict_raw(rows[:1]))
+
+    def test_tree_ranges_add_up(self, native_and_engine, rows):
+        model, engine = native_and_engine
+        half = engine.n_trees // 2
+        head = engine.predict_raw(rows, ntree_end=half)
+        tail = engine.predict_raw(rows, ntree_start=half)
+        np.testing.assert_allclose(head + tail, engine.predict_raw(rows), atol=1e-12)
+        native_head = model.predict(rows, prediction_type="RawFormulaVal", ntree_end=half)
+        np.testing.assert_allclose(head, native_head, atol=1e-9)
+
+
+class TestNumpyEngineEndpoint:
+
+    def test_predict_with_numpy_engine(self, tiny_model_paths, monkeypatch):
+        from fastapi.testclient import TestClient
+        import predictor
+
+        model_path, meta_path = tiny_model_paths
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("META_PATH", str(meta_path))
+        monkeypatch.setattr(predictor, "INFERENCE_ENGINE", "numpy")
+        payload = synthetic_records(1, predictor.ModelMeta.load(meta_path).features, seed=3)[0]
+
+        with TestClient(predictor.app) as client:
+            assert predictor.STATE.model.name == "numpy"
+            proba = client.post("/predict", json={"data": payload}).json()["proba"]
+
+        monkeypatch.setattr(predictor, "INFERENCE_ENGINE", "catboost")
+        predictor.PREDICT_CACHE.clear()
+        with TestClient(predictor.app) as client:
+            expected = client.post("/predict", json={"data": payload}).json()["proba"]
+        assert proba == pytest.approx(expected, abs=1e-9)
+
+    def test_unknown_engine_rejected(self, tiny_model_paths, monkeypatch):
+        import predictor
+
+        model_path, meta_path = tiny_model_paths
+        monkeypatch.setenv("MODEL_PATH", str(model_path))
+        monkeypatch.setenv("META_PATH", str(meta_path))
+        monkeypatch.setattr(predictor, "INFERENCE_ENGINE", "tensorrt")
+        with pytest.raises(ValueError, match="INFERENCE_ENGINE"):
+            predictor.load_model_and_meta()
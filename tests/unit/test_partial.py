@@ -0,0 +1,158 @@
+"""
+Unit tests for partial-input prediction (predictor_lib.marginal + POST /predict/partial).
+
+Tests:
+- top_combinations() returns the most likely code combinations in order, capped, with covered mass
+- main.py freq-tables counts codes of the categorical features (chunked) into a JSON table
+- /predict/partial on a complete payload equals /predict (one combination, zero spread)
+- Unknown fields are expanded with frequency weights and scored in one call: weighted mean + spread
+- Fields without a frequency table fall back to uniform weights over ref_options codes
+- An empty frequency table falls back to uniform weights; with neither table nor codes -> 422
+"""
+
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import main
+from predictor_lib import marginal
+from predictor_lib.synthetic import synthetic_records
+
+
+class TestTopCombinations:
+
+    def test_order_cap_and_coverage(self):
+        tables = {"a": marginal.normalize_counts({"1": 6, "2": 3, "3": 1}),
+                  "b": marginal.normalize_counts({"x": 8, "y": 2})}
+        combos, weights, covered = marginal.top_combinations(["a", "b"], tables, 3)
+        assert combos == [("1", "x"), ("2", "x"), ("1", "y")]
+        assert covered == pytest.approx(0.48 + 0.24 + 0.12)
+        assert weights.sum() == pytest.approx(1.0)
+
+        combos, _, covered = marginal.top_combinations(["a", "b"], tables, 100)
+        assert len(combos) == 6 and covered == pytest.approx(1.0)
+
+    def test_empty_table(self):
+        tables = {"a": marginal.normalize_counts({"1": 1}), "b": marginal.normalize_counts({})}
+        with pytest.raises(ValueError, match="b"):
+            marginal.top_combinations(["a", "b"], tables, 3)
+
+    def test_weighted_summary(self):
+        s = marginal.weighted_summary(np.array([0.2, 0.6]), np.array([0.75, 0.25]))
+        assert s["proba"] == pytest.approx(0.3)
+        assert s["spread"] == pytest.approx(np.sqrt(0.75 * 0.01 + 0.25 * 0.09))
+        assert (s["proba_min"], s["proba_max"]) == (0.2, 0.6)
+
+
+@pytest.fixture
+def freq_path(api, tmp_path):
+    """Frequency tables built by `main.py freq-tables` from a synthetic training Parquet."""
+    import predictor
+
+    features = predictor.STATE.meta.features
+    records = synthetic_records(500, features, seed=101)
+    for r in records[:300]:
+        r["manv_mode"] = 1  # code majoritaire
+    training = tmp_path / "train.parquet"
+    pq.write_table(pa.Table.from_pylist(records), training)
+    out = tmp_path / "freq.json"
+    assert main.main(["freq-tables", "--input", str(training), "--output", str(out),
+                      "--meta", str(predictor.model_paths()[1])]) == 0
+    return out
+
+
+@pytest.fixture
+def partial_api(api, freq_path, monkeypatch):
+    import predictor
+
+    assert predictor.READY.wait(30)  # chauffe terminée : plus d'appels au modèle en arrière-plan
+    monkeypatch.setattr(predictor, "FREQ_TABLES", marginal.load_frequency_tables(freq_path))
+    return api
+
+
+class TestFreqTables:
+
+    def test_counts(self, freq_path):
+        import predictor
+
+        payload = json.loads(freq_path.read_text(encoding="utf-8"))
+        assert payload["rows"] == 500
+        assert set(payload["fields"]) == set(predictor.STATE.meta.cat_features)
+        assert payload["fields"]["manv_mode"]["1"] >= 300
+        assert sum(payload["fields"]["dep"].values()) == 500
+        codes, probs = marginal.load_frequency_tables(freq_path)["manv_mode"]
+        assert codes[0] == "1" and probs[0] >= 0.6
+
+
+class TestPredictPartial:
+
+    def test_complete_payload(self, partial_api):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=102)[0]
+        body = partial_api.post("/predict/partial", json={"data": payload}).json()
+        assert body["n_combinations"] == 1 and body["spread"] == 0.0 and body["marginalized_fields"] == []
+        assert body["proba"] == pytest.approx(partial_api.post("/predict", json={"data": payload}).json()["proba"])
+
+    def test_marginalizes_unknown_fields(self, partial_api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "MARGINAL_MAX_COMBINATIONS", 20)
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=103)[0]
+        del payload["manv_mode"]
+        payload["choc_mode"] = None
+        calls = []
+        predict_proba = predictor.ServingState.predict_proba
+        monkeypatch.setattr(predictor.ServingState, "predict_proba",
+                            lambda self, X: calls.append(len(X)) or predict_proba(self, X))
+
+        body = partial_api.post("/predict/partial", json={"data": payload}).json()
+        assert calls == [20] and body["n_combinations"] == 20
+        assert body["marginalized_fields"] == ["manv_mode", "choc_mode"]
+        assert body["weights_source"] == {"manv_mode": "frequencies", "choc_mode": "frequencies"}
+        assert 0 < body["coverage"] < 1
+
+        combos, weights, _ = marginal.top_combinations(["manv_mode", "choc_mode"], predictor.FREQ_TABLES, 20)
+        expanded = [{**payload, "manv_mode": m, "choc_mode": c} for m, c in combos]
+        probas = np.array([r["proba"] for r in
+                           partial_api.post("/predict_batch", json={"data": expanded}).json()["results"]])
+        assert body["proba"] == pytest.approx(float(np.dot(weights, probas)))
+        assert body["proba_min"] == pytest.approx(probas.min()) and body["spread"] >= 0
+        assert body["pred_class"] == int(body["proba"] >= body["threshold"])
+
+    def test_uniform_fallback(self, partial_api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "FREQ_TABLES", {})
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=104)[0]
+        del payload["lum"]
+        body = partial_api.post("/predict/partial", json={"data": payload}).json()
+        assert body["weights_source"] == {"lum": "uniform"}
+        assert body["n_combinations"] == len(predictor.REF_CODES["lum"]) and body["coverage"] == pytest.approx(1.0)
+
+    def test_not_marginalizable(self, partial_api, monkeypatch):
+        import predictor
+
+        monkeypatch.delitem(predictor.FREQ_TABLES, "dep")
+        monkeypatch.delitem(predictor.REF_CODES, "dep")
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=105)[0]
+        del payload["dep"]
+        r = partial_api.post("/predict/partial", json={"data": payload})
+        assert r.status_code == 422 and r.json()["detail"]["missing_fields"] == ["dep"]
+
+    def test_empty_frequency_table(self, partial_api, monkeypatch):
+        import predictor
+
+        monkeypatch.setitem(predictor.FREQ_TABLES, "lum", marginal.normalize_counts({}))
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=106)[0]
+        del payload["lum"]
+        body = partial_api.post("/predict/partial", json={"data": payload}).json()
+        assert body["weights_source"] == {"lum": "uniform"}
+        assert body["n_combinations"] == len(predictor.REF_CODES["lum"])
+
+        monkeypatch.setitem(predictor.REF_CODES, "lum", [])
+        r = partial_api.post("/predict/partial", json={"data": payload})
+        assert r.status_code == 422 and r.json()["detail"]["missing_fields"] == ["lum"]
@@ -0,0 +1,67 @@
+"""
+Unit tests for predictor /predict_batch.
+
+Tests:
+- normalize_batch() matches normalize_input() row by row
+- Invalid rows get a per-row error with the /predict 422 detail shape
+- /predict_batch returns the same proba as /predict for each row
+"""
+
+import pytest
+
+from predictor_lib.synthetic import synthetic_records
+
+@pytest.fixture
+def meta(tiny_model_paths):
+    import predictor
+    return predictor.ModelMeta.load(tiny_model_paths[1])
+
+
+class TestNormalizeBatch:
+    """normalize_batch() is the column-wise equivalent of normalize_input()."""
+
+    def test_matches_single_row_normalization(self, meta):
+        import predictor
+        records = synthetic_records(20, meta.features, seed=1)
+        records[3]["lum"] = None
+        X, valid, errors = predictor.normalize_batch(records, meta)
+        assert valid == list(range(20))
+        assert errors == {}
+        for i, r in enumerate(records):
+            single = predictor.normalize_input(dict(r), meta)
+            assert X.iloc[i].tolist() == single.iloc[0].tolist()
+
+    def test_missing_field_reported_per_row(self, meta):
+        import predictor
+        records = synthetic_records(3, meta.features, seed=2)
+        del records[1]["dep"]
+        del records[1]["time_bucket"]
+        X, valid, errors = predictor.normalize_batch(records, meta)
+        assert valid == [0, 2]
+        assert len(X) == 2
+        assert errors[1]["error"] == "Champs manquants"
+        assert errors[1]["missing_fields"] == ["dep", "time_bucket"]
+
+
+class TestPredictBatchEndpoint:
+    """POST /predict_batch scores all valid rows in one call."""
+
+    def test_batch_matches_single_predictions(self, api, meta):
+        records = synthetic_records(5, meta.features, seed=3)
+        batch = api.post("/predict_batch", json={"data": records})
+        assert batch.status_code == 200
+        body = batch.json()
+        assert body["n_ok"] == 5 and body["n_errors"] == 0
+        for r, item in zip(records, body["results"]):
+            single = api.post("/predict", json={"data": r}).json()
+            assert item["proba"] == pytest.approx(single["proba"])
+            assert item["label"] == single["label"]
+
+    def test_invalid_row_does_not_fail_batch(self, api, meta):
+        records = synthetic_records(3, meta.features, seed=4)
+        del records[0]["lum"]
+        body = api.post("/predict_batch", json={"data": records}).json()
+        assert [r["index"] for r in body["results"]] == [0, 1, 2]
+        assert body["results"][0]["error"]["missing_fields"] == ["lum"]
+        assert body["results"][0]["proba"] is None
+        assert body["results"][1]["proba"] is not None
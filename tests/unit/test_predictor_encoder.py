@@ -0,0 +1,77 @@
+"""
+Unit tests for predictor.FeatureEncoder (pandas-free /predict fast path).
+
+Tests:
+- encode() produces the same row as normalize_input()
+- Missing and invalid numeric fields raise the same 422 details
+- With compiled reference codes, every unknown code of the row is reported in one 422
+"""
+
+import pytest
+from fastapi import HTTPException
+
+import predictor
+from predictor_lib.synthetic import synthetic_records
+
+
+@pytest.fixture
+def meta(monkeypatch):
+    # parité avec normalize_input : sans contrôle des codes (compilés par le démarrage de l'API)
+    monkeypatch.setattr(predictor, "REF_CODE_SETS", {})
+    return predictor.ModelMeta.load(predictor.DEFAULT_META_PATH)
+
+
+def _detail(fn, payload):
+    with pytest.raises(HTTPException) as exc:
+        fn(payload)
+    assert exc.value.status_code == 422
+    return exc.value.detail
+
+
+class TestFeatureEncoder:
+    """FeatureEncoder.encode() mirrors normalize_input() without a DataFrame."""
+
+    @pytest.mark.parametrize("value", [1, "1", 1.5, -1, None, float("nan"), True, "<=30"])
+    def test_same_row_as_normalize_input(self, meta, value):
+        payload = synthetic_records(1, meta.features, seed=5)[0]
+        payload["lum"] = value
+        expected = predictor.normalize_input(dict(payload), meta).iloc[0].tolist()
+        assert predictor.FeatureEncoder(meta).encode(payload) == expected
+
+    def test_missing_fields_same_422(self, meta):
+        payload = synthetic_records(1, meta.features, seed=6)[0]
+        del payload["dep"]
+        del payload["atm"]
+        encoder = predictor.FeatureEncoder(meta)
+        assert _detail(encoder.encode, payload) == \
+            _detail(lambda p: predictor.normalize_input(dict(p), meta), payload)
+
+    @pytest.mark.parametrize("value", ["12:30", "abc"])
+    def test_numeric_field_same_422(self, meta, monkeypatch, value):
+        monkeypatch.setattr(predictor, "NUMERIC_FIELDS", {"manv_mode"})
+        meta = predictor.ModelMeta(meta.model_name, meta.threshold, meta.features,
+                                   [c for c in meta.cat_features if c != "manv_mode"])
+        payload = synthetic_records(1, meta.features, seed=7)[0]
+        payload["manv_mode"] = value
+        encoder = predictor.FeatureEncoder(meta)
+        assert _detail(encoder.encode, payload) == \
+            _detail(lambda p: predictor.normalize_input(dict(p), meta), payload)
+
+
+class TestReferenceValidation:
+
+    def test_all_unknown_codes_in_one_422(self, meta, monkeypatch):
+        monkeypatch.setattr(predictor, "REF_CODE_SETS",
+                            predictor.reference.compile_code_sets(predictor.load_codes()))
+        encoder = predictor.FeatureEncoder(meta)
+        payload = synthetic_records(1, meta.features, seed=8)[0]
+        payload.update(lum="1", atm=1, choc_mode=None)
+        assert encoder.encode(payload)[meta.features.index("lum")] == "1"
+        payload.update(lum=1.0)  # flottant entier : même code que 1 / "1"
+        assert encoder.encode(payload)[meta.features.index("lum")] == "1"
+
+        payload.update(dep="999", lum=1.5, vma_bucket="<=31")
+        detail = _detail(encoder.encode, payload)
+        assert detail["error"] == "Codes inconnus"
+        assert detail["invalid_fields"] == [f for f in meta.features if f in ("dep", "lum", "vma_bucket")]
+        assert detail["values"] == {"dep": "999", "lum": 1.5, "vma_bucket": "<=31"}
@@ -0,0 +1,124 @@
+"""
+Unit tests for server-side reference validation (predictor_lib.reference + predictor).
+
+Tests:
+- compile_code_sets() canonicalises codes as the encoder does (1, "1" and 1.0 are the same code)
+- canonical_code / canonical_codes / canonical_column apply the same rule to scalars, pandas and Arrow
+- invalid_rows() / invalid_positions() flag unknown codes only (missing values accepted)
+- /predict with unknown codes -> one 422 listing every invalid field
+- /predict_batch and /predict/arrow report unknown codes per row, valid rows still scored
+- 1, "1" and 1.0 get the same score on /predict, /predict_batch and /predict/arrow
+- Without compiled code sets (REF_VALIDATION=0) unknown codes are scored
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from predictor_lib import columnar, reference
+from predictor_lib.synthetic import synthetic_records
+
+
+class TestCodeSets:
+
+    def test_canonical_codes(self):
+        sets = reference.compile_code_sets({"lum": [-1, 1, 2], "dep": ["01", "2A"], "x": [1]}, fields=["lum", "dep"])
+        assert sets == {"lum": frozenset({"-1", "1", "2"}), "dep": frozenset({"01", "2A"})}
+
+    def test_canonical_rule_per_path(self):
+        values = [1, "1", 1.0, np.float64(2.0), 1.5, "1.0", None]
+        expected = ["1", "1", "1", "2", "1.5", "1.0", "__MISSING__"]
+        assert [reference.canonical_code(v) for v in values[:-1]] == expected[:-1]
+        assert reference.canonical_codes(pd.Series(values, dtype=object), "__MISSING__").tolist() == expected
+        assert reference.canonical_codes(pd.Series([1.0, np.nan]), "__MISSING__").tolist() == ["1", "__MISSING__"]
+        column = reference.canonical_column(pa.array([1.0, 2.0, 1.5, None]))
+        assert column.to_pylist() == ["1", "2", "1.5", None]
+
+    def test_invalid_rows_and_positions(self):
+        codes = frozenset({"1", "2"})
+        column = pd.Series(["1", "__MISSING__", "9", "2", "9", "1.0"])
+        assert reference.invalid_rows(column, codes, "__MISSING__").tolist() == [2, 4, 5]
+        assert reference.invalid_rows(column[:2], codes, "__MISSING__").tolist() == []
+        arrow = pa.chunked_array([pa.array(["1", None, "9"]), pa.array(["2", "x"])])
+        assert reference.invalid_positions(arrow, codes).tolist() == [2, 4]
+
+
+@pytest.fixture
+def payload(api):
+    import predictor
+
+    assert predictor.REF_CODE_SETS  # compilé par le démarrage
+    return synthetic_records(1, predictor.STATE.meta.features, seed=121)[0]
+
+
+class TestApiValidation:
+
+    def test_predict_reports_all_invalid_fields(self, api, payload):
+        payload.update(lum="1", choc_mode=None)
+        assert api.post("/predict", json={"data": payload}).status_code == 200
+
+        payload.update(dep=999, vma_bucket="<=31", time_bucket="midi")
+        r = api.post("/predict", json={"data": payload})
+        assert r.status_code == 422
+        detail = r.json()["detail"]
+        assert detail["error"] == "Codes inconnus"
+        assert sorted(detail["invalid_fields"]) == ["dep", "time_bucket", "vma_bucket"]
+        assert detail["values"]["dep"] == 999
+
+    def test_batch_and_arrow_per_row(self, api, payload):
+        import predictor
+
+        records = synthetic_records(4, predictor.STATE.meta.features, seed=122)
+        records[1]["dep"] = "00"
+        records[3].update(agg=7, lum=42)
+        del records[2]["atm"]
+        records[2]["dep"] = "00"
+
+        body = api.post("/predict_batch", json={"data": records}).json()
+        assert body["n_ok"] == 1 and body["results"][0]["proba"] is not None
+        assert body["results"][1]["error"]["invalid_fields"] == ["dep"]
+        assert body["results"][2]["error"]["missing_fields"] == ["atm"]  # manquant avant code inconnu
+        assert sorted(body["results"][3]["error"]["values"]) == ["agg", "lum"]
+
+        del records[2]
+        table = pa.table({c: [str(r[c]) for r in records] for c in predictor.STATE.meta.features})
+        r = api.post("/predict/arrow", content=columnar.write_ipc_stream(table),
+                     headers={"Content-Type": columnar.ARROW_STREAM})
+        errors = pa.ipc.open_stream(pa.py_buffer(r.content)).read_all().column("error").to_pylist()
+        assert errors[0] is None and '"dep"' in errors[1] and '"lum"' in errors[2]
+
+    def test_int_str_float_parity(self, api, payload):
+        import predictor
+
+        variants = [1, "1", 1.0]
+        records = [{**payload, "lum": v} for v in variants]
+        single = []
+        for record in records:
+            r = api.post("/predict", json={"data": record})
+            assert r.status_code == 200
+            single.append(r.json()["proba"])
+        body = api.post("/predict_batch", json={"data": records}).json()
+        assert body["n_ok"] == 3
+        batch = [row["proba"] for row in body["results"]]
+
+        arrow = []
+        others = {c: [str(payload[c])] for c in predictor.STATE.meta.features if c != "lum"}
+        for column in (pa.array([1]), pa.array(["1"]), pa.array([1.0])):
+            table = pa.table({**others, "lum": column})
+            r = api.post("/predict/arrow", content=columnar.write_ipc_stream(table),
+                         headers={"Content-Type": columnar.ARROW_STREAM})
+            result = pa.ipc.open_stream(pa.py_buffer(r.content)).read_all()
+            assert result.column("error").to_pylist() == [None]
+            arrow.append(result.column("proba")[0].as_py())
+
+        assert single == pytest.approx([single[0]] * 3)
+        assert batch == pytest.approx(single) and arrow == pytest.approx(single)
+
+    def test_validation_disabled(self, api, payload, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "REF_CODE_SETS", {})
+        monkeypatch.setattr(predictor, "STATE", predictor.build_state())
+        payload["dep"] = "999"
+        assert api.post("/predict", json={"data": payload}).status_code == 200
@@ -0,0 +1,80 @@
+"""
+Unit tests for ReferenceIndex (indexed lookups over data/ref_options.json).
+
+Tests:
+- load_reference_data() returns the same dict as before, carrying its index
+- Labels, positions and parsed options match the linear lookups they replace, for every code
+- Membership is strict like validate_field (1 is valid for lum, "1" is not)
+- Unknown fields / codes raise the same errors; plain dicts get an index on demand
+- The index is immutable and survives pickling and deep copies (session state)
+"""
+
+import json
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from streamlit_lib import reference_loader, validation
+from streamlit_lib.reference_loader import ReferenceIndex, get_reference_index, load_reference_data
+
+
+@pytest.fixture(scope="module")
+def ref_data():
+    return load_reference_data()
+
+
+def _fields(data):
+    return [f for f, options in data.items() if isinstance(options, list)]
+
+
+class TestReferenceIndex:
+
+    def test_loaded_data_unchanged(self, ref_data):
+        with open("data/ref_options.json", encoding="utf-8") as f:
+            assert ref_data == json.load(f)
+        assert isinstance(ref_data.index, ReferenceIndex)
+        assert get_reference_index(ref_data) is ref_data.index
+
+    def test_lookups_match_linear_scans(self, ref_data):
+        index = ref_data.index
+        for field in _fields(ref_data):
+            formatted = [reference_loader.format_dropdown_option(o["code"], o["label"]) for o in ref_data[field]]
+            assert list(index.options(field)) == formatted
+            for opt in ref_data[field]:
+                for code in (opt["code"], str(opt["code"])):
+                    label = index.label(field, code)
+                    expected = next(o["label"] for o in ref_data[field] if str(o["code"]) == str(code))
+                    assert label == expected
+                    option = reference_loader.format_dropdown_option(code, label)
+                    assert index.position(field, code) == formatted.index(option)
+            for option in formatted:
+                assert index.code_for_option(field, option) == reference_loader.parse_dropdown_value(option)
+
+    def test_strict_membership(self, ref_data):
+        index = ref_data.index
+        assert index.is_valid("lum", 1) and not index.is_valid("lum", "1")
+        assert index.is_valid("dep", "59") and not index.is_valid("dep", "999")
+        assert not index.is_valid("lum", [1])
+        assert validation.validate_field("lum", 1, ref_data) == (True, "")
+        assert not validation.validate_field("lum", 99, ref_data)[0]
+
+    def test_unknown_field_and_code(self, ref_data):
+        with pytest.raises(KeyError):
+            ref_data.index.options("unknown")
+        with pytest.raises(ValueError):
+            reference_loader.get_label_for_code(ref_data, "lum", 99)
+        assert ref_data.index.position("lum", 99) == 0
+        assert "help_texts" not in ref_data.index
+
+    def test_plain_dict(self):
+        data = {"lum": [{"code": 1, "label": "Plein jour"}, {"code": 2, "label": "Crepuscule"}]}
+        assert reference_loader.get_label_for_code(data, "lum", "2") == "Crepuscule"
+        assert reference_loader.get_dropdown_options(data, "lum") == ["1 — Plein jour", "2 — Crepuscule"]
+
+    def test_immutable_and_picklable(self, ref_data):
+        with pytest.raises(AttributeError):
+            ref_data.index.extra = 1
+        for copy in (pickle.loads(pickle.dumps(ref_data)), deepcopy(ref_data)):
+            assert copy == ref_data
+            assert copy.index.label("dep", "59") == ref_data.index.label("dep", "59")
@@ -0,0 +1,227 @@
+"""
+Unit tests for predictor_lib.registry and the /models endpoints.
+
+Tests:
+- parse_registry() reads 'name=model,meta;...' and rejects malformed entries
+- ModelRegistry loads lazily, unloads the least recently used model, records latency
+- ThreadBudget caps concurrent inference calls
+- POST /models/{name}/predict routes to the right encoder / threshold (product15 with numeric minute)
+- Numeric features of a registry model (meta features minus cat_features) are validated: bad value -> 422
+- Unknown model -> 404, unloadable model -> 503; GET /models reports per-model stats
+- Without MODEL_REGISTRY, product15_v2 follows MODEL_PATH / META_PATH and reuses STATE
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from predictor_lib.budget import ThreadBudget
+from predictor_lib.registry import ModelRegistry, ModelSpec, parse_registry
+from predictor_lib.synthetic import synthetic_records
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent
+META_V1 = PROJECT_DIR / "out" / "catboost_product15_meta.json"
+
+
+class TestParseRegistry:
+
+    def test_parse(self):
+        specs = parse_registry("a=m1.cbm,meta1.json; b = m2.cbm , meta2.json ;")
+        assert list(specs) == ["a", "b"]
+        assert specs["b"] == ModelSpec("b", Path("m2.cbm"), Path("meta2.json"))
+
+    @pytest.mark.parametrize("bad", ["a=m1.cbm", "m1.cbm,meta.json", "=m.cbm,meta.json"])
+    def test_malformed(self, bad):
+        with pytest.raises(ValueError, match="registre"):
+            parse_registry(bad)
+
+
+class TestModelRegistry:
+
+    def _registry(self, max_loaded=2):
+        loads = []
+
+        def loader(spec):
+            loads.append(spec.name)
+            return f"model-{spec.name}"
+
+        specs = {n: ModelSpec(n, Path(f"{n}.cbm"), Path(f"{n}.json")) for n in "abc"}
+        return ModelRegistry(specs, loader, max_loaded), loads
+
+    def test_lazy_load_and_lru_unload(self):
+        registry, loads = self._registry(max_loaded=2)
+        assert loads == []
+        assert registry.get("a") == "model-a"
+        registry.get("b")
+        registry.get("a")  # "b" devient le moins récent
+        registry.get("c")
+        stats = registry.stats()["models"]
+        assert loads == ["a", "b", "c"]
+        assert not stats["b"]["loaded"] and stats["b"]["unloads"] == 1
+        assert stats["a"]["loaded"] and stats["c"]["loaded"]
+        registry.get("b")
+        assert loads == ["a", "b", "c", "b"]
+
+    def test_unknown_name(self):
+        registry, _ = self._registry()
+        with pytest.raises(KeyError):
+            registry.get("zzz")
+
+    def test_concurrent_first_requests_load_once(self):
+        calls = []
+
+        def slow_loader(spec):
+            calls.append(spec.name)
+            time.sleep(0.05)
+            return object()
+
+        registry = ModelRegistry({"a": ModelSpec("a", Path("a"), Path("a"))}, slow_loader)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda _: registry.get("a"), range(8)))
+        assert calls == ["a"] and len({id(v) for v in values}) == 1
+
+    def test_loader_error_is_recorded(self):
+        registry = ModelRegistry({"a": ModelSpec("a", Path("a"), Path("a"))},
+                                 lambda spec: (_ for _ in ()).throw(FileNotFoundError("absent")))
+        with pytest.raises(FileNotFoundError):
+            registry.get("a")
+        assert "absent" in registry.stats()["models"]["a"]["last_error"]
+
+    def test_latency_stats(self):
+        registry, _ = self._registry()
+        for ms in (1.0, 2.0, 3.0, 10.0):
+            registry.record("a", ms)
+        lat = registry.stats()["models"]["a"]["latency_ms"]
+        assert registry.stats()["models"]["a"]["requests"] == 4
+        assert lat["max"] == 10.0 and lat["mean"] == pytest.approx(4.0)
+
+
+class TestThreadBudget:
+
+    def test_caps_concurrency(self):
+        budget = ThreadBudget(total_threads=4, threads_per_call=2)
+        assert budget.slots == 2
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def work(_):
+            with budget:
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(work, range(6)))
+        assert peak[0] == 2
+        assert budget.stats()["max_active"] == 2 and budget.stats()["waits"] > 0
+
+
+@pytest.fixture(scope="module")
+def v1_model_paths(tmp_path_factory):
+    """Tiny model with the product15 (numeric minute) meta layout."""
+    pytest.importorskip("catboost")
+    import pandas as pd
+    from catboost import CatBoostClassifier
+
+    meta = json.loads(META_V1.read_text(encoding="utf-8"))
+    features, cat_features = meta["features"], meta["cat_features"]
+    records = synthetic_records(300, features, seed=3, fallback={"minute": list(range(60))})
+    X = pd.DataFrame(records, columns=features)
+    X[cat_features] = X[cat_features].astype(str)
+    y = [int(r["minute"] < 20 or i % 3 == 0) for i, r in enumerate(records)]
+    model = CatBoostClassifier(iterations=20, depth=3, verbose=0, random_seed=0,
+                               cat_features=cat_features, allow_writing_files=False)
+    model.fit(X, y)
+    path = tmp_path_factory.mktemp("v1_model") / "v1.cbm"
+    model.save_model(str(path))
+    return path, META_V1
+
+
+@pytest.fixture
+def multi_api(api, tiny_model_paths, v1_model_paths, monkeypatch):
+    import predictor
+
+    registry = ModelRegistry(
+        {
+            "product15_v2": ModelSpec("product15_v2", *tiny_model_paths),
+            "product15": ModelSpec("product15", *v1_model_paths),
+            "broken": ModelSpec("broken", Path("/nonexistent.cbm"), META_V1),
+        },
+        lambda spec: predictor.build_state(spec.model_path, spec.meta_path),
+        max_loaded=2,
+    )
+    monkeypatch.setattr(predictor, "REGISTRY", registry)
+    return api
+
+
+class TestModelsEndpoint:
+
+    def test_routes_to_each_model(self, multi_api, v1_model_paths):
+        import predictor
+
+        v1_features = json.loads(META_V1.read_text(encoding="utf-8"))["features"]
+        v1_payload = synthetic_records(1, v1_features, seed=4, fallback={"minute": [42]})[0]
+        v2_payload = synthetic_records(1, predictor.STATE.meta.features, seed=4)[0]
+
+        r1 = multi_api.post("/models/product15/predict", json={"data": v1_payload})
+        assert r1.status_code == 200
+        assert r1.json()["threshold"] == 0.47
+
+        # le modèle principal réutilise STATE (pas de second chargement)
+        r2 = multi_api.post("/models/product15_v2/predict", json={"data": v2_payload})
+        assert r2.status_code == 200
+        assert r2.json()["proba"] == multi_api.post("/predict", json={"data": v2_payload}).json()["proba"]
+
+        # champ v2 manquant pour product15 -> 422 de son propre encodeur
+        r3 = multi_api.post("/models/product15/predict", json={"data": v2_payload})
+        assert r3.status_code == 422
+
+        stats = multi_api.get("/models").json()["models"]
+        assert stats["product15"]["loaded"] and stats["product15"]["loads"] == 1
+        assert stats["product15"]["requests"] == 1
+        assert stats["product15"]["latency_ms"]["p50"] > 0
+        assert stats["product15"]["rss_delta_mb"] is not None
+        assert stats["product15_v2"]["loads"] == 0
+
+    def test_bad_numeric_value(self, multi_api):
+        v1_features = json.loads(META_V1.read_text(encoding="utf-8"))["features"]
+        payload = synthetic_records(1, v1_features, seed=5, fallback={"minute": [42]})[0]
+
+        assert multi_api.post("/models/product15/predict", json={"data": {**payload, "minute": "42"}}).status_code == 200
+        r = multi_api.post("/models/product15/predict", json={"data": {**payload, "minute": "12:30"}})
+        assert r.status_code == 422
+        assert r.json()["detail"]["error"] == "Format invalide"
+        r = multi_api.post("/models/product15/predict", json={"data": {**payload, "minute": "abc"}})
+        assert r.status_code == 422
+
+    def test_unknown_and_broken_models(self, multi_api):
+        r = multi_api.post("/models/nope/predict", json={"data": {}})
+        assert r.status_code == 404
+        assert "product15" in r.json()["detail"]["models"]
+        r = multi_api.post("/models/broken/predict", json={"data": {}})
+        assert r.status_code == 503
+        assert "FileNotFoundError" in r.json()["detail"]["reason"]
+
+    def test_default_registry_follows_model_path(self, api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "MODEL_REGISTRY", "")
+        monkeypatch.setattr(predictor, "REGISTRY", predictor.build_registry())
+        spec = predictor.REGISTRY.spec("product15_v2")
+        assert (spec.model_path, spec.meta_path) == predictor.model_paths()
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=6)[0]
+        r = api.post("/models/product15_v2/predict", json={"data": payload})
+        assert r.status_code == 200
+        assert r.json()["proba"] == api.post("/predict", json={"data": payload}).json()["proba"]
+        assert api.get("/models").json()["models"]["product15_v2"]["loads"] == 0
+
+    def test_health_reports_budget(self, multi_api):
+        budget = multi_api.get("/health").json()["inference_budget"]
+        assert budget["slots"] >= 1
@@ -0,0 +1,204 @@
+"""
+Unit tests for hot model reload (predictor_lib.reload + POST /admin/reload).
+
+Tests:
+- FileWatcher fires once a changed signature is stable across two polls
+- /admin/reload swaps model + fingerprint and reports the duration in /health
+- Every inference of a reload (warm-up, drift probe) runs inside the shared thread budget
+- A broken model file is rejected and the current model keeps serving
+- ADMIN_TOKEN protects the endpoint; without ADMIN_TOKEN the endpoint is disabled
+- Concurrent /predict calls during a reload all succeed with a consistent model
+"""
+
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from predictor_lib.reload import FileWatcher, file_signature
+from predictor_lib.synthetic import synthetic_records
+
+pytest.importorskip("catboost")
+
+ADMIN_HEADERS = {"X-Admin-Token": "test-token"}
+
+
+@pytest.fixture(scope="module")
+def other_model_path(tiny_model_paths, tmp_path_factory):
+    """Second tiny model, same features, different predictions."""
+    import pandas as pd
+    from catboost import CatBoostClassifier
+
+    _, meta_path = tiny_model_paths
+    features = json.loads(meta_path.read_text(encoding="utf-8"))["features"]
+    records = synthetic_records(300, features, seed=5)
+    X = pd.DataFrame(records, columns=features).astype(str)
+    y = [int(r["atm"] in (2, 3, 5) or i % 4 == 0) for i, r in enumerate(records)]
+    model = CatBoostClassifier(iterations=20, depth=2, verbose=0, random_seed=1,
+                               cat_features=features, allow_writing_files=False)
+    model.fit(X, y)
+    path = tmp_path_factory.mktemp("other_model") / "other.cbm"
+    model.save_model(str(path))
+    return path
+
+
+@pytest.fixture
+def live(tiny_model_paths, tmp_path, monkeypatch):
+    """API on a writable copy of the tiny model; yields (client, model_path)."""
+    from fastapi.testclient import TestClient
+    import predictor
+
+    model_src, meta_path = tiny_model_paths
+    model_path = tmp_path / "model.cbm"
+    shutil.copy(model_src, model_path)
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setenv("META_PATH", str(meta_path))
+    monkeypatch.setattr(predictor, "ADMIN_TOKEN", ADMIN_HEADERS["X-Admin-Token"])
+    with TestClient(predictor.app) as client:
+        yield client, model_path
+
+
+class TestFileWatcher:
+
+    def test_fires_after_stable_change(self, tmp_path):
+        target = tmp_path / "model.cbm"
+        target.write_bytes(b"v1")
+        calls = []
+        watcher = FileWatcher([target], interval_s=1.0, on_change=lambda: calls.append(1))
+
+        assert watcher.poll() is None
+        target.write_bytes(b"version 2")
+        pending = watcher.poll()
+        assert pending == file_signature([target]) and calls == []
+        assert watcher.poll(pending) is None and calls == [1]
+        assert watcher.poll() is None and calls == [1]
+
+    def test_on_change_errors_are_contained(self, tmp_path):
+        target = tmp_path / "meta.json"
+        watcher = FileWatcher([target], interval_s=1.0, on_change=lambda: 1 / 0)
+        target.write_text("{}")
+        watcher.poll(watcher.poll())  # ne lève pas
+
+
+class TestAdminReload:
+
+    def test_reload_swaps_model(self, live, other_model_path):
+        import predictor
+
+        client, model_path = live
+        before = client.get("/health").json()
+        shutil.copy(other_model_path, model_path)
+
+        r = client.post("/admin/reload", headers=ADMIN_HEADERS)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["previous_fingerprint"] == before["model_fingerprint"]
+        assert body["model_fingerprint"] != before["model_fingerprint"]
+        assert body["probe_max_abs_diff_vs_previous"] > 0
+
+        after = client.get("/health").json()
+        assert after["model_fingerprint"] == body["model_fingerprint"]
+        assert after["reload"]["reloads"] == before["reload"]["reloads"] + 1
+        assert after["reload"]["last_duration_ms"] > 0
+        assert predictor.STATE.model.model_path == model_path
+
+    def test_reload_inference_within_budget(self, live, other_model_path, monkeypatch):
+        import predictor
+        from predictor_lib.budget import ThreadBudget
+
+        client, model_path = live
+        budget = ThreadBudget(1, 1)
+        monkeypatch.setattr(predictor, "INFERENCE_BUDGET", budget)
+        active = []
+        backend = type(predictor.STATE.model)
+        predict_proba = backend.predict_proba
+        monkeypatch.setattr(backend, "predict_proba",
+                            lambda self, X: active.append(budget.stats()["active"]) or predict_proba(self, X))
+        shutil.copy(other_model_path, model_path)
+
+        assert client.post("/admin/reload", headers=ADMIN_HEADERS).status_code == 200
+        assert active and all(n == 1 for n in active)
+
+    def test_broken_model_keeps_serving(self, live):
+        client, model_path = live
+        before = client.get("/health").json()
+        model_path.write_bytes(b"not a catboost model")
+
+        r = client.post("/admin/reload", headers=ADMIN_HEADERS)
+        assert r.status_code == 500
+        assert "reste servi" in r.json()["detail"]["error"]
+
+        after = client.get("/health").json()
+        assert after["model_fingerprint"] == before["model_fingerprint"]
+        assert after["reload"]["failures"] == before["reload"]["failures"] + 1
+        assert after["reload"]["last_error"]
+        import predictor
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=0)[0]
+        assert client.post("/predict", json={"data": payload}).status_code == 200
+
+    def test_admin_token(self, live, monkeypatch):
+        import predictor
+
+        client, _ = live
+        monkeypatch.setattr(predictor, "ADMIN_TOKEN", "s3cret")
+        assert client.post("/admin/reload").status_code == 403
+        assert client.post("/admin/reload", headers=ADMIN_HEADERS).status_code == 403
+        assert client.post("/admin/reload", headers={"X-Admin-Token": "s3cret"}).status_code == 200
+
+    def test_disabled_without_token(self, live, monkeypatch):
+        import predictor
+
+        client, _ = live
+        monkeypatch.setattr(predictor, "ADMIN_TOKEN", "")
+        before = client.get("/health").json()["reload"]["reloads"]
+        r = client.post("/admin/reload", headers=ADMIN_HEADERS)
+        assert r.status_code == 403 and "ADMIN_TOKEN" in r.json()["detail"]
+        assert client.get("/health").json()["reload"]["reloads"] == before
+
+    def test_no_dropped_or_mixed_requests(self, live, tiny_model_paths, other_model_path):
+        import predictor
+
+        client, model_path = live
+        features = predictor.STATE.meta.features
+        records = synthetic_records(40, features, seed=21)
+        predictor.PREDICT_CACHE.clear()
+        old = [client.post("/predict", json={"data": r}).json()["proba"] for r in records]
+        shutil.copy(other_model_path, model_path)
+
+        done = threading.Event()
+
+        def hammer(i):
+            out = []
+            while not done.is_set() or not out:
+                resp = client.post("/predict", json={"data": records[i % len(records)]})
+                out.append((i % len(records), resp.status_code, resp.json().get("proba")))
+            return out
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(hammer, i) for i in range(8)]
+            assert client.post("/admin/reload", headers=ADMIN_HEADERS).status_code == 200
+            done.set()
+            results = [x for f in futures for x in f.result()]
+
+        predictor.PREDICT_CACHE.clear()
+        new = [client.post("/predict", json={"data": r}).json()["proba"] for r in records]
+        assert all(status == 200 for _, status, _ in results)
+        for i, _, proba in results:
+            assert proba == pytest.approx(old[i]) or proba == pytest.approx(new[i])
+
+
+class TestBatcherAcrossStates:
+
+    def test_items_use_their_own_state(self, tiny_model_paths, other_model_path):
+        import predictor
+
+        model_path, meta_path = tiny_model_paths
+        a = predictor.build_state(model_path, meta_path)
+        b = predictor.build_state(other_model_path, meta_path)
+        rows = predictor.probe_rows(a.meta, 4)
+        items = [(a, rows[0]), (b, rows[1]), (a, rows[2]), (b, rows[3])]
+        got = predictor._predict_items(items)
+        expected = [s.predict_rows([r])[0] for s, r in items]
+        assert [p for p, _ in got] == pytest.approx([p for p, _ in expected])
@@ -0,0 +1,113 @@
+"""
+Unit tests for the offline scoring command (main.py score).
+
+Tests:
+- Parquet input scored in chunks gives the /predict_batch probabilities, in input order
+- CSV input keeps categorical codes as text ("01" stays "01") and matches the Parquet scores
+- A process pool (2 workers) writes the same output as the in-process path
+- A missing feature column -> exit code 2 with the column named
+- A code absent from ref_options.json is rejected offline as by the API ("Codes inconnus")
+"""
+
+import json
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pytest
+
+import main
+from predictor_lib.synthetic import synthetic_records
+
+
+@pytest.fixture
+def records(api):
+    import predictor
+
+    rows = synthetic_records(45, predictor.STATE.meta.features, seed=71)
+    for i, r in enumerate(rows):
+        r.update({c: str(v) for c, v in r.items()})
+        r["grave"] = i % 2
+    return rows
+
+
+def _write_parquet(path, rows):
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=20)
+    return path
+
+
+def _score(tmp_path, input_path, tiny_model_paths, *extra):
+    model_path, meta_path = tiny_model_paths
+    output = tmp_path / f"scores_{input_path.stem}.parquet"
+    code = main.main(["score", "--input", str(input_path), "--output", str(output),
+                      "--model", str(model_path), "--meta", str(meta_path),
+                      "--chunk-rows", "10", "--workers", "1", *extra])
+    return code, output
+
+
+class TestScoreCommand:
+
+    def test_parquet_matches_batch(self, api, records, tmp_path, tiny_model_paths, capsys):
+        code, output = _score(tmp_path, _write_parquet(tmp_path / "in.parquet", records), tiny_model_paths,
+                              "--keep-columns", "grave")
+        assert code == 0
+        result = pq.read_table(output)
+        features = {k: v for k, v in records[0].items() if k != "grave"}
+        batch = api.post("/predict_batch", json={"data": [{k: r[k] for k in features} for r in records]})
+
+        assert result.column("row").to_pylist() == list(range(45))
+        assert result.column("proba").to_pylist() == pytest.approx([b["proba"] for b in batch.json()["results"]])
+        assert result.column("grave").to_pylist() == [r["grave"] for r in records]
+        out = capsys.readouterr().out
+        assert out.count("[score] bloc") == 5 and "lignes/s" in out and "pic RSS" in out
+
+    def test_csv_keeps_codes_as_text(self, api, records, tmp_path, tiny_model_paths):
+        import predictor
+
+        dep = predictor.STATE.meta.features[0]
+        records[0][dep] = "01"
+        parquet_in = _write_parquet(tmp_path / "in.parquet", records)
+        csv_in = tmp_path / "in.csv"
+        pacsv.write_csv(pq.read_table(parquet_in), csv_in)
+
+        _, from_parquet = _score(tmp_path, parquet_in, tiny_model_paths)
+        _, from_csv = _score(tmp_path, csv_in, tiny_model_paths)
+        assert pq.read_table(from_csv).column("proba").to_pylist() == \
+            pytest.approx(pq.read_table(from_parquet).column("proba").to_pylist())
+
+    def test_process_pool_same_output(self, records, tmp_path, tiny_model_paths):
+        input_path = _write_parquet(tmp_path / "in.parquet", records)
+        _, single = _score(tmp_path, input_path, tiny_model_paths)
+        pooled = tmp_path / "pooled.parquet"
+        model_path, meta_path = tiny_model_paths
+        summary = main.score(input_path, pooled, model_path, meta_path, workers=2, chunk_rows=10)
+
+        assert summary["rows"] == 45 and summary["chunks"] == 5
+        assert summary["worker_peak_rss_mb"] > 0
+        assert pq.read_table(pooled).equals(pq.read_table(single))
+
+    def test_missing_column(self, records, tmp_path, tiny_model_paths, capsys):
+        import predictor
+
+        field = predictor.STATE.meta.features[-1]
+        for r in records:
+            del r[field]
+        code, _ = _score(tmp_path, _write_parquet(tmp_path / "missing.parquet", records), tiny_model_paths)
+        assert code == 2 and field in capsys.readouterr().err
+
+    def test_unknown_code_rejected_like_api(self, records, tmp_path, tiny_model_paths, monkeypatch):
+        import predictor
+
+        # état d'un processus neuf : rien de compilé par le démarrage de l'API
+        monkeypatch.setattr(predictor, "REF_CODE_SETS", {})
+        dep = predictor.STATE.meta.features[0]
+        records[3][dep] = "ZZ"
+        input_path = _write_parquet(tmp_path / "unknown.parquet", records)
+        model_path, meta_path = tiny_model_paths
+        summary = main.score(input_path, tmp_path / "out.parquet", model_path, meta_path, workers=1, chunk_rows=10)
+
+        result = pq.read_table(tmp_path / "out.parquet")
+        assert summary["errors"] == 1
+        assert result.column("proba")[3].as_py() is None
+        error = json.loads(result.column("error")[3].as_py())
+        assert error["error"] == "Codes inconnus" and error["invalid_fields"] == [dep]
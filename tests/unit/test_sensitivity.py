@@ -0,0 +1,98 @@
+"""
+Unit tests for POST /sensitivity (what-if sweep over ref_options codes).
+
+Tests:
+- One field: one proba per code, equal to /predict_batch on the expanded payloads; base code located
+- Two fields: 2-D grid (codes of field 1 x codes of field 2) scored in a single inference call
+- Unknown / duplicate / non-sweepable fields -> 422; oversized grid -> 413
+- Second identical request is served by the cache (no inference, only the base row encoded)
+"""
+
+import pytest
+
+from predictor_lib.synthetic import load_codes, synthetic_records
+
+
+@pytest.fixture
+def sweep_api(api):
+    import predictor
+
+    predictor.SENSITIVITY_CACHE.clear()
+    assert predictor.READY.wait(30)  # chauffe terminée : plus d'appels au modèle en arrière-plan
+    return api
+
+
+def _payload(seed):
+    import predictor
+
+    return synthetic_records(1, predictor.STATE.meta.features, seed=seed)[0]
+
+
+class TestSensitivity:
+
+    def test_one_field_curve(self, sweep_api):
+        payload = _payload(91)
+        codes = load_codes()["lum"]
+        body = sweep_api.post("/sensitivity", json={"data": payload, "fields": ["lum"]}).json()
+
+        axis = body["axes"][0]
+        assert axis["field"] == "lum" and axis["codes"] == codes
+        assert codes[axis["base_index"]] == payload["lum"]
+        expected = sweep_api.post("/predict_batch", json={"data": [{**payload, "lum": c} for c in codes]}).json()
+        assert body["probas"] == pytest.approx([r["proba"] for r in expected["results"]])
+        assert body["base_proba"] == pytest.approx(body["probas"][axis["base_index"]])
+
+    def test_two_field_grid_single_call(self, sweep_api, monkeypatch):
+        import predictor
+
+        calls = []
+        predict_proba = predictor.ServingState.predict_proba
+        monkeypatch.setattr(predictor.ServingState, "predict_proba",
+                            lambda self, X: calls.append(len(X)) or predict_proba(self, X))
+        payload = _payload(92)
+        codes = load_codes()
+        body = sweep_api.post("/sensitivity", json={"data": payload, "fields": ["vma_bucket", "agg"]}).json()
+
+        n1, n2 = len(codes["vma_bucket"]), len(codes["agg"])
+        assert calls == [1 + n1 * n2]
+        assert len(body["probas"]) == n1 and all(len(row) == n2 for row in body["probas"])
+        i, j = 3, 1
+        cell = sweep_api.post("/predict", json={"data": {**payload, "vma_bucket": codes["vma_bucket"][i],
+                                                         "agg": codes["agg"][j]}}).json()["proba"]
+        assert body["probas"][i][j] == pytest.approx(cell)
+
+        # même scénario (clés dans un autre ordre) : servi par le cache
+        again = dict(reversed(list(payload.items())))
+        assert sweep_api.post("/sensitivity", json={"data": again, "fields": ["vma_bucket", "agg"]}).json() == body
+        assert calls == [1 + n1 * n2]
+        assert sweep_api.get("/health").json()["sensitivity_cache"]["hits"] == 1
+
+    def test_cache_hit_encodes_base_row_only(self, sweep_api, monkeypatch):
+        import predictor
+
+        payload = _payload(95)
+        request = {"data": payload, "fields": ["lum", "agg"]}
+        first = sweep_api.post("/sensitivity", json=request).json()
+
+        encoded = []
+        encode = type(predictor.STATE.encoder).encode
+        monkeypatch.setattr(type(predictor.STATE.encoder), "encode",
+                            lambda self, data: encoded.append(data) or encode(self, data))
+        assert sweep_api.post("/sensitivity", json=request).json() == first
+        assert len(encoded) == 1
+
+    @pytest.mark.parametrize("fields,status", [
+        (["nope"], 422),
+        (["lum", "lum"], 422),
+        (["lum", "atm", "col"], 422),
+        ([], 422),
+    ])
+    def test_invalid_fields(self, sweep_api, fields, status):
+        assert sweep_api.post("/sensitivity", json={"data": _payload(93), "fields": fields}).status_code == status
+
+    def test_grid_too_large(self, sweep_api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "SENSITIVITY_MAX_CELLS", 100)
+        r = sweep_api.post("/sensitivity", json={"data": _payload(94), "fields": ["dep", "lum"]})
+        assert r.status_code == 413 and r.json()["detail"]["n_cells"] == 107 * 6
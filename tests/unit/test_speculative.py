@@ -0,0 +1,139 @@
+"""
+Unit tests for the speculative prediction launched when the form becomes complete.
+
+Tests:
+- Completing the 15 fields submits the prediction in the background, once per set of inputs
+- Changed inputs cancel and replace the in-flight prediction; an incomplete form drops it
+- take_prediction returns the ready speculative result without a new API call
+- Reruns after a prediction was taken do not relaunch it until the inputs change
+- A failed speculative call or other inputs fall back to a direct call
+- Perceived latency is logged with its source
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+
+from streamlit_lib import api_client, session_state
+
+COMPLETE_INPUTS = {
+    "dep": "59", "lum": 1, "atm": 1, "catr": 3, "agg": 2, "int": 1, "circ": 2,
+    "col": 3, "vma_bucket": "41-50", "catv_family_4": "VL", "manv_mode": "avance",
+    "driver_age_bucket": "25-34", "choc_mode": "avant", "driver_trajet_family": "loisir",
+    "time_bucket": "jour",
+}
+OK = {"probability": 0.68, "prediction": "grave", "threshold": 0.47}
+
+
+class FakeSessionState(dict):
+    """st.session_state stand-in: a dict with attribute access."""
+
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+@pytest.fixture
+def state():
+    fake = FakeSessionState(prediction_inputs=dict(COMPLETE_INPUTS), is_form_complete=False,
+                            speculative_prediction=None, consumed_prediction_key=None)
+    with patch("streamlit.session_state", fake):
+        yield fake
+
+
+@pytest.fixture
+def api_calls():
+    """call_predict_api stub recording its inputs (runs in the speculative worker too)."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_call(inputs):
+        with lock:
+            calls.append(dict(inputs))
+        return dict(OK)
+
+    with patch.object(api_client, "call_predict_api", side_effect=fake_call):
+        yield calls
+
+
+class TestSpeculativePrediction:
+
+    def test_complete_form_starts_one_prediction(self, state, api_calls):
+        session_state.update_form_complete_status()
+        future = state.speculative_prediction["future"]
+        assert future.result(5) == OK
+        session_state.update_form_complete_status()
+        assert state.speculative_prediction["future"] is future
+        assert api_calls == [COMPLETE_INPUTS]
+
+    def test_changed_inputs_replace_prediction(self, state, api_calls):
+        session_state.update_form_complete_status()
+        first = state.speculative_prediction["future"]
+        state.prediction_inputs["lum"] = 2
+        session_state.update_form_complete_status()
+        assert state.speculative_prediction["future"] is not first
+        state.speculative_prediction["future"].result(5)
+        assert api_calls[-1]["lum"] == 2
+
+    def test_incomplete_form_cancels(self, state, api_calls):
+        pending = Future()
+        state.speculative_prediction = {"key": (), "future": pending, "started_at": 0.0}
+        del state.prediction_inputs["dep"]
+        session_state.update_form_complete_status()
+        assert state.speculative_prediction is None and pending.cancelled()
+        assert api_calls == []
+
+    def test_reset_form_drops_prediction(self, state, api_calls):
+        session_state.update_form_complete_status()
+        session_state.reset_form()
+        assert state.speculative_prediction is None
+
+
+class TestTakePrediction:
+
+    def test_ready_result_is_instant(self, state, api_calls, caplog):
+        session_state.update_form_complete_status()
+        state.speculative_prediction["future"].result(5)
+        with caplog.at_level(logging.INFO, logger="streamlit_lib.session_state"):
+            assert session_state.take_prediction(dict(COMPLETE_INPUTS)) == OK
+        assert len(api_calls) == 1
+        assert state.speculative_prediction is None
+        assert any("source=speculative," in r.getMessage() and "perceived_latency_ms=" in r.getMessage()
+                   for r in caplog.records)
+
+    def test_other_inputs_call_directly(self, state, api_calls, caplog):
+        session_state.update_form_complete_status()
+        state.speculative_prediction["future"].result(5)
+        other = {**COMPLETE_INPUTS, "lum": 5}
+        with caplog.at_level(logging.INFO, logger="streamlit_lib.session_state"):
+            session_state.take_prediction(other)
+        assert api_calls[-1] == other
+        assert any("source=direct," in r.getMessage() for r in caplog.records)
+
+    def test_failed_speculation_is_retried(self, state, api_calls):
+        failed = Future()
+        failed.set_result({"error": "timeout", "message": "..."})
+        state.speculative_prediction = {
+            "key": session_state._inputs_key(COMPLETE_INPUTS), "future": failed, "started_at": 0.0,
+        }
+        assert session_state.take_prediction(dict(COMPLETE_INPUTS)) == OK
+        assert api_calls == [COMPLETE_INPUTS]
+
+    def test_reruns_do_not_relaunch_taken_prediction(self, state, api_calls):
+        session_state.update_form_complete_status()
+        state.speculative_prediction["future"].result(5)
+        session_state.take_prediction(dict(COMPLETE_INPUTS))
+        for _ in range(3):  # reruns of page 6
+            session_state.update_form_complete_status()
+        assert state.speculative_prediction is None
+        assert api_calls == [COMPLETE_INPUTS]
+
+        state.prediction_inputs["lum"] = 2
+        session_state.update_form_complete_status()
+        state.speculative_prediction["future"].result(5)
+        assert api_calls[-1]["lum"] == 2
+
+        session_state.reset_form()
+        assert state.consumed_prediction_key is None
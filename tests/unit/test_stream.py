@@ -0,0 +1,118 @@
+"""
+Unit tests for POST /predict/stream (NDJSON in, NDJSON out).
+
+Tests:
+- ndjson_lines() reassembles lines split across body pieces and skips overlong ones to the next newline
+- Each valid line gets proba / pred_class / label equal to /predict_batch
+- Invalid JSON, non-object lines and missing fields are reported per line, the rest is scored
+- Line numbers survive chunk boundaries (STREAM_CHUNK_ROWS smaller than the body)
+- Overlong lines are rejected without stopping the stream; final summary line counts ok / errors
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from predictor_lib.streaming import ndjson_lines
+from predictor_lib.synthetic import synthetic_records
+
+
+def _lines(pieces, max_line_bytes=16):
+    async def source():
+        for p in pieces:
+            yield p
+
+    async def collect():
+        return [item async for item in ndjson_lines(source(), max_line_bytes)]
+
+    return asyncio.run(collect())
+
+
+class TestNdjsonLines:
+
+    def test_split_pieces(self):
+        assert _lines([b'{"a"', b':1}\n\n{"b":2', b"}\n", b'{"c":3}']) == [
+            (1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}')]
+
+    def test_overlong_across_pieces(self):
+        got = _lines([b"{}\n0123456789", b"0123456789", b"0123456789\n{", b"}\n"])
+        assert got[0] == (1, b"{}")
+        assert got[1][0] == 2 and got[1][1]["error"] == "Ligne trop longue"
+        assert got[2:] == [(3, b"{}")]
+
+
+def _stream(api, lines):
+    body = "\n".join(lines) + "\n"
+    r = api.post("/predict/stream", content=body.encode("utf-8"),
+                 headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    out = [json.loads(line) for line in r.text.splitlines()]
+    return out[:-1], out[-1]["summary"]
+
+
+class TestPredictStream:
+
+    def test_matches_batch(self, api):
+        import predictor
+
+        records = synthetic_records(7, predictor.STATE.meta.features, seed=51)
+        results, summary = _stream(api, [json.dumps(r) for r in records])
+        batch = api.post("/predict_batch", json={"data": records}).json()["results"]
+
+        assert [r["line"] for r in results] == list(range(1, 8))
+        assert [r["proba"] for r in results] == pytest.approx([b["proba"] for b in batch])
+        assert [r["pred_class"] for r in results] == [b["pred_class"] for b in batch]
+        assert summary["n_ok"] == 7 and summary["n_errors"] == 0
+
+    def test_per_line_errors(self, api):
+        import predictor
+
+        records = synthetic_records(2, predictor.STATE.meta.features, seed=52)
+        lines = [json.dumps(records[0]), "{pas du json", "[1, 2]", "", json.dumps({"lum": 1}),
+                 json.dumps(records[1])]
+        results, summary = _stream(api, lines)
+        by_line = {r["line"]: r for r in results}
+
+        assert set(by_line) == {1, 2, 3, 5, 6}  # ligne vide ignorée
+        assert by_line[2]["error"]["error"] == "JSON invalide"
+        assert by_line[3]["error"]["error"] == "Objet JSON attendu"
+        assert "missing_fields" in by_line[5]["error"]
+        assert "proba" in by_line[1] and "proba" in by_line[6]
+        assert summary["n_ok"] == 2 and summary["n_errors"] == 3
+
+    def test_chunk_boundaries(self, api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "STREAM_CHUNK_ROWS", 3)
+        records = synthetic_records(8, predictor.STATE.meta.features, seed=53)
+        lines = [json.dumps(r) for r in records]
+        lines[4] = "{"
+        results, summary = _stream(api, lines)
+
+        assert [r["line"] for r in results] == list(range(1, 9))
+        assert "error" in results[4] and all("proba" in r for i, r in enumerate(results) if i != 4)
+        assert summary == {"n_ok": 7, "n_errors": 1, "threshold": predictor.STATE.meta.threshold}
+
+    def test_overlong_line(self, api, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "STREAM_MAX_LINE_BYTES", 512)
+        record = synthetic_records(1, predictor.STATE.meta.features, seed=54)[0]
+        lines = [json.dumps(record), json.dumps({"x": "a" * 5000}), json.dumps(record)]
+        results, summary = _stream(api, lines)
+
+        assert [r["line"] for r in results] == [1, 2, 3]
+        assert results[1]["error"]["error"] == "Ligne trop longue"
+        assert results[2]["proba"] == pytest.approx(results[0]["proba"])
+        assert summary["n_ok"] == 2 and summary["n_errors"] == 1
+
+    def test_not_ready(self, api):
+        import predictor
+
+        state, predictor.STATE = predictor.STATE, None
+        try:
+            assert api.post("/predict/stream", content=b"{}\n").status_code == 503
+        finally:
+            predictor.STATE = state
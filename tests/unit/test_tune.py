@@ -0,0 +1,93 @@
+"""
+Unit tests for the inference autotuner (main.py tune, predictor_lib.tuning, start.py).
+
+Tests:
+- recommend() keeps the best throughput within the p99 budget, prefers the lower p99 on near ties
+- tuned_int(): environment variable > tuning file > default; a missing file loads as {}
+- start.py passes the recommended worker count to uvicorn (API_WORKERS overrides)
+- main.py tune measures every cell of the grid and writes the recommendation; empty grid -> exit 2
+- Worker processes use the requested thread count even if an earlier tuning file capped INFERENCE_THREADS
+"""
+
+import json
+
+import main
+import start
+from predictor_lib import tuning
+
+
+def _result(workers, threads, batch, rows_per_s, p99_ms):
+    return {"workers": workers, "thread_count": threads, "batch_size": batch,
+            "rows_per_s": rows_per_s, "p99_ms": p99_ms}
+
+
+class TestRecommend:
+
+    def test_budget_and_ties(self):
+        results = [
+            _result(1, 4, 64, 50000, 80.0),   # hors budget
+            _result(4, 1, 64, 40000, 30.0),
+            _result(2, 2, 64, 39000, 12.0),   # à moins de 5 % du meilleur, p99 plus bas
+            _result(4, 1, 8, 20000, 3.0),
+        ]
+        best = tuning.recommend(results, p99_budget_ms=50.0)
+        assert (best["workers"], best["thread_count"], best["batch_size"]) == (2, 2, 64)
+        assert best["within_budget"]
+
+        best = tuning.recommend(results, p99_budget_ms=1.0)
+        assert best["batch_size"] == 8 and not best["within_budget"]
+
+    def test_default_grid(self):
+        assert tuning.default_grid(16) == [1, 2, 4, 8, 16]
+        assert tuning.default_grid(6) == [1, 2, 4, 6]
+
+
+class TestConfig:
+
+    def test_tuned_int_precedence(self, tmp_path, monkeypatch):
+        assert tuning.load_tuning(tmp_path / "absent.json") == {}
+        config = {"thread_count": 2}
+        monkeypatch.delenv("INFERENCE_THREAD_COUNT", raising=False)
+        assert tuning.tuned_int("INFERENCE_THREAD_COUNT", config, "thread_count", -1) == 2
+        assert tuning.tuned_int("INFERENCE_THREAD_COUNT", {}, "thread_count", -1) == -1
+        monkeypatch.setenv("INFERENCE_THREAD_COUNT", "8")
+        assert tuning.tuned_int("INFERENCE_THREAD_COUNT", config, "thread_count", -1) == 8
+
+    def test_start_uses_recommended_workers(self, monkeypatch):
+        monkeypatch.delenv("API_WORKERS", raising=False)
+        assert start.api_workers({}) == 1 and "--workers" not in start.api_command(1)
+        assert start.api_workers({"workers": 4}) == 4
+        assert start.api_command(4)[-2:] == ["--workers", "4"]
+        monkeypatch.setenv("API_WORKERS", "2")
+        assert start.api_workers({"workers": 4}) == 2
+
+
+class TestTuneCommand:
+
+    def test_writes_recommendation(self, tiny_model_paths, tmp_path, capsys):
+        model_path, meta_path = tiny_model_paths
+        output = tmp_path / "tuning.json"
+        code = main.main(["tune", "--output", str(output), "--model", str(model_path), "--meta", str(meta_path),
+                          "--workers", "1", "--threads", "1", "--batch-sizes", "1,4", "--duration", "0.2"])
+        assert code == 0
+        config = json.loads(output.read_text(encoding="utf-8"))
+        assert [(r["workers"], r["thread_count"], r["batch_size"]) for r in config["results"]] == [(1, 1, 1), (1, 1, 4)]
+        assert all(r["calls"] > 0 and r["p99_ms"] >= r["p50_ms"] for r in config["results"])
+        assert config["batch_size"] in (1, 4) and config["inference_threads"] >= 1
+        assert tuning.load_tuning(output)["workers"] == 1
+        assert "recommandé" in capsys.readouterr().out
+
+    def test_empty_grid(self, tiny_model_paths, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(main.os, "cpu_count", lambda: 1)
+        code = main.main(["tune", "--output", str(tmp_path / "t.json"), "--model", str(tiny_model_paths[0]),
+                          "--meta", str(tiny_model_paths[1]), "--workers", "2", "--threads", "1"])
+        assert code == 2 and "oversubscribe" in capsys.readouterr().err
+
+    def test_worker_threads_not_capped_by_tuning_file(self, tiny_model_paths, monkeypatch):
+        import predictor
+
+        # out/tuning.json d'un balayage précédent qui avait retenu 1 thread
+        monkeypatch.setattr(predictor, "INFERENCE_THREADS", 1)
+        monkeypatch.setattr(predictor, "INFERENCE_THREAD_COUNT", 1)
+        main._init_worker(*tiny_model_paths, 4)
+        assert main._WORKER["model"].thread_count == 4
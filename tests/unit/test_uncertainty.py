@@ -0,0 +1,70 @@
+"""
+Unit tests for ?uncertainty=true (virtual-ensemble mean / variance on /predict and /predict_batch).
+
+Tests:
+- /predict?uncertainty=true keeps the /predict proba and class, adds proba_mean / proba_var
+- /predict_batch?uncertainty=true scores all valid rows in one virtual-ensemble call, errors per row kept
+- Without the flag, proba_mean / proba_var are null and no virtual-ensemble call is made
+- A backend without virtual ensembles -> 501
+"""
+
+import numpy as np
+import pytest
+
+from predictor_lib.synthetic import synthetic_records
+
+
+@pytest.fixture
+def calls(api, monkeypatch):
+    import predictor
+
+    assert predictor.READY.wait(30)  # chauffe terminée : plus d'appels au modèle en arrière-plan
+    recorded = []
+    virtual_ensembles = predictor.ServingState.virtual_ensembles
+    monkeypatch.setattr(predictor.ServingState, "virtual_ensembles",
+                        lambda self, X, count: recorded.append((len(X), count)) or virtual_ensembles(self, X, count))
+    return recorded
+
+
+class TestUncertainty:
+
+    def test_predict(self, api, calls):
+        import predictor
+
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=111)[0]
+        plain = api.post("/predict", json={"data": payload}).json()
+        body = api.post("/predict", params={"uncertainty": "true"}, json={"data": payload}).json()
+
+        assert calls == [(1, predictor.VIRTUAL_ENSEMBLES_COUNT)]
+        assert plain["proba_mean"] is None and plain["proba_var"] is None
+        assert body["proba"] == pytest.approx(plain["proba"], abs=1e-9)
+        assert body["pred_class"] == plain["pred_class"]
+        assert 0 < body["proba_mean"] < 1 and body["proba_var"] > 0
+
+    def test_predict_batch_one_call(self, api, calls, monkeypatch):
+        import predictor
+
+        monkeypatch.setattr(predictor, "VIRTUAL_ENSEMBLES_COUNT", 4)
+        records = synthetic_records(12, predictor.STATE.meta.features, seed=112)
+        records[5] = {}
+        plain = api.post("/predict_batch", json={"data": records}).json()["results"]
+        body = api.post("/predict_batch?uncertainty=true", json={"data": records}).json()
+
+        assert calls == [(11, 4)]
+        assert body["n_ok"] == 11 and body["results"][5]["error"] is not None
+        assert [r["proba"] for r in body["results"]] == pytest.approx([p["proba"] for p in plain], abs=1e-9)
+        members = predictor.STATE.virtual_ensembles(
+            predictor.normalize_batch(records[:1], predictor.STATE.meta)[0], 4)[0]
+        assert body["results"][0]["proba_mean"] == pytest.approx(float(np.mean(members)))
+        assert body["results"][0]["proba_var"] == pytest.approx(float(np.var(members)))
+
+    def test_backend_without_virtual_ensembles(self, api, monkeypatch):
+        import predictor
+
+        def refuse(rows, count):
+            raise NotImplementedError("pas d'ensembles virtuels")
+
+        monkeypatch.setattr(predictor.STATE.model, "virtual_ensembles", refuse)
+        payload = synthetic_records(1, predictor.STATE.meta.features, seed=113)[0]
+        r = api.post("/predict?uncertainty=true", json={"data": payload})
+        assert r.status_code == 501 and r.json()["detail"]["error"] == "Incertitude indisponible"
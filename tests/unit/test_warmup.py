@@ -0,0 +1,89 @@
+"""
+Unit tests for startup warm-up and readiness gating.
+
+Tests:
+- warm_up() reports first / last pass timings per batch size
+- /ready returns 503 until warm-up completes, then 200
+- /health exposes the startup breakdown (import, meta, model, warm-up)
+- A failing warm-up keeps the API not ready and reports the error
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("catboost")
+
+
+def _wait_ready(client, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        r = client.get("/ready")
+        if r.status_code == 200:
+            return r
+        time.sleep(0.02)
+    raise AssertionError("API jamais prête")
+
+
+@pytest.fixture
+def paths_env(tiny_model_paths, monkeypatch):
+    model_path, meta_path = tiny_model_paths
+    monkeypatch.setenv("MODEL_PATH", str(model_path))
+    monkeypatch.setenv("META_PATH", str(meta_path))
+    return model_path, meta_path
+
+
+class TestWarmUp:
+
+    def test_report_per_batch_size(self, paths_env):
+        import predictor
+
+        state = predictor.build_state()
+        report = predictor.warm_up(state, batch_sizes=[1, 16], rounds=2)
+        assert set(report) == {"1", "16"}
+        assert all(r["first_ms"] > 0 and r["last_ms"] > 0 for r in report.values())
+
+    def test_ready_after_warm_up(self, paths_env, monkeypatch):
+        from fastapi.testclient import TestClient
+        import predictor
+
+        gate = threading.Event()
+        real_warm_up = predictor.warm_up
+
+        def gated_warm_up(state, *args, **kwargs):
+            gate.wait(5)
+            return real_warm_up(state, batch_sizes=[1, 8], rounds=1)
+
+        monkeypatch.setattr(predictor, "warm_up", gated_warm_up)
+        with TestClient(predictor.app) as client:
+            r = client.get("/ready")
+            assert r.status_code == 503
+            assert r.json()["detail"]["status"] == "warming"
+            assert client.get("/health").json()["ready"] is False
+            # l'API sert déjà pendant la chauffe
+            assert client.get("/health").json()["status"] == "ok"
+
+            gate.set()
+            assert _wait_ready(client).json()["ready"] is True
+            startup = client.get("/health").json()["startup"]
+
+        for key in ("import_ms", "meta_load_ms", "model_load_ms", "validation_ms", "warmup_ms", "total_ms"):
+            assert startup[key] >= 0, key
+        assert set(startup["warmup"]) == {"1", "8"}
+
+    def test_failed_warm_up_stays_not_ready(self, paths_env, monkeypatch):
+        from fastapi.testclient import TestClient
+        import predictor
+
+        def broken_warm_up(state, *args, **kwargs):
+            raise RuntimeError("chauffe impossible")
+
+        monkeypatch.setattr(predictor, "warm_up", broken_warm_up)
+        with TestClient(predictor.app) as client:
+            deadline = time.monotonic() + 5
+            while "warmup_error" not in predictor.STARTUP and time.monotonic() < deadline:
+                time.sleep(0.01)
+            r = client.get("/ready")
+        assert r.status_code == 503
+        assert "chauffe impossible" in r.json()["detail"]["error"]